@@ -32,10 +32,14 @@ INSTALLED_APPS = [
     'src.cuda',
     'src.utils',
     'src.sequential',
+    'src.jit',
+    'src.planner',
     'src.graph',
+    'src.jobs',
 ]
 
 MIDDLEWARE = [
+    'src.utils.metrics.PhaseTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -105,5 +109,62 @@ USE_TZ = True
 # Static files (CSS, JavaScript, Images)
 STATIC_URL = 'static/'
 
+# Decoded-graph cache shared by the algorithm views (per process)
+GRAPH_CACHE_MAX_BYTES = int(os.environ.get('GRAPH_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+
+# Persistent shortest-path result cache (database), bounded by encoded size
+RESULT_CACHE_MAX_BYTES = int(os.environ.get('RESULT_CACHE_MAX_BYTES', 1024 * 1024 * 1024))
+
+# Generated graphs at or below this density are stored as CSR instead of a dense matrix
+GRAPH_CSR_MAX_DENSITY = float(os.environ.get('GRAPH_CSR_MAX_DENSITY', 0.1))
+
+# All-pairs endpoints with ?method=auto use Johnson's algorithm below this graph
+# density and Floyd-Warshall above it (break-even measured near 0.005 on one core)
+JOHNSON_MAX_DENSITY = float(os.environ.get('JOHNSON_MAX_DENSITY', 0.004))
+
+# Benchmark rows (manage.py benchmark --output, .json or .csv) the planner's
+# cost model is calibrated from
+PLANNER_CALIBRATION = os.environ.get('PLANNER_CALIBRATION', str(BASE_DIR / 'src' / 'planner' / 'calibration.json'))
+
+# Where new graphs keep their arrays: 'file' writes .npy files under
+# GRAPH_STORE_DIR that every process memory-maps (the directory must be shared
+# by all workers), 'db' encodes them into the Graph row. Existing graphs keep
+# their storage; `manage.py move_graphs` moves them.
+GRAPH_STORAGE = os.environ.get('GRAPH_STORAGE', 'file')
+GRAPH_STORE_DIR = os.environ.get('GRAPH_STORE_DIR', str(BASE_DIR / 'graph_store'))
+
+# Uploaded graph files: the most vertices an import may have (given, from a
+# file header, or implied by the ids; checked before any CSR row index is
+# allocated), threads parsing uploads, and where uploads wait while they are
+# parsed (default: the system temp dir)
+GRAPH_IMPORT_MAX_VERTICES = int(os.environ.get('GRAPH_IMPORT_MAX_VERTICES', 50_000_000))
+GRAPH_IMPORT_WORKERS = int(os.environ.get('GRAPH_IMPORT_WORKERS', 2))
+GRAPH_IMPORT_DIR = os.environ.get('GRAPH_IMPORT_DIR') or None
+
+# Edge updates repair stored all-pairs matrices in place; when more than this
+# fraction of their rows would need recomputing they are dropped instead
+APSP_REPAIR_MAX_ROW_FRACTION = float(os.environ.get('APSP_REPAIR_MAX_ROW_FRACTION', 0.25))
+
+# Worker processes for multi-source shortest-path batches (0 = one per CPU)
+SHORTEST_PATH_WORKERS = int(os.environ.get('SHORTEST_PATH_WORKERS', 0))
+
+# Background job pool: concurrent worker processes and max jobs waiting to start
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+JOB_QUEUE_DEPTH = int(os.environ.get('JOB_QUEUE_DEPTH', 16))
+
+# Async endpoints (/api/async/, under ASGI): threads running the computations,
+# and how many distinct computations may be in flight before new ones get a 429
+ASYNC_COMPUTE_WORKERS = int(os.environ.get('ASYNC_COMPUTE_WORKERS', os.cpu_count() or 1))
+ASYNC_MAX_INFLIGHT = int(os.environ.get('ASYNC_MAX_INFLIGHT', 64))
+
+# MPI worker pool: processes spawned when not started under mpirun, and the
+# byte budget for graphs kept resident on the workers
+MPI_WORKERS = int(os.environ.get('MPI_WORKERS', 4))
+MPI_RESIDENT_MAX_BYTES = int(os.environ.get('MPI_RESIDENT_MAX_BYTES', 512 * 1024 * 1024))
+
+# Load the Numba kernels (compiled once, cached on disk) in the background when a
+# server process starts (not in management commands or pool workers)
+NUMBA_WARMUP = int(os.environ.get('NUMBA_WARMUP', 1))
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
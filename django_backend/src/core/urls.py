@@ -1,6 +1,8 @@
 from django.contrib import admin
 from django.urls import path, include
 from django.views.generic import RedirectView
+from src.utils.asyncviews import async_stats, async_urlpatterns
+from src.utils.metrics import metrics_view
 
 urlpatterns = [
     path('', RedirectView.as_view(url='admin/', permanent=True)),
@@ -8,5 +10,17 @@ urlpatterns = [
     path('api/mpi/', include('src.mpi.urls')),
     path('api/cuda/', include('src.cuda.urls')),
     path('api/sequential/', include('src.sequential.urls')),
+    path('api/numba/', include('src.jit.urls')),
     path('api/graph/', include('src.graph.urls')),
+    path('api/jobs/', include('src.jobs.urls')),
+    path('api/backends/', include('src.utils.urls')),
+    path('api/shortest_paths/', include('src.planner.urls')),
+    # Same endpoints, async with coalescing of identical requests (serve with ASGI)
+    path('api/async/mpi/', include(async_urlpatterns('src.mpi.urls'))),
+    path('api/async/cuda/', include(async_urlpatterns('src.cuda.urls'))),
+    path('api/async/sequential/', include(async_urlpatterns('src.sequential.urls'))),
+    path('api/async/numba/', include(async_urlpatterns('src.jit.urls'))),
+    path('api/async/shortest_paths/', include(async_urlpatterns('src.planner.urls'))),
+    path('api/async/stats/', async_stats),
+    path('metrics', metrics_view, name='metrics'),
 ]
@@ -0,0 +1,78 @@
+import numpy as np
+from src.utils.backends import array_module
+from src.utils.config import INFINITY
+from src.utils.metrics import phase
+from src.utils.timing import timeit
+
+# Array-parallel kernels written against the NumPy API, so the same code runs
+# on cupy (GPU) or numpy (CPU fallback). `xp` defaults to array_module().
+
+
+def to_device(xp, array):
+    with phase('transfer'):
+        return xp.array(array)
+
+
+def to_host(array) -> np.ndarray:
+    # cupy arrays copy back with .get(); numpy arrays are already on the host
+    with phase('transfer'):
+        return array.get() if hasattr(array, 'get') else np.asarray(array)
+
+
+@timeit
+def bellman_ford_cuda(graph_np, source=0, xp=None):
+    xp = xp or array_module()
+    n = graph_np.shape[0]
+    graph_gpu = to_device(xp, graph_np)
+    dist = xp.full(n, INFINITY, dtype=xp.float32)
+    dist[source] = 0
+
+    for _ in range(n - 1):
+        # relax all edges in parallel
+        for u in range(n):
+            row_u = graph_gpu[u]  # all weights from u
+            dist = xp.minimum(dist, dist[u] + row_u)
+
+    return to_host(dist)
+
+
+@timeit
+def dijkstra_cuda(graph_np, source=0, xp=None):
+    xp = xp or array_module()
+    n = graph_np.shape[0]
+    graph_gpu = to_device(xp, graph_np)
+    visited = xp.zeros(n, dtype=bool)
+    dist = xp.full(n, INFINITY, dtype=xp.float32)
+    dist[source] = 0
+
+    for _ in range(n):
+        # select the unvisited node with min dist
+        mask = xp.where(~visited, dist, INFINITY)
+        u = int(xp.argmin(mask))
+        if mask[u] == INFINITY:
+            break
+        visited[u] = True
+
+        # relax neighbors of u in parallel
+        w_row = graph_gpu[u]
+        not_visited = ~visited
+        candidate = dist[u] + w_row
+        dist = xp.where((not_visited & (w_row != INFINITY) & (candidate < dist)),
+                        candidate, dist)
+
+    return to_host(dist)
+
+
+@timeit
+def floyd_warshall_cuda(graph_np, xp=None):
+    xp = xp or array_module()
+    n = graph_np.shape[0]
+    dist = to_device(xp, graph_np)
+
+    for k in range(n):
+        # broadcast k-th row and column
+        ik = dist[:, k].reshape((n, 1))
+        kj = dist[k, :].reshape((1, n))
+        dist = xp.minimum(dist, ik + kj)
+
+    return to_host(dist)
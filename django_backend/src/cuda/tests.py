@@ -1,3 +1,51 @@
-from django.test import TestCase
+import numpy as np
+from django.test import SimpleTestCase
+from src.sequential.algorithms import bellman_ford, dijkstra, floyd_warshall_naive
+from src.utils.testing import GraphTestCase, random_graph, stored_graph
+from .kernels import bellman_ford_cuda, dijkstra_cuda, floyd_warshall_cuda
 
-# Create your tests here.
+
+class KernelTests(SimpleTestCase):
+    # Run on numpy, the CPU fallback; cupy follows the same array code
+    matrix = random_graph(30, 0.2, 0)
+
+    def test_dijkstra(self):
+        distances, _ = dijkstra_cuda(self.matrix.astype(np.float32), 4, xp=np)
+        np.testing.assert_allclose(distances, dijkstra(self.matrix, 4), rtol=1e-5)
+
+    def test_bellman_ford(self):
+        distances, _ = bellman_ford_cuda(self.matrix.astype(np.float32), 4, xp=np)
+        np.testing.assert_allclose(distances, bellman_ford(self.matrix, 4), rtol=1e-5)
+
+    def test_floyd_warshall(self):
+        distances, _ = floyd_warshall_cuda(self.matrix.astype(np.float32), xp=np)
+        np.testing.assert_allclose(distances, floyd_warshall_naive(self.matrix), rtol=1e-5)
+
+
+class DijkstraViewTests(GraphTestCase):
+    def setUp(self):
+        super().setUp()
+        self.matrix = random_graph(12, 0.3, 1)
+        self.graph = stored_graph(self.matrix)
+
+    def get(self, query, graph=None):
+        return self.client.get(f'/api/cuda/dijkstra/{(graph or self.graph).id}/{query}')
+
+    def test_source(self):
+        response = self.get('?source=5')
+        self.assertEqual(response.status_code, 200)
+        np.testing.assert_allclose(np.array(response.json()['distances'], dtype=float),
+                                   dijkstra(self.matrix, 5), rtol=1e-5)
+
+    def test_rejects_invalid_sources(self):
+        for source in ('x', '-1', '12'):
+            self.assertEqual(self.get(f'?source={source}').status_code, 400)
+
+    def test_rejects_point_queries(self):
+        response = self.get('?source=0&target=3')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('target', response.json()['message'])
+
+    def test_rejects_negative_weights(self):
+        self.matrix[0, 1] = -1.0
+        self.assertEqual(self.get('?source=0', stored_graph(self.matrix)).status_code, 400)
@@ -0,0 +1,169 @@
+import threading
+from collections import OrderedDict
+from functools import wraps
+import numpy as np
+from django.conf import settings
+from src.utils.csr import CSRGraph
+from src.utils.metrics import phase
+from .codec import decode_csr, decode_graph
+from .models import Graph
+
+
+def _arrays(value):
+    # A cached value is either one ndarray or a tuple of them (CSRGraph)
+    return value if isinstance(value, tuple) else (value,)
+
+
+def _nbytes(value) -> int:
+    # Memory-mapped arrays live in the shared page cache, not in this process
+    return sum(array.nbytes for array in _arrays(value) if not isinstance(array, np.memmap))
+
+
+class GraphCache:
+    """
+    Process-wide LRU cache of decoded graphs (dense matrices or CSRGraphs),
+    bounded by total array bytes; memory-mapped arrays count as free. Keys
+    start with (graph_id, version) so a regenerated graph never hits a
+    stale entry; arrays are handed out read-only since they are shared.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def peek(self, key):
+        # Lookup that neither counts towards stats nor refreshes recency
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, key, value):
+        for array in _arrays(value):
+            array.flags.writeable = False
+        nbytes = _nbytes(value)
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= _nbytes(self._entries.pop(key))
+            if nbytes > self.max_bytes:
+                # Larger than the whole budget: serve it, but don't keep it
+                return value
+            self._entries[key] = value
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= _nbytes(evicted)
+                self.evictions += 1
+        return value
+
+    def invalidate(self, graph_id: int):
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == graph_id]:
+                self._bytes -= _nbytes(self._entries.pop(key))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+graph_cache = GraphCache(settings.GRAPH_CACHE_MAX_BYTES)
+
+
+def _retrying(load):
+    # A file-backed version can be pruned between reading the row and opening
+    # its files once two newer versions have committed; the row has moved on
+    # by then, so reading it again finds files that exist
+    @wraps(load)
+    def retry(graph_id: int, dtype=np.float64):
+        try:
+            return load(graph_id, dtype)
+        except FileNotFoundError:
+            return load(graph_id, dtype)
+    return retry
+
+
+@_retrying
+def load_graph(graph_id: int, dtype=np.float64):
+    """
+    Return (graph_obj, read-only matrix) for `graph_id`, decoding at most once
+    per (id, version, dtype) in this process. Raises Graph.DoesNotExist.
+    """
+    # Fetch only the metadata; `data` is loaded lazily on a cache miss
+    with phase('load'):
+        graph_obj = Graph.objects.defer('data').get(id=graph_id)
+    key = (graph_obj.id, graph_obj.version, 'dense', np.dtype(dtype).str)
+
+    graph = graph_cache.get(key)
+    if graph is None:
+        if graph_obj.storage == Graph.FILE:
+            graph = graph_cache.put(key, graph_obj.get_graph(dtype))
+        else:
+            with phase('load'):
+                data = graph_obj.data
+            with phase('decode'):
+                graph = graph_cache.put(key, decode_graph(data, dtype=dtype))
+    return graph_obj, graph
+
+
+@_retrying
+def load_csr(graph_id: int, dtype=np.float64):
+    """
+    Return (graph_obj, CSRGraph) for `graph_id`. Dense-stored graphs are
+    converted once and the CSR form is cached alongside the matrix.
+    """
+    with phase('load'):
+        graph_obj = Graph.objects.defer('data').get(id=graph_id)
+    key = (graph_obj.id, graph_obj.version, 'csr', np.dtype(dtype).str)
+
+    csr = graph_cache.get(key)
+    if csr is None:
+        dense = graph_cache.peek((graph_obj.id, graph_obj.version, 'dense', np.dtype(dtype).str))
+        if dense is not None:
+            with phase('convert'):
+                csr = CSRGraph.from_dense(dense)
+        elif graph_obj.storage == Graph.FILE:
+            csr = graph_obj.get_csr(dtype)
+        else:
+            with phase('load'):
+                data = graph_obj.data
+            with phase('decode'):
+                csr = decode_csr(data, dtype=dtype)
+        csr = graph_cache.put(key, csr)
+    return graph_obj, csr
+
+
+def load_reverse_csr(graph_obj, csr: CSRGraph):
+    """Transpose of `csr` (from load_csr for `graph_obj`), cached alongside it."""
+    key = (graph_obj.id, graph_obj.version, 'csr_reverse', csr.weights.dtype.str)
+    reverse = graph_cache.get(key)
+    if reverse is None:
+        with phase('convert'):
+            reverse = graph_cache.put(key, csr.reverse())
+    return reverse
@@ -0,0 +1,191 @@
+import json
+import struct
+import zlib
+import numpy as np
+from src.utils.csr import CSRGraph
+from src.utils.metrics import phase
+
+# Binary layout of Graph.data (all fields little-endian):
+#
+#   magic    4s  b'GRPH'
+#   version  B   format version
+#   kind     B   payload layout (KIND_DENSE or KIND_CSR)
+#   dtype    B   weight dtype code (see DTYPES)
+#   flags    B   FLAG_ZLIB if the payload is zlib-compressed
+#   rows     Q   number of vertices
+#   cols     Q   dense: number of columns, CSR: number of edges
+#   payload      dense: raw weights, row-major, infinity encoded natively
+#                       (or as the dtype's sentinel for integer weights)
+#                CSR:   indptr (int64, rows + 1), indices (int32, cols),
+#                       weights (cols)
+MAGIC = b'GRPH'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sBBBBQQ')
+
+KIND_DENSE = 0
+KIND_CSR = 1
+
+FLAG_ZLIB = 0x01
+
+DTYPES = {
+    1: np.dtype('<f4'),
+    2: np.dtype('<f8'),
+    3: np.dtype('<i4'),
+}
+DTYPE_CODES = {dtype: code for code, dtype in DTYPES.items()}
+
+# Integer weights have no infinity, so "no edge" is stored as the max value
+INT_SENTINEL = np.iinfo(np.int32).max
+
+
+class GraphFormatError(ValueError):
+    pass
+
+
+def _pick_dtype(weights: np.ndarray) -> np.dtype:
+    # float32 when that round-trips exactly (always true for generated graphs)
+    as_f4 = weights.astype(np.float32)
+    if np.array_equal(as_f4, weights, equal_nan=True):
+        return DTYPES[1]
+    return DTYPES[2]
+
+
+def _resolve_dtype(weights: np.ndarray, dtype) -> np.dtype:
+    dtype = _pick_dtype(weights) if dtype is None else np.dtype(dtype).newbyteorder('<')
+    if dtype not in DTYPE_CODES:
+        raise GraphFormatError(f"unsupported weight dtype {dtype}")
+    return dtype
+
+
+def _pack(kind, dtype, rows, cols, payload: bytes, compress: bool) -> bytes:
+    flags = 0
+    if compress:
+        payload = zlib.compress(payload, 1)
+        flags |= FLAG_ZLIB
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, kind, DTYPE_CODES[dtype], flags, rows, cols)
+    return header + payload
+
+
+def encode_graph(graph: np.ndarray, dtype=None, compress: bool = True) -> bytes:
+    """
+    Encode a dense adjacency matrix as header + raw little-endian weights.
+    `dtype` defaults to float32 when lossless, float64 otherwise.
+    """
+    graph = np.asarray(graph)
+    if graph.ndim != 2:
+        raise GraphFormatError(f"expected a 2-D matrix, got shape {graph.shape}")
+
+    dtype = _resolve_dtype(graph, dtype)
+    if dtype.kind == 'i':
+        weights = np.where(np.isinf(graph), INT_SENTINEL, graph).astype(dtype)
+    else:
+        weights = graph.astype(dtype, copy=False)
+
+    rows, cols = graph.shape
+    payload = np.ascontiguousarray(weights).tobytes()
+    return _pack(KIND_DENSE, dtype, rows, cols, payload, compress)
+
+
+def encode_csr(csr: CSRGraph, dtype=None, compress: bool = True) -> bytes:
+    """Encode a CSR graph; only the real edges are stored."""
+    dtype = _resolve_dtype(csr.weights, dtype)
+    if dtype.kind == 'f' and not np.isfinite(csr.weights).all():
+        raise GraphFormatError("CSR weights must be finite")
+
+    payload = b''.join([
+        csr.indptr.astype('<i8', copy=False).tobytes(),
+        csr.indices.astype('<i4', copy=False).tobytes(),
+        csr.weights.astype(dtype, copy=False).tobytes(),
+    ])
+    return _pack(KIND_CSR, dtype, csr.n, csr.nnz, payload, compress)
+
+
+def _unpack(data):
+    view = memoryview(data)
+    if view.nbytes < HEADER.size or bytes(view[:4]) != MAGIC:
+        raise GraphFormatError("not a binary graph encoding")
+
+    magic, version, kind, code, flags, rows, cols = HEADER.unpack_from(view)
+    if version > FORMAT_VERSION:
+        raise GraphFormatError(f"unsupported graph format version {version}")
+    if kind not in (KIND_DENSE, KIND_CSR):
+        raise GraphFormatError(f"unsupported graph layout {kind}")
+    if code not in DTYPES:
+        raise GraphFormatError(f"unknown weight dtype code {code}")
+
+    payload = view[HEADER.size:]
+    if flags & FLAG_ZLIB:
+        payload = zlib.decompress(payload)
+    return kind, DTYPES[code], rows, cols, payload
+
+
+def _is_legacy(data) -> bool:
+    return isinstance(data, str) or bytes(memoryview(data)[:1]) == b'['
+
+
+def layout_of(data) -> int:
+    """KIND_DENSE or KIND_CSR, read from the header alone."""
+    if _is_legacy(data):
+        return KIND_DENSE
+    return HEADER.unpack_from(memoryview(data))[2]
+
+
+def _dense(stored, rows, cols, payload, dtype) -> np.ndarray:
+    weights = np.frombuffer(payload, dtype=stored, count=rows * cols).reshape(rows, cols)
+    with phase('convert'):
+        if stored.kind == 'i':
+            result = weights.astype(dtype)
+            result[weights == INT_SENTINEL] = np.inf
+            return result
+        return weights.astype(dtype)
+
+
+def _csr(stored, rows, nnz, payload, dtype) -> CSRGraph:
+    indptr = np.frombuffer(payload, dtype='<i8', count=rows + 1)
+    offset = indptr.nbytes
+    indices = np.frombuffer(payload, dtype='<i4', count=nnz, offset=offset)
+    offset += indices.nbytes
+    weights = np.frombuffer(payload, dtype=stored, count=nnz, offset=offset)
+    with phase('convert'):
+        return CSRGraph(indptr, indices, weights.astype(dtype))
+
+
+def decode_graph(data, dtype=np.float64) -> np.ndarray:
+    """
+    Decode Graph.data into a dense NumPy matrix of `dtype`.
+    Legacy rows holding the old JSON encoding are read transparently.
+    """
+    if _is_legacy(data):
+        text = data if isinstance(data, str) else bytes(data).decode()
+        return decode_legacy_json(text, dtype=dtype)
+
+    kind, stored, rows, cols, payload = _unpack(data)
+    if kind == KIND_CSR:
+        return _csr(stored, rows, cols, payload, dtype).to_dense()
+    return _dense(stored, rows, cols, payload, dtype)
+
+
+def decode_csr(data, dtype=np.float64) -> CSRGraph:
+    """Decode Graph.data into a CSRGraph, converting dense rows if needed."""
+    if _is_legacy(data):
+        return CSRGraph.from_dense(decode_graph(data, dtype=dtype))
+
+    kind, stored, rows, cols, payload = _unpack(data)
+    if kind == KIND_DENSE:
+        dense = _dense(stored, rows, cols, payload, dtype)
+        with phase('convert'):
+            return CSRGraph.from_dense(dense)
+    return _csr(stored, rows, cols, payload, dtype)
+
+
+def encode_legacy_json(graph: np.ndarray) -> str:
+    # Nested lists with None for infinity, as Graph.data used to hold
+    matrix = np.asarray(graph).astype(object)
+    matrix[np.isinf(np.asarray(graph, dtype=float))] = None
+    return json.dumps(matrix.tolist())
+
+
+def decode_legacy_json(text: str, dtype=np.float64) -> np.ndarray:
+    matrix = np.array(json.loads(text), dtype=object)
+    matrix[matrix == None] = np.inf  # noqa: E711 (elementwise comparison)
+    return matrix.astype(dtype)
@@ -0,0 +1,455 @@
+import io
+import itertools
+import os
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+import numpy as np
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from src.utils.csr import CSRGraph
+from src.utils.graph import edge_density
+from src.utils.process import dead_owners, process_owner
+from .models import Graph, GraphImport
+
+# Streaming readers for uploaded graphs. Every reader yields EdgeChunks of at
+# most CHUNK_EDGES edges, so memory grows with the number of edges (which
+# the CSR result needs anyway) and never with n*n or the file size:
+#
+#   csv, tsv, txt  edge list "src<sep>dst[<sep>weight]", 0-based ids, weight
+#                  1 when missing; '#' and '%' comments and one header line
+#                  are skipped (txt splits on any whitespace)
+#   mtx            Matrix Market coordinate matrix (real, integer or
+#                  pattern; general, symmetric or skew-symmetric), 1-based
+#   npy            an (m, 2) or (m, 3) array of edges, memory-mapped
+#   npz            `edges` as in npy, or `src`/`dst`[/`weights`] arrays, or a
+#                  scipy.sparse matrix saved with save_npz (coo or csr)
+
+CHUNK_EDGES = 1 << 20
+
+EXTENSIONS = {'.csv': 'csv', '.tsv': 'tsv', '.txt': 'txt', '.edges': 'txt',
+              '.mtx': 'mtx', '.npy': 'npy', '.npz': 'npz'}
+DELIMITERS = {'csv': ',', 'tsv': '\t', 'txt': None}
+
+
+class GraphImportError(ValueError):
+    pass
+
+
+class EdgeChunk(NamedTuple):
+    src: np.ndarray      # float or int, validated by build_csr
+    dst: np.ndarray
+    weights: np.ndarray
+    first: int           # index of the chunk's first edge, for error messages
+
+
+def format_for(filename: str):
+    return EXTENSIONS.get(os.path.splitext(filename)[1].lower())
+
+
+class _CountingReader(io.RawIOBase):
+    """Binary file wrapper that reports the fraction of it read so far."""
+
+    def __init__(self, raw, total: int, progress=None):
+        self.raw = raw
+        self.total = max(total, 1)
+        self.progress = progress
+        self.consumed = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        count = self.raw.readinto(buffer)
+        self.consumed += count or 0
+        if self.progress is not None:
+            self.progress(self.consumed / self.total)
+        return count
+
+
+def _parse_rows(lines, delimiter, first_line: int) -> np.ndarray:
+    try:
+        rows = np.loadtxt(lines, delimiter=delimiter, comments=('#', '%'), ndmin=2, dtype=np.float64)
+    except ValueError as e:
+        raise GraphImportError(f"lines {first_line}-{first_line + len(lines) - 1}: {e}") from None
+    if rows.size and rows.shape[1] not in (2, 3):
+        raise GraphImportError(f"lines {first_line}-{first_line + len(lines) - 1}: "
+                               f"expected 2 or 3 columns, got {rows.shape[1]}")
+    return rows
+
+
+def _is_header(line: str, delimiter) -> bool:
+    for token in line.strip().split(delimiter)[:2]:
+        try:
+            float(token)
+        except ValueError:
+            return True
+    return False
+
+
+def read_edge_list(stream, fmt: str, chunk_edges: int = CHUNK_EDGES):
+    """(None, chunks) for a text edge list; the vertex count comes from the ids."""
+    delimiter = DELIMITERS[fmt]
+    text = io.TextIOWrapper(stream, encoding='utf-8', errors='strict', newline='')
+
+    def chunks():
+        line_no, edges, checked_header = 1, 0, False
+        while True:
+            lines = list(itertools.islice(text, chunk_edges))
+            if not lines:
+                return
+            start = line_no
+            line_no += len(lines)
+            if not checked_header:
+                data = [i for i, line in enumerate(lines) if line.strip() and line.lstrip()[0] not in '#%']
+                if data and _is_header(lines[data[0]], delimiter):
+                    lines[data[0]] = ''
+                checked_header = bool(data)
+            rows = _parse_rows(lines, delimiter, start)
+            if len(rows):
+                weights = rows[:, 2] if rows.shape[1] == 3 else np.ones(len(rows))
+                yield EdgeChunk(rows[:, 0], rows[:, 1], weights, edges)
+                edges += len(rows)
+
+    return None, chunks()
+
+
+def read_matrix_market(stream, chunk_edges: int = CHUNK_EDGES):
+    """(n, chunks) for a Matrix Market coordinate file; ids are shifted to 0-based."""
+    text = io.TextIOWrapper(stream, encoding='utf-8', errors='strict', newline='')
+    banner = text.readline().split()
+    if len(banner) != 5 or banner[0].lower() != '%%matrixmarket' or banner[1].lower() != 'matrix':
+        raise GraphImportError("not a Matrix Market file (missing %%MatrixMarket matrix banner)")
+    layout, field, symmetry = (token.lower() for token in banner[2:])
+    if layout != 'coordinate':
+        raise GraphImportError("only coordinate Matrix Market files are supported, not dense arrays")
+    if field not in ('real', 'integer', 'pattern'):
+        raise GraphImportError(f"unsupported Matrix Market field '{field}'")
+    if symmetry not in ('general', 'symmetric', 'skew-symmetric'):
+        raise GraphImportError(f"unsupported Matrix Market symmetry '{symmetry}'")
+
+    line = text.readline()
+    while line.startswith('%') or not line.strip():
+        if not line:
+            raise GraphImportError("Matrix Market file has no size line")
+        line = text.readline()
+    try:
+        rows, cols, nnz = (int(token) for token in line.split())
+    except ValueError:
+        raise GraphImportError(f"bad Matrix Market size line: {line.strip()!r}") from None
+    if rows != cols:
+        raise GraphImportError(f"adjacency matrix must be square, got {rows} x {cols}")
+
+    def chunks():
+        edges = 0
+        while True:
+            lines = list(itertools.islice(text, chunk_edges))
+            if not lines:
+                break
+            entries = _parse_rows(lines, None, edges + 1)
+            if not len(entries):
+                continue
+            src, dst = entries[:, 0] - 1, entries[:, 1] - 1
+            weights = np.ones(len(entries)) if field == 'pattern' else entries[:, 2]
+            if field != 'pattern' and entries.shape[1] != 3:
+                raise GraphImportError(f"entries after {edges}: {field} entries need a value")
+            yield EdgeChunk(src, dst, weights, edges)
+            edges += len(entries)
+            if symmetry != 'general':
+                # Only one triangle is stored; mirror the off-diagonal entries
+                off = src != dst
+                mirrored = -weights[off] if symmetry == 'skew-symmetric' else weights[off]
+                yield EdgeChunk(dst[off], src[off], mirrored, edges)
+        if edges != nnz:
+            raise GraphImportError(f"Matrix Market header announces {nnz} entries, file has {edges}")
+
+    return rows, chunks()
+
+
+def _array_chunks(columns, chunk_edges: int):
+    """EdgeChunks from equally long 1-D arrays (src, dst, weights or None)."""
+    src, dst, weights = columns
+    for start in range(0, len(src), chunk_edges):
+        stop = start + chunk_edges
+        yield EdgeChunk(np.asarray(src[start:stop]), np.asarray(dst[start:stop]),
+                        np.ones(len(src[start:stop])) if weights is None else np.asarray(weights[start:stop]),
+                        start)
+
+
+def _edge_columns(edges, name: str):
+    if edges.ndim != 2 or edges.shape[1] not in (2, 3):
+        raise GraphImportError(f"{name} must have shape (m, 2) or (m, 3), got {edges.shape}")
+    return edges[:, 0], edges[:, 1], edges[:, 2] if edges.shape[1] == 3 else None
+
+
+def read_npy(path, chunk_edges: int = CHUNK_EDGES):
+    """(None, chunks) for an .npy edge array; memory-mapped, so read chunk by chunk."""
+    try:
+        edges = np.load(path, mmap_mode='r', allow_pickle=False)
+    except ValueError as e:
+        raise GraphImportError(f"not a readable .npy file: {e}") from None
+    return None, _array_chunks(_edge_columns(edges, "the .npy array"), chunk_edges)
+
+
+def _npz_member(archive: zipfile.ZipFile, name: str):
+    """
+    A member of an .npz as a lazily read 1-D array-like: slices are read
+    from the (decompressing) member stream in order, never all at once.
+    """
+    stream = archive.open(name + '.npy')
+    version = np.lib.format.read_magic(stream)
+    if version == (1, 0):
+        shape, fortran, dtype = np.lib.format.read_array_header_1_0(stream)
+    else:
+        shape, fortran, dtype = np.lib.format.read_array_header_2_0(stream)
+    if dtype.hasobject:
+        raise GraphImportError(f"{name}: object arrays are not supported")
+    return _StreamedArray(stream, shape, fortran, dtype, name)
+
+
+class _StreamedArray:
+    def __init__(self, stream, shape, fortran, dtype, name):
+        self.stream, self.shape, self.fortran, self.dtype, self.name = stream, shape, fortran, dtype, name
+        self.ndim = len(shape)
+        self._position = 0
+
+    def __len__(self):
+        return self.shape[0] if self.shape else 1
+
+    def read_all(self) -> np.ndarray:
+        data = self.stream.read()
+        array = np.frombuffer(data, dtype=self.dtype)
+        return array.reshape(self.shape, order='F' if self.fortran else 'C')
+
+    def __getitem__(self, index: slice) -> np.ndarray:
+        # Only the forward, in-order slicing _array_chunks does
+        start, stop, _ = index.indices(len(self))
+        if self.ndim != 1 or start != self._position:
+            raise GraphImportError(f"{self.name}: expected a 1-D array")
+        count = stop - start
+        data = self.stream.read(count * self.dtype.itemsize)
+        self._position = stop
+        return np.frombuffer(data, dtype=self.dtype, count=count)
+
+
+def read_npz(path, chunk_edges: int = CHUNK_EDGES):
+    """(n or None, chunks) for an .npz; members are streamed out of the archive."""
+    try:
+        archive = zipfile.ZipFile(path)
+    except zipfile.BadZipFile:
+        raise GraphImportError("not a readable .npz file") from None
+    names = {name[:-4] for name in archive.namelist() if name.endswith('.npy')}
+
+    if 'format' in names:
+        # scipy.sparse.save_npz: square sparse matrix in coo or csr format
+        kind = _npz_member(archive, 'format').read_all().item()
+        kind = kind.decode() if isinstance(kind, bytes) else str(kind)
+        shape = _npz_member(archive, 'shape').read_all().tolist()
+        if len(shape) != 2 or shape[0] != shape[1]:
+            raise GraphImportError(f"adjacency matrix must be square, got shape {shape}")
+        if kind == 'coo':
+            columns = [_npz_member(archive, key) for key in ('row', 'col', 'data')]
+            return shape[0], _array_chunks(columns, chunk_edges)
+        if kind == 'csr':
+            indptr = _npz_member(archive, 'indptr').read_all().astype(np.int64)
+            indices, data = _npz_member(archive, 'indices'), _npz_member(archive, 'data')
+
+            def chunks():
+                for start in range(0, len(indices), chunk_edges):
+                    dst = indices[start:start + chunk_edges]
+                    # Row of each stored entry, from the row pointers
+                    src = np.searchsorted(indptr, np.arange(start, start + len(dst)), side='right') - 1
+                    yield EdgeChunk(src, dst, data[start:start + chunk_edges], start)
+            return shape[0], chunks()
+        raise GraphImportError(f"unsupported scipy.sparse format '{kind}' (use coo or csr)")
+
+    if 'edges' in names:
+        edges = _npz_member(archive, 'edges').read_all()
+        return None, _array_chunks(_edge_columns(edges, "edges"), chunk_edges)
+    if {'src', 'dst'} <= names:
+        columns = [_npz_member(archive, key) if key in names else None for key in ('src', 'dst', 'weights')]
+        if any(column is not None and column.ndim != 1 for column in columns):
+            raise GraphImportError("src, dst and weights must be 1-D arrays")
+        if columns[2] is not None and len(columns[2]) != len(columns[0]) or len(columns[1]) != len(columns[0]):
+            raise GraphImportError("src, dst and weights must have the same length")
+        return None, _array_chunks(columns, chunk_edges)
+    raise GraphImportError("an .npz needs an `edges` array, `src`/`dst` arrays or a scipy.sparse matrix")
+
+
+def _reporting(chunks, total_bytes: int, progress):
+    """Pass chunks through, reporting progress as the bytes their edges take up."""
+    consumed = 0
+    for chunk in chunks:
+        consumed += chunk.src.nbytes + chunk.dst.nbytes + chunk.weights.nbytes
+        progress(min(consumed / max(total_bytes, 1), 1.0))
+        yield chunk
+
+
+def build_csr(chunks, size=None, undirected: bool = False) -> CSRGraph:
+    """
+    Validate EdgeChunks and assemble them into a CSR graph with `size`
+    vertices (default: largest id + 1); either way at most
+    settings.GRAPH_IMPORT_MAX_VERTICES. Ids must be integers in range and
+    weights finite; parallel edges keep the smallest weight and
+    non-negative self loops, which never shorten a path, are dropped.
+    """
+    max_vertices = min(settings.GRAPH_IMPORT_MAX_VERTICES, np.iinfo(np.int32).max)
+    if size is not None and size > max_vertices:
+        raise GraphImportError(f"{size} vertices is more than the import limit of {max_vertices}")
+    limit = size if size is not None else max_vertices
+    sources, targets, weights = [], [], []
+    largest = -1
+    for chunk in chunks:
+        for name, ids in (('source', chunk.src), ('target', chunk.dst)):
+            ids = np.asarray(ids)
+            bad = np.flatnonzero((ids < 0) | (ids >= limit) | (ids != np.floor(ids)))
+            if bad.size:
+                raise GraphImportError(f"edge {chunk.first + bad[0]}: {name} id {ids[bad[0]]:.15g} "
+                                       f"is not an integer in [0, {limit})")
+        w = np.asarray(chunk.weights, dtype=np.float64)
+        bad = np.flatnonzero(~np.isfinite(w))
+        if bad.size:
+            raise GraphImportError(f"edge {chunk.first + bad[0]}: weight {w[bad[0]]} is not finite")
+
+        src = np.asarray(chunk.src).astype(np.int64)
+        dst = np.asarray(chunk.dst).astype(np.int32)
+        keep = (src != dst) | (w < 0)
+        sources.append(src[keep])
+        targets.append(dst[keep])
+        weights.append(w[keep])
+        if len(src):
+            largest = max(largest, int(src.max()), int(dst.max()))
+
+    n = size if size is not None else largest + 1
+    if n < 1:
+        raise GraphImportError("the file contains no edges")
+    src = np.concatenate(sources) if sources else np.empty(0, dtype=np.int64)
+    dst = np.concatenate(targets) if targets else np.empty(0, dtype=np.int32)
+    w = np.concatenate(weights) if weights else np.empty(0)
+    del sources, targets, weights
+    if undirected:
+        src, dst, w = np.concatenate((src, dst)), np.concatenate((dst, src.astype(np.int32))), np.concatenate((w, w))
+
+    # Parallel edges: sort by (src, dst, weight) and keep the first of each pair
+    order = np.lexsort((w, dst, src))
+    src, dst, w = src[order], dst[order], w[order]
+    first = np.ones(len(src), dtype=bool)
+    first[1:] = (src[1:] != src[:-1]) | (dst[1:] != dst[:-1])
+    return CSRGraph.from_edges(n, src[first], dst[first], w[first])
+
+
+def read_graph(path, fmt: str, size=None, undirected: bool = False, progress=None,
+               chunk_edges: int = CHUNK_EDGES) -> CSRGraph:
+    """
+    Stream the file at `path` (format `fmt`, see EXTENSIONS) into a CSR
+    graph. `progress(fraction)` is called as the file is read. Raises
+    GraphImportError for malformed input.
+    """
+    if fmt in ('npy', 'npz'):
+        n, chunks = (read_npy if fmt == 'npy' else read_npz)(path, chunk_edges)
+        if progress is not None:
+            chunks = _reporting(chunks, os.path.getsize(path), progress)
+        return build_csr(chunks, size if size is not None else n, undirected)
+
+    with open(path, 'rb', buffering=0) as raw:
+        stream = io.BufferedReader(_CountingReader(raw, os.path.getsize(path), progress))
+        if fmt == 'mtx':
+            n, chunks = read_matrix_market(stream, chunk_edges)
+            if size is not None and size != n:
+                raise GraphImportError(f"size {size} does not match the Matrix Market header ({n})")
+        else:
+            n, chunks = read_edge_list(stream, fmt, chunk_edges)
+        try:
+            return build_csr(chunks, size if size is not None else n, undirected)
+        except UnicodeDecodeError as e:
+            raise GraphImportError(f"not a UTF-8 text file: {e}") from None
+
+
+class ImportProgress:
+    """Writes progress to the import row at most once per `interval` seconds."""
+
+    def __init__(self, import_id, interval=0.5):
+        self.import_id = import_id
+        self.interval = interval
+        self._last = 0.0
+
+    def __call__(self, fraction: float):
+        now = time.monotonic()
+        if now - self._last >= self.interval:
+            self._last = now
+            GraphImport.objects.filter(id=self.import_id).update(progress=min(max(fraction, 0.0), 1.0))
+
+
+def run_import(import_id: int, path: str, size=None):
+    """Parse the upload at `path` into a new Graph and record the outcome; deletes `path`."""
+    record = GraphImport.objects.get(id=import_id)
+    GraphImport.objects.filter(id=import_id).update(status=GraphImport.RUNNING)
+    outcome = {'status': GraphImport.SUCCEEDED, 'progress': 1.0}
+    try:
+        csr = read_graph(path, record.format, size, record.undirected, ImportProgress(import_id))
+        density = edge_density(csr.n, csr.nnz)
+        graph_obj = Graph(size=csr.n, density=density, model='import')
+        # Same storage rule as generated graphs
+        if density <= settings.GRAPH_CSR_MAX_DENSITY:
+            graph_obj.save_csr(csr)
+        else:
+            graph_obj.save_graph(csr.to_dense())
+        outcome['graph'] = graph_obj
+    except GraphImportError as e:
+        outcome = {'status': GraphImport.FAILED, 'error': str(e)}
+    except Exception as e:
+        outcome = {'status': GraphImport.FAILED, 'error': f"{type(e).__name__}: {e}"}
+    finally:
+        os.unlink(path)
+    GraphImport.objects.filter(id=import_id).update(finished_at=timezone.now(), **outcome)
+
+
+_pool = ThreadPoolExecutor(max_workers=settings.GRAPH_IMPORT_WORKERS, thread_name_prefix='graph-import')
+_reconciled = False
+_reconcile_lock = threading.Lock()
+
+
+def fail_orphaned_imports():
+    """Once per process: fail imports left queued/running by a server process that has exited."""
+    global _reconciled
+    with _reconcile_lock:
+        if _reconciled:
+            return
+        _reconciled = True
+    active = GraphImport.objects.filter(status__in=[GraphImport.QUEUED, GraphImport.RUNNING])
+    dead = dead_owners(active.values_list('owner', flat=True).distinct())
+    if dead:
+        active.filter(owner__in=dead).update(
+            status=GraphImport.FAILED, error="Interrupted: the server process running it exited",
+            finished_at=timezone.now())
+
+
+def _work(import_id: int, path: str, size):
+    try:
+        run_import(import_id, path, size)
+    finally:
+        # Pool threads get their own database connection; don't leak it
+        connection.close()
+
+
+def start_import(upload, fmt: str, size=None, undirected: bool = False) -> GraphImport:
+    """
+    Spool `upload` (a Django UploadedFile) to disk chunk by chunk and queue
+    it for parsing on the import pool (settings.GRAPH_IMPORT_WORKERS
+    threads); poll the returned GraphImport for progress.
+    """
+    fail_orphaned_imports()
+    spool = tempfile.NamedTemporaryFile(prefix='graph-import-', suffix='.' + fmt,
+                                        dir=settings.GRAPH_IMPORT_DIR, delete=False)
+    with spool:
+        for chunk in upload.chunks():
+            spool.write(chunk)
+    record = GraphImport.objects.create(filename=os.path.basename(upload.name or '')[:255], format=fmt,
+                                        size_bytes=upload.size, undirected=undirected,
+                                        owner=process_owner())
+    _pool.submit(_work, record.id, spool.name, size)
+    return record
@@ -0,0 +1,53 @@
+from django.db import migrations, models
+
+from src.graph.codec import decode_graph, encode_graph, encode_legacy_json
+
+
+def json_to_binary(apps, schema_editor):
+    Graph = apps.get_model('graph', 'Graph')
+    for graph in Graph.objects.only('id', 'data').iterator():
+        graph.blob = encode_graph(decode_graph(graph.data))
+        graph.save(update_fields=['blob'])
+
+
+def binary_to_json(apps, schema_editor):
+    Graph = apps.get_model('graph', 'Graph')
+    for graph in Graph.objects.only('id', 'blob').iterator():
+        graph.data = encode_legacy_json(decode_graph(graph.blob))
+        graph.save(update_fields=['data'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('graph', '0001_initial'),
+    ]
+
+    operations = [
+        # Nullable first so that unapplying can re-add the column before refilling it
+        migrations.AlterField(
+            model_name='graph',
+            name='data',
+            field=models.TextField(null=True),
+        ),
+        migrations.AddField(
+            model_name='graph',
+            name='blob',
+            field=models.BinaryField(null=True),
+        ),
+        migrations.RunPython(json_to_binary, binary_to_json),
+        migrations.RemoveField(
+            model_name='graph',
+            name='data',
+        ),
+        migrations.RenameField(
+            model_name='graph',
+            old_name='blob',
+            new_name='data',
+        ),
+        migrations.AlterField(
+            model_name='graph',
+            name='data',
+            field=models.BinaryField(),
+        ),
+    ]
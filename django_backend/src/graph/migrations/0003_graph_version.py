@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('graph', '0002_binary_graph_data'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='graph',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
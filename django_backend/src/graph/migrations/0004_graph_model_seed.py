@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('graph', '0003_graph_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='graph',
+            name='model',
+            field=models.CharField(default='erdos_renyi', max_length=32),
+        ),
+        migrations.AddField(
+            model_name='graph',
+            name='seed',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('graph', '0004_graph_model_seed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='graph',
+            name='layout',
+            field=models.CharField(choices=[('dense', 'Dense matrix'), ('csr', 'Compressed sparse row')], default='dense', max_length=8),
+        ),
+    ]
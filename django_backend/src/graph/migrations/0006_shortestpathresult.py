@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('graph', '0005_graph_layout'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShortestPathResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('graph_version', models.PositiveIntegerField()),
+                ('algorithm', models.CharField(max_length=32)),
+                ('backend', models.CharField(max_length=16)),
+                ('source', models.IntegerField(default=-1)),
+                ('data', models.BinaryField()),
+                ('size_bytes', models.PositiveIntegerField()),
+                ('time_seconds', models.FloatField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('graph', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='results', to='graph.graph')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('graph', 'graph_version', 'algorithm', 'backend', 'source'), name='unique_shortest_path_result')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('graph', '0006_shortestpathresult'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GraphImport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('filename', models.CharField(max_length=255)),
+                ('format', models.CharField(max_length=8)),
+                ('size_bytes', models.PositiveBigIntegerField()),
+                ('undirected', models.BooleanField(default=False)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], db_index=True, default='queued', max_length=16)),
+                ('progress', models.FloatField(default=0.0)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(null=True)),
+                ('graph', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='imports', to='graph.graph')),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('graph', '0007_graphimport'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='graph',
+            name='path',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='graph',
+            name='storage',
+            field=models.CharField(choices=[('db', 'Database'), ('file', 'Memory-mapped files')], default='db', max_length=8),
+        ),
+    ]
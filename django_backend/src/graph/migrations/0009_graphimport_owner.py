@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('graph', '0008_graph_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='graphimport',
+            name='owner',
+            field=models.CharField(blank=True, default='', max_length=128),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('graph', '0009_graphimport_owner'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shortestpathresult',
+            name='method',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+    ]
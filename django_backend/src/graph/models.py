@@ -1,27 +1,164 @@
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 import numpy as np
-import json
+from src.utils.csr import CSRGraph
+from .codec import encode_graph, encode_csr, decode_graph, decode_csr
+from .store import graph_store
 
 class Graph(models.Model):
+    DENSE = 'dense'
+    CSR = 'csr'
+    LAYOUTS = [(DENSE, 'Dense matrix'), (CSR, 'Compressed sparse row')]
+
+    DATABASE = 'db'
+    FILE = 'file'
+    STORAGES = [(DATABASE, 'Database'), (FILE, 'Memory-mapped files')]
+
     size = models.IntegerField()
     density = models.FloatField()
-    data = models.TextField()  # To store the graph as a JSON string
-
-    def save_graph(self, graph: np.ndarray):
-        # Convert numpy array to nested Python lists, with None for infinity
-        matrix = graph.tolist()
-        sanitized = [
-            [None if val == float('inf') else val for val in row]
-            for row in matrix
-        ]
-        self.data = json.dumps(sanitized)
+    data = models.BinaryField()  # Binary matrix or CSR encoding, see codec.py (empty for FILE)
+    layout = models.CharField(max_length=8, choices=LAYOUTS, default=DENSE)
+    version = models.PositiveIntegerField(default=1)  # Bumped whenever data changes
+    model = models.CharField(max_length=32, default='erdos_renyi')  # Generator model
+    seed = models.BigIntegerField(null=True, blank=True)  # Regenerates the same graph
+    # Where the arrays live; FILE graphs keep them under GRAPH_STORE_DIR/<path>, see store.py
+    storage = models.CharField(max_length=8, choices=STORAGES, default=DATABASE)
+    path = models.CharField(max_length=255, blank=True, default='')
+
+    def _store(self, data: bytes, layout: str):
+        if self.pk is not None:
+            self.version += 1
+        self.data = data
+        self.layout = layout
+        self.storage = self.DATABASE
+        self.path = ''
+        self.save()
+
+    def _store_files(self, arrays: dict, layout: str):
+        with transaction.atomic():
+            if self.pk is None:
+                # The directory is named after the id, so take one first
+                self.data, self.layout, self.storage = b'', layout, self.FILE
+                self.save()
+            else:
+                self.version += 1
+            self.path = graph_store.write(self.pk, self.version, arrays)
+            self.data = b''
+            self.layout = layout
+            self.storage = self.FILE
+            self.save()
+            graph_id, version = self.pk, self.version
+            transaction.on_commit(lambda: graph_store.prune(graph_id, version))
+
+    def _use_files(self) -> bool:
+        # New graphs follow settings.GRAPH_STORAGE; existing ones keep their storage
+        return (self.storage if self.pk is not None else settings.GRAPH_STORAGE) == self.FILE
+
+    def save_graph(self, graph: np.ndarray, compress: bool = True):
+        if self._use_files():
+            self._store_files({'matrix': np.asarray(graph, dtype=np.float64)}, self.DENSE)
+            return
+        # Header + raw little-endian weights; infinity is stored natively
+        self._store(encode_graph(graph, compress=compress), self.DENSE)
+
+    def save_csr(self, csr: CSRGraph, compress: bool = True):
+        # Only real edges are stored, so sparse graphs never need n*n memory
+        if self._use_files():
+            self._store_files({
+                'indptr': csr.indptr.astype(np.int64, copy=False),
+                'indices': csr.indices.astype(np.int32, copy=False),
+                'weights': csr.weights.astype(np.float64, copy=False),
+            }, self.CSR)
+            return
+        self._store(encode_csr(csr, compress=compress), self.CSR)
+
+    def move_to(self, storage: str):
+        """Rewrite the stored arrays into `storage`; the data and version stay the same."""
+        if storage == self.storage:
+            return
+        if storage == self.FILE:
+            if self.layout == self.DENSE:
+                arrays = {'matrix': self.get_graph()}
+            else:
+                csr = self.get_csr()
+                arrays = {'indptr': csr.indptr, 'indices': csr.indices, 'weights': csr.weights}
+            self.path = graph_store.write(self.pk, self.version, arrays)
+            self.data = b''
+        else:
+            self.data = encode_graph(self.get_graph()) if self.layout == self.DENSE else encode_csr(self.get_csr())
+            graph_id = self.pk
+            transaction.on_commit(lambda: graph_store.remove(graph_id))
+            self.path = ''
+        self.storage = storage
         self.save()
 
-    def get_graph(self) -> np.ndarray:
-        # Load JSON and convert None back to infinity
-        matrix = json.loads(self.data)
-        restored = [
-            [float('inf') if val is None else val for val in row]
-            for row in matrix
+    def get_graph(self, dtype=np.float64) -> np.ndarray:
+        if self.storage == self.FILE:
+            if self.layout == self.DENSE:
+                # Read-only and shared with every other process mapping it
+                return graph_store.load(self.path, 'matrix', dtype)
+            return self.get_csr(dtype).to_dense()
+        # Decodes straight from the stored buffer (legacy JSON rows included)
+        return decode_graph(self.data, dtype=dtype)
+
+    def get_csr(self, dtype=np.float64) -> CSRGraph:
+        if self.storage == self.FILE:
+            if self.layout == self.DENSE:
+                return CSRGraph.from_dense(self.get_graph(dtype))
+            return CSRGraph(graph_store.load(self.path, 'indptr'), graph_store.load(self.path, 'indices'),
+                            graph_store.load(self.path, 'weights', dtype))
+        return decode_csr(self.data, dtype=dtype)
+
+
+@receiver(post_delete, sender=Graph)
+def _remove_graph_files(sender, instance, **kwargs):
+    if instance.storage == Graph.FILE:
+        graph_id = instance.pk
+        transaction.on_commit(lambda: graph_store.remove(graph_id))
+
+class ShortestPathResult(models.Model):
+    """A stored distance vector/matrix, valid for one version of a graph."""
+    ALL_PAIRS = -1
+
+    graph = models.ForeignKey(Graph, on_delete=models.CASCADE, related_name='results')
+    graph_version = models.PositiveIntegerField()
+    algorithm = models.CharField(max_length=32)
+    backend = models.CharField(max_length=16)
+    source = models.IntegerField(default=ALL_PAIRS)  # ALL_PAIRS for distance matrices
+    data = models.BinaryField()  # Distances encoded with codec.encode_graph
+    size_bytes = models.PositiveIntegerField()
+    time_seconds = models.FloatField()  # Compute time of the original run
+    method = models.CharField(max_length=32, blank=True, default='')  # Variant that produced it, if recorded
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['graph', 'graph_version', 'algorithm', 'backend', 'source'],
+                name='unique_shortest_path_result',
+            ),
         ]
-        return np.array(restored)
+
+
+class GraphImport(models.Model):
+    """An uploaded graph file being parsed into a Graph (see importers.py)."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUSES = [(QUEUED, 'Queued'), (RUNNING, 'Running'), (SUCCEEDED, 'Succeeded'), (FAILED, 'Failed')]
+
+    filename = models.CharField(max_length=255)
+    format = models.CharField(max_length=8)  # importers.EXTENSIONS value
+    size_bytes = models.PositiveBigIntegerField()
+    undirected = models.BooleanField(default=False)
+    status = models.CharField(max_length=16, choices=STATUSES, default=QUEUED, db_index=True)
+    progress = models.FloatField(default=0.0)  # 0..1 of the file read so far
+    graph = models.ForeignKey(Graph, null=True, on_delete=models.SET_NULL, related_name='imports')
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True)
+    owner = models.CharField(max_length=128, blank=True, default='')  # Server process parsing it, see utils/process.py
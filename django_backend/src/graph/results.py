@@ -0,0 +1,111 @@
+import numpy as np
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import Sum
+from django.utils import timezone
+from src.utils.metrics import label_request, phase
+from .codec import encode_graph, decode_graph
+from .models import ShortestPathResult
+
+
+class ResultStore:
+    """
+    Persistent cache of shortest-path results in the database, keyed by
+    (graph id, graph version, algorithm, backend, source) and bounded by
+    total encoded size with least-recently-used eviction.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def _key(graph_obj, algorithm, backend, source):
+        return {
+            'graph_id': graph_obj.id,
+            'graph_version': graph_obj.version,
+            'algorithm': algorithm,
+            'backend': backend,
+            'source': ShortestPathResult.ALL_PAIRS if source is None else source,
+        }
+
+    def get(self, graph_obj, algorithm, backend, source=None):
+        """(distances, time_seconds) of a stored run, or None."""
+        hit = self._get(graph_obj, algorithm, backend, source)
+        return hit and hit[:2]
+
+    def get_all_pairs(self, graph_obj, algorithm, backend, method):
+        """
+        (distances, time_seconds, method that produced them or None) of a
+        stored all-pairs run usable for `method`, or None. Floyd-Warshall
+        leaves negative cycles on the diagonal but Johnson must report them,
+        so such a matrix is never served to Johnson.
+        """
+        hit = self._get(graph_obj, algorithm, backend, None)
+        if hit is None or (method == 'johnson' and (np.diagonal(hit[0]) < 0).any()):
+            return None
+        return hit[0], hit[1], hit[2] or None
+
+    def _get(self, graph_obj, algorithm, backend, source):
+        label_request(algorithm=algorithm, backend=backend)
+        key = self._key(graph_obj, algorithm, backend, source)
+        with phase('cache'):
+            row = ShortestPathResult.objects.filter(**key).only('id', 'data', 'time_seconds', 'method').first()
+            if row is None:
+                return None
+            ShortestPathResult.objects.filter(id=row.id).update(last_used=timezone.now())
+            distances = decode_graph(row.data)
+        if source is not None:
+            distances = distances.ravel()
+        return distances, row.time_seconds, row.method
+
+    def put(self, graph_obj, algorithm, backend, source, distances: np.ndarray, time_seconds: float,
+            method: str = ''):
+        with phase('cache'):
+            self._put(graph_obj, algorithm, backend, source, distances, time_seconds, method)
+
+    def _put(self, graph_obj, algorithm, backend, source, distances, time_seconds, method):
+        data = encode_graph(np.atleast_2d(distances))
+        if len(data) > self.max_bytes:
+            return
+        try:
+            ShortestPathResult.objects.update_or_create(
+                **self._key(graph_obj, algorithm, backend, source),
+                defaults={'data': data, 'size_bytes': len(data), 'time_seconds': time_seconds,
+                          'method': method, 'last_used': timezone.now()},
+            )
+        except IntegrityError:
+            # A concurrent request stored the same result first
+            return
+        self._evict()
+
+    def get_or_compute(self, graph_obj, algorithm, backend, compute, source=None):
+        """
+        Return (distances, time_seconds, cached). `compute()` must return
+        (distances, time_seconds) and is only called on a miss; a None
+        result (e.g. on a non-root MPI rank) is passed through unstored.
+        """
+        hit = self.get(graph_obj, algorithm, backend, source)
+        if hit is not None:
+            return hit[0], hit[1], True
+        distances, elapsed = compute()
+        if distances is not None:
+            self.put(graph_obj, algorithm, backend, source, distances, elapsed)
+        return distances, elapsed, False
+
+    def invalidate(self, graph_id: int):
+        ShortestPathResult.objects.filter(graph_id=graph_id).delete()
+
+    def _evict(self):
+        total = ShortestPathResult.objects.aggregate(total=Sum('size_bytes'))['total'] or 0
+        if total <= self.max_bytes:
+            return
+        stale = []
+        for row in ShortestPathResult.objects.order_by('last_used').values('id', 'size_bytes').iterator():
+            if total <= self.max_bytes:
+                break
+            stale.append(row['id'])
+            total -= row['size_bytes']
+        ShortestPathResult.objects.filter(id__in=stale).delete()
+
+
+result_store = ResultStore(settings.RESULT_CACHE_MAX_BYTES)
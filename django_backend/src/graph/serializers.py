@@ -1,27 +1,126 @@
+import inspect
+from django.conf import settings
 from rest_framework import serializers
+import numpy as np
+from src.utils.csr import CSRGraph
 from .models import Graph
-from src.utils.graph import generate_random_graph
+from .codec import encode_legacy_json
+from .cache import graph_cache
+from .results import result_store
+from .importers import EXTENSIONS, format_for
+from src.utils.graph import GENERATORS, generate_edges, edges_to_dense, edge_density
 
 class GraphSerializer(serializers.ModelSerializer):
+    # Graph.data is binary now; keep exposing the JSON matrix clients expect
+    data = serializers.SerializerMethodField()
+    model = serializers.ChoiceField(choices=list(GENERATORS), required=False)
+    # Model-specific generator parameters (dropped for models that don't take them)
+    degree = serializers.IntegerField(min_value=1, required=False, write_only=True)
+    exponent = serializers.FloatField(min_value=2.0, required=False, write_only=True)
+
     class Meta:
         model = Graph
-        fields = ['id', 'size', 'density', 'data']
-        read_only_fields = ['id', 'data']
+        fields = ['id', 'size', 'density', 'model', 'seed', 'degree', 'exponent', 'layout', 'version', 'data']
+        read_only_fields = ['id', 'layout', 'version', 'data']
+        extra_kwargs = {
+            'size': {'min_value': 1},
+            'density': {'required': False, 'min_value': 0.0, 'max_value': 1.0},
+            'seed': {'min_value': 0},
+        }
+
+    def _generate(self, size, density, model, seed, validated_data):
+        # Pass each generator only the parameters its signature takes
+        accepted = inspect.signature(GENERATORS[model]).parameters
+        params = {k: validated_data[k] for k in ('degree', 'exponent') if k in validated_data and k in accepted}
+        if model == 'erdos_renyi':
+            params['density'] = density
+        src, dst, weights = generate_edges(size, model=model, seed=seed, **params)
+        if model != 'erdos_renyi':
+            # Other models don't take a density; record the one they produced
+            density = edge_density(size, len(src))
+        return (src, dst, weights), density
+
+    @staticmethod
+    def _store(graph_obj, size, edges, density):
+        # Sparse graphs go straight from the edge list to CSR, skipping n*n memory
+        if density <= settings.GRAPH_CSR_MAX_DENSITY:
+            graph_obj.save_csr(CSRGraph.from_edges(size, *edges))
+        else:
+            graph_obj.save_graph(edges_to_dense(size, *edges))
+
+    @staticmethod
+    def _seed(validated_data):
+        # Always store a seed so any graph can be reproduced later
+        seed = validated_data.get('seed')
+        if seed is None:
+            seed = int(np.random.default_rng().integers(2 ** 63))
+        return seed
 
     def create(self, validated_data):
         size = validated_data.get('size', 10)
         density = validated_data.get('density', 0.3)
-        
-        graph = generate_random_graph(size=size, density=density)
-        
-        graph_obj = Graph(size=size, density=density)
-        graph_obj.save_graph(graph)
+        model = validated_data.get('model', 'erdos_renyi')
+        seed = self._seed(validated_data)
+
+        edges, density = self._generate(size, density, model, seed, validated_data)
+
+        graph_obj = Graph(size=size, density=density, model=model, seed=seed)
+        self._store(graph_obj, size, edges, density)
         return graph_obj
 
     def update(self, instance, validated_data):
         instance.size = validated_data.get('size', instance.size)
         instance.density = validated_data.get('density', instance.density)
-        
-        graph = generate_random_graph(size=instance.size, density=instance.density)
-        instance.save_graph(graph)
+        instance.model = validated_data.get('model', instance.model)
+        instance.seed = self._seed(validated_data)
+
+        edges, instance.density = self._generate(
+            instance.size, instance.density, instance.model, instance.seed, validated_data)
+        self._store(instance, instance.size, edges, instance.density)
+        graph_cache.invalidate(instance.id)
+        result_store.invalidate(instance.id)
         return instance
+
+    def get_data(self, obj):
+        if obj.layout == Graph.CSR:
+            # Sparse graphs can be far too large to inline as a dense matrix
+            return None
+        return encode_legacy_json(obj.get_graph())
+
+
+class EdgeUpdateSerializer(serializers.Serializer):
+    op = serializers.ChoiceField(choices=['insert', 'reweight', 'delete'])
+    src = serializers.IntegerField(min_value=0)
+    dst = serializers.IntegerField(min_value=0)
+    weight = serializers.FloatField(required=False)
+
+    def validate(self, attrs):
+        if attrs['src'] == attrs['dst']:
+            raise serializers.ValidationError("self loops are not supported")
+        if attrs['op'] == 'delete':
+            attrs.pop('weight', None)
+        elif 'weight' not in attrs or not np.isfinite(attrs['weight']):
+            raise serializers.ValidationError({'weight': f"a finite weight is required to {attrs['op']}"})
+        return attrs
+
+
+class EdgePatchSerializer(serializers.Serializer):
+    edges = EdgeUpdateSerializer(many=True, allow_empty=False)
+
+
+class GraphImportSerializer(serializers.Serializer):
+    file = serializers.FileField(allow_empty_file=False)
+    # Inferred from the file extension when omitted
+    format = serializers.ChoiceField(choices=sorted(set(EXTENSIONS.values())), required=False)
+    # Vertex count; defaults to the Matrix Market/scipy header or the largest id + 1
+    size = serializers.IntegerField(min_value=1, max_value=settings.GRAPH_IMPORT_MAX_VERTICES, required=False)
+    undirected = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        if 'format' not in attrs:
+            fmt = format_for(attrs['file'].name or '')
+            if fmt is None:
+                raise serializers.ValidationError({'format': "can't tell the format from the file name; "
+                                                             f"pass one of {sorted(set(EXTENSIONS.values()))}"})
+            attrs['format'] = fmt
+        return attrs
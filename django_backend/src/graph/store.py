@@ -0,0 +1,97 @@
+import os
+import shutil
+import tempfile
+from pathlib import Path
+import numpy as np
+from django.conf import settings
+from src.utils.metrics import phase
+
+# File-backed graph storage. Each version of a graph is a directory
+#
+#   <GRAPH_STORE_DIR>/<graph id>/<version>/matrix.npy         dense layout
+#   <GRAPH_STORE_DIR>/<graph id>/<version>/{indptr,indices,weights}.npy   CSR
+#
+# written once and never modified, so readers can np.load(mmap_mode='r')
+# them: every process then shares the same page-cache pages instead of
+# decoding a private copy. Weights are stored as float64 (what the
+# algorithms ask for by default); other dtypes are derived once into
+# sibling files such as weights.float32.npy. Once a version commits, all
+# but it and the one before it are removed; processes that still map them
+# keep working, and loaders re-read the row if a version vanishes before
+# they open it (see cache.py).
+
+# Rows converted per step when deriving another dtype of a dense matrix
+CONVERT_BLOCK_BYTES = 64 * 1024 * 1024
+
+
+class GraphStore:
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def _dir(self, relative: str) -> Path:
+        return self.root / relative
+
+    def write(self, graph_id: int, version: int, arrays: dict) -> str:
+        """Store `arrays` ({name: ndarray}) as version `version` of a graph; returns its path."""
+        relative = f"{graph_id}/{version}"
+        target = self._dir(relative)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=f".{version}-", dir=target.parent))
+        try:
+            for name, array in arrays.items():
+                np.save(staging / f"{name}.npy", np.ascontiguousarray(array))
+            if target.exists():
+                # Left behind by a transaction that rolled back
+                shutil.rmtree(target)
+            os.replace(staging, target)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        return relative
+
+    def load(self, relative: str, name: str, dtype=None) -> np.ndarray:
+        """Read-only memory map of one stored array, in `dtype` if given."""
+        path = self._dir(relative) / f"{name}.npy"
+        with phase('load'):
+            array = np.load(path, mmap_mode='r')
+        if dtype is None or np.dtype(dtype) == array.dtype:
+            return array
+        derived = path.with_name(f"{name}.{np.dtype(dtype).name}.npy")
+        if not derived.exists():
+            with phase('convert'):
+                self._convert(array, derived, np.dtype(dtype))
+        with phase('load'):
+            return np.load(derived, mmap_mode='r')
+
+    @staticmethod
+    def _convert(array: np.ndarray, path: Path, dtype: np.dtype):
+        # Block by block into a temporary file, then renamed into place, so
+        # neither memory nor concurrent readers ever see a half-written array
+        staging = path.with_name(f".{path.name}.{os.getpid()}")
+        out = np.lib.format.open_memmap(staging, mode='w+', dtype=dtype, shape=array.shape)
+        row_bytes = max(array[:1].nbytes, 1)
+        step = max(1, CONVERT_BLOCK_BYTES // row_bytes)
+        for start in range(0, len(array), step):
+            out[start:start + step] = array[start:start + step]
+        out.flush()
+        del out
+        os.replace(staging, path)
+
+    def prune(self, graph_id: int, version: int):
+        """
+        Remove the stored versions of a graph older than `version` - 1. The
+        previous version stays for readers that looked up the graph just
+        before `version` committed and have yet to open its files.
+        """
+        graph_dir = self._dir(str(graph_id))
+        if not graph_dir.exists():
+            return
+        for entry in graph_dir.iterdir():
+            if entry.name.isdigit() and int(entry.name) < version - 1:
+                shutil.rmtree(entry, ignore_errors=True)
+
+    def remove(self, graph_id: int):
+        shutil.rmtree(self._dir(str(graph_id)), ignore_errors=True)
+
+
+graph_store = GraphStore(settings.GRAPH_STORE_DIR)
@@ -1,3 +1,383 @@
-from django.test import TestCase
+import os
+import tempfile
+from pathlib import Path
+import numpy as np
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+from src.sequential.algorithms import floyd_warshall_numpy
+from src.utils.csr import CSRGraph
+from src.utils.graph import GENERATORS, edge_density, generate_edges, generate_random_graph
+from src.utils.testing import GraphTestCase, random_graph, stored_graph
+from .cache import load_csr, load_graph
+from .codec import (
+    DTYPES, HEADER, KIND_CSR, KIND_DENSE, GraphFormatError, decode_csr, decode_graph, encode_csr, encode_graph,
+    encode_legacy_json, layout_of,
+)
+from .importers import GraphImportError, build_csr, read_graph, run_import
+from .models import Graph, GraphImport
+from .results import result_store
+from .store import GraphStore, graph_store
+from .updates import _apply, repair_all_pairs, update_edges
 
-# Create your tests here.
+
+class CodecTests(SimpleTestCase):
+    def test_dense_round_trip(self):
+        # Integer weights, so every dtype holds them exactly
+        matrix = np.round(random_graph(30, 0.2, 0))
+        for dtype in (None, np.float32, np.float64, np.int32):
+            data = encode_graph(matrix, dtype=dtype)
+            self.assertEqual(layout_of(data), KIND_DENSE)
+            np.testing.assert_array_equal(decode_graph(data), matrix)
+
+    def test_picks_float64_only_when_needed(self):
+        def stored_dtype(data):
+            return DTYPES[HEADER.unpack_from(data)[3]]
+
+        matrix = np.round(random_graph(30, 0.2, 1))
+        self.assertEqual(stored_dtype(encode_graph(matrix)), np.float32)
+        matrix[0, 1] = 1 + 2 ** -30
+        data = encode_graph(matrix)
+        self.assertEqual(stored_dtype(data), np.float64)
+        self.assertEqual(decode_graph(data)[0, 1], 1 + 2 ** -30)
+
+    def test_csr_round_trip(self):
+        matrix = random_graph(30, 0.1, 2)
+        data = encode_csr(CSRGraph.from_dense(matrix))
+        self.assertEqual(layout_of(data), KIND_CSR)
+        np.testing.assert_array_equal(decode_graph(data), matrix)
+        np.testing.assert_array_equal(decode_csr(encode_graph(matrix)).to_dense(), matrix)
+
+    def test_reads_legacy_json(self):
+        matrix = random_graph(10, 0.3, 3)
+        text = encode_legacy_json(matrix)
+        np.testing.assert_array_equal(decode_graph(text), matrix)
+        np.testing.assert_array_equal(decode_graph(text.encode()), matrix)
+        np.testing.assert_array_equal(decode_csr(text).to_dense(), matrix)
+        self.assertEqual(layout_of(text), KIND_DENSE)
+
+    def test_rejects_unknown_data(self):
+        with self.assertRaises(GraphFormatError):
+            decode_graph(b'GRPX' + bytes(20))
+        with self.assertRaises(GraphFormatError):
+            encode_graph(np.zeros(3))
+
+
+class GeneratorTests(SimpleTestCase):
+    def assertSimple(self, size, src, dst, weights):
+        """No self loops or repeated edges, weights integral in [1, 100)."""
+        self.assertTrue((src != dst).all())
+        self.assertEqual(len(np.unique(src * size + dst)), len(src))
+        self.assertTrue(((weights >= 1) & (weights < 100) & (weights == np.round(weights))).all())
+
+    def test_models_give_simple_graphs(self):
+        for model in GENERATORS:
+            with self.subTest(model=model):
+                src, dst, weights = generate_edges(200, model=model, seed=0)
+                self.assertSimple(200, src, dst, weights)
+                self.assertTrue(((0 <= dst) & (dst < 200)).all())
+
+    def test_seed_reproduces_the_graph(self):
+        for model in GENERATORS:
+            with self.subTest(model=model):
+                first, again = generate_edges(100, model=model, seed=4), generate_edges(100, model=model, seed=4)
+                for a, b in zip(first, again):
+                    np.testing.assert_array_equal(a, b)
+
+    def test_erdos_renyi_density(self):
+        src, _, _ = generate_edges(400, density=0.05, seed=1)
+        self.assertAlmostEqual(edge_density(400, len(src)), 0.05, delta=0.005)
+        self.assertEqual(len(generate_edges(10, density=1.0, seed=1)[0]), 90)
+        self.assertEqual(len(generate_edges(10, density=0.0, seed=1)[0]), 0)
+
+    def test_out_degree(self):
+        src, _, _ = generate_edges(50, model='out_degree', seed=2, degree=3)
+        self.assertTrue((np.bincount(src, minlength=50) == 3).all())
+
+    def test_grid(self):
+        # 3 x 3 lattice: 12 undirected links, both directions
+        src, dst, _ = generate_edges(9, model='grid', seed=3)
+        edges = set(zip(src.tolist(), dst.tolist()))
+        self.assertEqual(len(src), 24)
+        self.assertLessEqual({(0, 1), (1, 0), (0, 3), (3, 0)}, edges)
+        self.assertNotIn((2, 3), edges)
+
+    def test_dense_matrix(self):
+        matrix = generate_random_graph(30, density=0.2, seed=5)
+        src, dst, weights = generate_edges(30, density=0.2, seed=5)
+        self.assertTrue((np.diagonal(matrix) == 0).all())
+        self.assertEqual(np.isfinite(matrix).sum(), len(src) + 30)
+        np.testing.assert_array_equal(matrix[src, dst], weights)
+
+    def test_unknown_model(self):
+        with self.assertRaises(ValueError):
+            generate_edges(10, model='small_world')
+
+
+def random_changes(matrix, count, seed, low=1.0, high=10.0):
+    """{(u, v): (old, new)} reweighting, deleting and inserting random edges."""
+    rng = np.random.default_rng(seed)
+    n = len(matrix)
+    changes = {}
+    while len(changes) < count:
+        u, v = (int(x) for x in rng.integers(0, n, 2))
+        if u == v or (u, v) in changes:
+            continue
+        old = float(matrix[u, v])
+        new = np.inf if np.isfinite(old) and rng.random() < 0.3 else float(rng.uniform(low, high))
+        changes[u, v] = (old, new)
+    return changes
+
+
+def repair(base, changes):
+    """repair_all_pairs the way update_edges calls it."""
+    dist = floyd_warshall_numpy(base if not isinstance(base, CSRGraph) else base.to_dense())
+    increased = _apply(base, {edge: w for edge, w in changes.items() if w[1] > w[0]})
+    return repair_all_pairs(dist, changes, increased)
+
+
+@override_settings(APSP_REPAIR_MAX_ROW_FRACTION=1.0)
+class RepairAllPairsTests(SimpleTestCase):
+    def assertMatchesRerun(self, base, changes):
+        repaired = repair(base, changes)
+        self.assertIsNotNone(repaired)
+        updated = _apply(base, changes)
+        expected = floyd_warshall_numpy(updated if not isinstance(updated, CSRGraph) else updated.to_dense())
+        np.testing.assert_allclose(repaired, expected)
+
+    def test_mixed_changes(self):
+        for seed in range(5):
+            matrix = random_graph(40, 0.15, seed)
+            self.assertMatchesRerun(matrix, random_changes(matrix, 6, seed))
+
+    def test_decreases_only(self):
+        matrix = random_graph(40, 0.15, 7)
+        changes = {edge: (old, new) for edge, (old, new) in random_changes(matrix, 10, 7).items() if new < old}
+        self.assertMatchesRerun(matrix, changes)
+
+    def test_negative_weights(self):
+        # Non-negative cycles only: every weight is at least -1 and cycles have >= 2 edges of 5+
+        matrix = random_graph(30, 0.2, 3, low=5.0, high=10.0)
+        self.assertMatchesRerun(matrix, {(0, 1): (matrix[0, 1], -1.0), (2, 3): (matrix[2, 3], -1.0)})
+
+    def test_csr_layout(self):
+        matrix = random_graph(40, 0.1, 11)
+        self.assertMatchesRerun(CSRGraph.from_dense(matrix), random_changes(matrix, 6, 11))
+
+    def test_negative_cycle_gives_up(self):
+        matrix = random_graph(10, 0.0, 0)
+        matrix[0, 1] = 1.0
+        self.assertIsNone(repair(matrix, {(1, 0): (np.inf, -2.0)}))
+
+    @override_settings(APSP_REPAIR_MAX_ROW_FRACTION=0.0)
+    def test_too_many_affected_rows_gives_up(self):
+        matrix = random_graph(10, 0.0, 0)
+        matrix[0, 1] = 1.0
+        self.assertIsNone(repair(matrix, {(0, 1): (1.0, 5.0)}))
+
+
+@override_settings(APSP_REPAIR_MAX_ROW_FRACTION=1.0)
+class UpdateEdgesTests(GraphTestCase):
+    def test_repairs_stored_matrices(self):
+        matrix = random_graph(30, 0.2, 5)
+        graph = Graph(size=30, density=0.2)
+        graph.save_graph(matrix)
+        result_store.put(graph, 'floyd_warshall', 'sequential', None, floyd_warshall_numpy(matrix), 1.0, 'numpy')
+        result_store.put(graph, 'dijkstra', 'sequential', 0, floyd_warshall_numpy(matrix)[0], 1.0)
+
+        changes = random_changes(matrix, 4, 5)
+        updates = [{'op': 'delete' if not np.isfinite(new) else 'reweight' if np.isfinite(old) else 'insert',
+                    'src': u, 'dst': v, 'weight': None if not np.isfinite(new) else new}
+                   for (u, v), (old, new) in changes.items()]
+        outcome = update_edges(graph.id, updates)
+
+        graph.refresh_from_db()
+        self.assertEqual(graph.version, 2)
+        self.assertEqual(outcome['changed_edges'], len(changes))
+        self.assertEqual(outcome['repaired'], [{'algorithm': 'floyd_warshall', 'backend': 'sequential'}])
+        distances, elapsed, method = result_store.get_all_pairs(graph, 'floyd_warshall', 'sequential', 'numpy')
+        np.testing.assert_allclose(distances, floyd_warshall_numpy(graph.get_graph()))
+        self.assertEqual((elapsed, method), (1.0, 'numpy'))
+        self.assertIsNone(result_store.get(graph, 'dijkstra', 'sequential', 0))
+
+    def test_fractional_weight_on_integer_graph(self):
+        # Integer distances are stored as float32, which cannot hold 1 + 2**-30
+        matrix = np.round(random_graph(20, 0.3, 2, low=2.0, high=9.0))
+        graph = stored_graph(matrix)
+        result_store.put(graph, 'floyd_warshall', 'sequential', None, floyd_warshall_numpy(matrix), 1.0, 'numpy')
+        u, v = map(int, np.argwhere(np.isfinite(matrix) & (matrix > 0))[0])
+        update_edges(graph.id, [{'op': 'reweight', 'src': u, 'dst': v, 'weight': 1 + 2 ** -30}])
+
+        graph.refresh_from_db()
+        distances, _, _ = result_store.get_all_pairs(graph, 'floyd_warshall', 'sequential', 'numpy')
+        self.assertEqual(distances[u, v], 1 + 2 ** -30)
+        np.testing.assert_array_equal(distances, floyd_warshall_numpy(graph.get_graph()))
+
+
+class GraphStoreTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.store = GraphStore(directory.name)
+        self.matrix = random_graph(20, 0.3, 0)
+
+    def test_write_and_map(self):
+        path = self.store.write(7, 1, {'matrix': self.matrix})
+        self.assertEqual(path, '7/1')
+        loaded = self.store.load(path, 'matrix')
+        self.assertIsInstance(loaded, np.memmap)
+        self.assertFalse(loaded.flags.writeable)
+        np.testing.assert_array_equal(loaded, self.matrix)
+
+    def test_derived_dtype(self):
+        path = self.store.write(7, 1, {'matrix': self.matrix})
+        loaded = self.store.load(path, 'matrix', np.float32)
+        self.assertEqual(loaded.dtype, np.float32)
+        np.testing.assert_array_equal(loaded, self.matrix.astype(np.float32))
+        self.assertTrue((self.store.root / path / 'matrix.float32.npy').exists())
+
+    def test_prune_keeps_the_previous_version(self):
+        for version in (1, 2, 3, 4):
+            self.store.write(7, version, {'matrix': self.matrix})
+        self.store.prune(7, 4)
+        self.assertEqual(sorted(os.listdir(self.store.root / '7')), ['3', '4'])
+        self.store.remove(7)
+        self.assertFalse((self.store.root / '7').exists())
+
+
+@override_settings(GRAPH_STORAGE='file')
+class FileGraphTests(GraphTestCase):
+    def test_store_is_isolated(self):
+        self.assertNotEqual(graph_store.root, Path(settings.BASE_DIR) / 'graph_store')
+        self.assertEqual(graph_store.root, Path(settings.GRAPH_STORE_DIR))
+
+    def test_versions_are_mapped_and_pruned(self):
+        matrix = random_graph(20, 0.3, 1)
+        graph = Graph(size=20, density=0.3)
+        # Old versions are pruned (and deleted graphs removed) on commit
+        with self.captureOnCommitCallbacks(execute=True):
+            graph.save_graph(matrix)
+        self.assertEqual(graph.storage, Graph.FILE)
+        for weight in (2.0, 3.0):
+            matrix[0, 1] = weight
+            with self.captureOnCommitCallbacks(execute=True):
+                graph.save_graph(matrix)
+
+        _, loaded = load_graph(graph.id)
+        self.assertIsInstance(loaded, np.memmap)
+        np.testing.assert_array_equal(loaded, matrix)
+        np.testing.assert_array_equal(load_csr(graph.id)[1].to_dense(), matrix)
+        self.assertEqual(sorted(os.listdir(graph_store.root / str(graph.id))), ['2', '3'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            graph.delete()
+        self.assertFalse((graph_store.root / str(graph.id)).exists())
+
+
+class ImporterTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        # Every file below holds 0 -> 1 (2.5), 0 -> 2 (4), 1 -> 2 (1), 3 -> 0 (7)
+        self.expected = np.full((4, 4), np.inf)
+        np.fill_diagonal(self.expected, 0)
+        for u, v, w in ((0, 1, 2.5), (0, 2, 4.0), (1, 2, 1.0), (3, 0, 7.0)):
+            self.expected[u, v] = w
+
+    def write(self, name, content):
+        path = self.directory / name
+        path.write_text(content)
+        return path
+
+    def read(self, path, fmt, **kwargs):
+        # Two edges per chunk, so every file spans several chunks
+        return read_graph(path, fmt, chunk_edges=2, **kwargs).to_dense()
+
+    def test_edge_lists(self):
+        files = {
+            'csv': "src,dst,weight\n0,1,2.5\n# comment\n0,2,4\n\n1,2,1\n3,0,7\n",
+            'tsv': "0\t1\t2.5\n0\t2\t4\n1\t2\t1\n3\t0\t7\n",
+            'txt': "% comment\n0 1 2.5\n0  2 4\n1 2 1\n3 0 7\n",
+        }
+        for fmt, content in files.items():
+            with self.subTest(fmt=fmt):
+                np.testing.assert_array_equal(self.read(self.write('edges.' + fmt, content), fmt), self.expected)
+
+    def test_unweighted_and_undirected(self):
+        path = self.write('edges.txt', "0 1\n1 2\n")
+        np.testing.assert_array_equal(self.read(path, 'txt', size=3, undirected=True),
+                                      [[0, 1, np.inf], [1, 0, 1], [np.inf, 1, 0]])
+
+    def test_parallel_edges_keep_the_lightest(self):
+        path = self.write('edges.csv', "0,1,5\n0,1,2\n1,1,3\n")
+        np.testing.assert_array_equal(self.read(path, 'csv'), [[0, 2], [np.inf, 0]])
+
+    def test_matrix_market(self):
+        general = ("%%MatrixMarket matrix coordinate real general\n% comment\n4 4 4\n"
+                   "1 2 2.5\n1 3 4\n2 3 1\n4 1 7\n")
+        np.testing.assert_array_equal(self.read(self.write('g.mtx', general), 'mtx'), self.expected)
+
+        symmetric = "%%MatrixMarket matrix coordinate pattern symmetric\n3 3 2\n2 1\n3 2\n"
+        np.testing.assert_array_equal(self.read(self.write('s.mtx', symmetric), 'mtx'),
+                                      [[0, 1, np.inf], [1, 0, 1], [np.inf, 1, 0]])
+
+    def test_numpy_files(self):
+        edges = np.array([[0, 1, 2.5], [0, 2, 4], [1, 2, 1], [3, 0, 7]])
+        np.save(self.directory / 'edges.npy', edges)
+        np.savez(self.directory / 'edges.npz', edges=edges)
+        np.savez(self.directory / 'columns.npz', src=edges[:, 0].astype(int), dst=edges[:, 1].astype(int),
+                 weights=edges[:, 2])
+        # The layout scipy.sparse.save_npz writes for a coo matrix
+        np.savez(self.directory / 'coo.npz', format=np.array('coo'), shape=np.array([4, 4]),
+                 row=edges[:, 0].astype(int), col=edges[:, 1].astype(int), data=edges[:, 2])
+        for name in ('edges.npy', 'edges.npz', 'columns.npz', 'coo.npz'):
+            with self.subTest(file=name):
+                np.testing.assert_array_equal(self.read(self.directory / name, name[-3:]), self.expected)
+
+    def test_malformed_files(self):
+        files = {
+            'csv': ("0,1\n0,x\n", "0,1,2,3\n", "0,-1\n", "0,1.5\n", "0,1,inf\n", ""),
+            'mtx': ("0 1\n", "%%MatrixMarket matrix coordinate real general\n2 2 3\n1 2 1\n",
+                    "%%MatrixMarket matrix array real general\n2 2\n"),
+        }
+        for fmt, contents in files.items():
+            for content in contents:
+                with self.subTest(fmt=fmt, content=content):
+                    with self.assertRaises(GraphImportError):
+                        self.read(self.write('bad.' + fmt, content), fmt)
+
+    @override_settings(GRAPH_IMPORT_MAX_VERTICES=10)
+    def test_vertex_limit(self):
+        with self.assertRaises(GraphImportError):
+            build_csr([], size=11)
+        with self.assertRaises(GraphImportError):
+            self.read(self.write('big.txt', "0 10\n"), 'txt')
+
+
+class RunImportTests(GraphTestCase):
+    def test_creates_the_graph(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = Path(directory.name) / 'edges.txt'
+        path.write_text("0 1 2\n1 2 3\n")
+        record = GraphImport.objects.create(filename='edges.txt', format='txt', size_bytes=12)
+        run_import(record.id, str(path))
+
+        record.refresh_from_db()
+        self.assertEqual((record.status, record.progress, record.error), (GraphImport.SUCCEEDED, 1.0, ''))
+        self.assertFalse(path.exists())
+        np.testing.assert_array_equal(record.graph.get_graph(),
+                                      [[0, 2, np.inf], [np.inf, 0, 3], [np.inf, np.inf, 0]])
+
+    def test_records_the_error(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = Path(directory.name) / 'edges.csv'
+        path.write_text("0,1\n0,x\n")
+        record = GraphImport.objects.create(filename='edges.csv', format='csv', size_bytes=8)
+        run_import(record.id, str(path))
+
+        record.refresh_from_db()
+        self.assertEqual(record.status, GraphImport.FAILED)
+        self.assertIn('line', record.error)
+        self.assertIsNone(record.graph)
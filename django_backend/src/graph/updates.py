@@ -0,0 +1,176 @@
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from src.sequential.batch import shortest_paths_from
+from src.utils.csr import CSRGraph
+from src.utils.graph import edge_density
+from src.utils.metrics import phase
+from .cache import graph_cache
+from .codec import decode_graph
+from .models import Graph, ShortestPathResult
+from .results import result_store
+
+
+class EdgeUpdateError(ValueError):
+    pass
+
+
+def _overlay(graph_obj, updates):
+    """
+    Apply `updates` ({'op', 'src', 'dst', 'weight'} in order) over the stored
+    graph without materialising it. Returns (base, changes) where changes
+    maps (u, v) -> (old weight, new weight), inf meaning no edge, for every
+    edge whose final weight differs from the stored one.
+    """
+    if graph_obj.layout == Graph.CSR:
+        base = graph_obj.get_csr()
+
+        def stored(u, v):
+            row = slice(base.indptr[u], base.indptr[u + 1])
+            hit = np.flatnonzero(base.indices[row] == v)
+            return float(base.weights[row][hit[0]]) if hit.size else np.inf
+    else:
+        base = graph_obj.get_graph()
+
+        def stored(u, v):
+            return float(base[u, v])
+
+    current = {}
+    for i, update in enumerate(updates):
+        u, v = update['src'], update['dst']
+        if (u, v) not in current:
+            current[u, v] = (stored(u, v),) * 2
+        old, weight = current[u, v]
+        exists = np.isfinite(weight)
+        if update['op'] == 'insert' and exists:
+            raise EdgeUpdateError(f"edges[{i}]: edge {u} -> {v} already exists")
+        if update['op'] != 'insert' and not exists:
+            raise EdgeUpdateError(f"edges[{i}]: edge {u} -> {v} does not exist")
+        current[u, v] = (old, np.inf if update['op'] == 'delete' else float(update['weight']))
+    return base, {edge: weights for edge, weights in current.items() if weights[0] != weights[1]}
+
+
+def _apply(base, changes):
+    """New graph (same layout as `base`) with `changes` applied to it."""
+    if isinstance(base, CSRGraph):
+        src, dst, weights = base.edges()
+        weights = weights.copy()
+        keep = np.ones(len(src), dtype=bool)
+        added = []
+        for (u, v), (old, new) in changes.items():
+            if np.isfinite(old):
+                e = base.indptr[u] + np.flatnonzero(base.indices[base.indptr[u]:base.indptr[u + 1]] == v)[0]
+                keep[e] = np.isfinite(new)
+                weights[e] = new
+            else:
+                added.append((u, v, new))
+        added = np.array(added, dtype=np.float64).reshape(-1, 3)
+        return CSRGraph.from_edges(
+            base.n,
+            np.concatenate((src[keep], added[:, 0].astype(np.int64))),
+            np.concatenate((dst[keep], added[:, 1].astype(np.int32))),
+            np.concatenate((weights[keep], added[:, 2])),
+        )
+    graph = base.copy()
+    for (u, v), (_, new) in changes.items():
+        graph[u, v] = new
+    return graph
+
+
+def _tight_rows(dist: np.ndarray, u: int, v: int, weight: float) -> np.ndarray:
+    """Sources with some shortest path that uses edge u -> v of `weight`."""
+    through = dist[:, u, None] + weight + dist[None, v, :]
+    return np.flatnonzero((np.isfinite(dist) & np.isclose(through, dist)).any(axis=1))
+
+
+def repair_all_pairs(dist: np.ndarray, changes: dict, increased_graph) -> np.ndarray:
+    """
+    Bring an all-pairs matrix up to date with `changes` instead of rerunning
+    it; returns None when a full recompute is the better (or only) option.
+
+    Increases and deletions come first: only sources with a shortest path
+    through a changed edge can be affected, and those rows are recomputed
+    on `increased_graph` (the old graph with just those changes) unless
+    there are more than settings.APSP_REPAIR_MAX_ROW_FRACTION of them. Each
+    decrease or insertion u -> v of weight w is then one O(n^2) step,
+    d(i, j) = min(d(i, j), d(i, u) + w + d(v, j)). A decrease that closes
+    a negative cycle gives up.
+    """
+    dist = np.array(dist, dtype=np.float64)
+    n = dist.shape[0]
+    if (np.diagonal(dist) < 0).any():
+        # Stored by Floyd-Warshall on a graph with a negative cycle: not distances
+        return None
+
+    increases = [(u, v, old) for (u, v), (old, new) in changes.items() if new > old]
+    if increases:
+        rows = np.unique(np.concatenate([_tight_rows(dist, u, v, old) for u, v, old in increases]))
+        if len(rows) > settings.APSP_REPAIR_MAX_ROW_FRACTION * n:
+            return None
+        if len(rows):
+            csr = increased_graph if isinstance(increased_graph, CSRGraph) else \
+                CSRGraph.from_dense(increased_graph)
+            algorithm = 'bellman_ford' if (csr.weights < 0).any() else 'dijkstra'
+            dist[rows] = shortest_paths_from(csr, rows.tolist(), algorithm, workers=1)
+
+    for (u, v), (old, new) in changes.items():
+        if new < old:
+            if dist[v, u] + new < 0:
+                return None
+            np.minimum(dist, dist[:, u, None] + new + dist[None, v, :], out=dist)
+    return dist
+
+
+def update_edges(graph_id: int, updates) -> dict:
+    """
+    Apply edge updates to the stored graph in one transaction and bump its
+    version, then carry its stored all-pairs matrices over to the new
+    version by repair_all_pairs. Other stored results are dropped. Raises
+    Graph.DoesNotExist and EdgeUpdateError.
+    """
+    with transaction.atomic():
+        graph_obj = Graph.objects.select_for_update().get(id=graph_id)
+        for i, update in enumerate(updates):
+            for key in ('src', 'dst'):
+                if not 0 <= update[key] < graph_obj.size:
+                    raise EdgeUpdateError(f"edges[{i}]: {key} must be in [0, {graph_obj.size})")
+
+        base, changes = _overlay(graph_obj, updates)
+        if not changes:
+            return {"graph": graph_obj, "changed_edges": 0, "repaired": [], "dropped": []}
+        stored = [(row.algorithm, row.backend, row.method, row.time_seconds, decode_graph(row.data))
+                  for row in ShortestPathResult.objects.filter(
+                      graph_id=graph_obj.id, graph_version=graph_obj.version,
+                      source=ShortestPathResult.ALL_PAIRS)]
+
+        updated = _apply(base, changes)
+        if isinstance(updated, CSRGraph):
+            graph_obj.density = edge_density(graph_obj.size, updated.nnz)
+            graph_obj.save_csr(updated)
+        else:
+            off_diagonal = np.isfinite(updated).sum() - np.isfinite(np.diagonal(updated)).sum()
+            graph_obj.density = edge_density(graph_obj.size, int(off_diagonal))
+            graph_obj.save_graph(updated)
+        graph_cache.invalidate(graph_obj.id)
+        result_store.invalidate(graph_obj.id)
+
+    repaired, dropped = [], []
+    if stored:
+        increased = _apply(base, {edge: w for edge, w in changes.items() if w[1] > w[0]})
+        for algorithm, backend, method, time_seconds, dist in stored:
+            with phase('compute'):
+                result = repair_all_pairs(dist, changes, increased)
+            entry = {"algorithm": algorithm, "backend": backend}
+            if result is None:
+                dropped.append(entry)
+                continue
+            # float64 as repaired: the stored dtype may not hold the new weights
+            result_store.put(graph_obj, algorithm, backend, None, result, time_seconds, method)
+            repaired.append(entry)
+
+    return {
+        "graph": graph_obj,
+        "changed_edges": len(changes),
+        "repaired": repaired,
+        "dropped": dropped,
+    }
@@ -1,7 +1,11 @@
 from django.urls import path
-from .views import GenerateGraph
+from .views import GenerateGraph, GraphCacheStats, GraphEdges, ImportGraph
 
 urlpatterns = [
     path('', GenerateGraph.as_view()),               # POST to create
     path('<int:graph_id>/', GenerateGraph.as_view()), # GET to retrieve
-]
\ No newline at end of file
+    path('<int:graph_id>/edges/', GraphEdges.as_view()),  # PATCH to insert/reweight/delete edges
+    path('import/', ImportGraph.as_view()),            # POST a graph file to import
+    path('import/<int:import_id>/', ImportGraph.as_view()),  # GET import progress
+    path('cache/', GraphCacheStats.as_view()),        # GET decoded-graph cache stats
+]
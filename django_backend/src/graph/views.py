@@ -1,8 +1,12 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .models import Graph
-from .serializers import GraphSerializer
+from rest_framework.parsers import MultiPartParser, FormParser
+from .models import Graph, GraphImport
+from .serializers import EdgePatchSerializer, GraphImportSerializer, GraphSerializer
+from .importers import fail_orphaned_imports, start_import
+from .cache import graph_cache
+from .updates import EdgeUpdateError, update_edges
 
 class GenerateGraph(APIView):
     def post(self, request):
@@ -21,3 +25,74 @@ class GenerateGraph(APIView):
             return Response(GraphSerializer(graph).data)
         except Graph.DoesNotExist:
             return Response({"message": "Graph not found"}, status=status.HTTP_404_NOT_FOUND)
+
+
+class GraphCacheStats(APIView):
+    def get(self, request):
+        return Response(graph_cache.stats())
+
+
+class GraphEdges(APIView):
+    """
+    PATCH {"edges": [{"op": "insert" | "reweight" | "delete", "src": u, "dst": v,
+    "weight": w}, ...]} applies the updates in order, bumps the graph version
+    and repairs the stored all-pairs results instead of dropping them.
+    """
+    def patch(self, request, graph_id):
+        serializer = EdgePatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            outcome = update_edges(graph_id, serializer.validated_data['edges'])
+        except Graph.DoesNotExist:
+            return Response({"message": "Graph not found"}, status=status.HTTP_404_NOT_FOUND)
+        except EdgeUpdateError as e:
+            return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        graph_obj = outcome.pop("graph")
+        return Response(dict(outcome, message="Edges updated", graph={
+            "id": graph_obj.id,
+            "size": graph_obj.size,
+            "density": graph_obj.density,
+            "layout": graph_obj.layout,
+            "version": graph_obj.version,
+        }))
+
+
+def _describe_import(record):
+    return {
+        "id": record.id,
+        "filename": record.filename,
+        "format": record.format,
+        "size_bytes": record.size_bytes,
+        "status": record.status,
+        "progress": record.progress,
+        "graph": record.graph_id,
+        "error": record.error,
+    }
+
+
+class ImportGraph(APIView):
+    """
+    POST a multipart `file` (edge list .csv/.tsv/.txt, .mtx, .npy or .npz;
+    see importers.py) with optional `format`, `size` and `undirected`. The
+    file is parsed in chunks on the import pool straight into CSR; GET
+    import/<id>/ reports progress and, once done, the new graph id.
+    """
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request):
+        serializer = GraphImportSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+        record = start_import(data['file'], data['format'], data.get('size'), data['undirected'])
+        return Response(dict(_describe_import(record), message="Import started"),
+                        status=status.HTTP_202_ACCEPTED)
+
+    def get(self, request, import_id):
+        fail_orphaned_imports()
+        try:
+            return Response(_describe_import(GraphImport.objects.get(id=import_id)))
+        except GraphImport.DoesNotExist:
+            return Response({"message": "Import not found"}, status=status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,39 @@
+import multiprocessing
+import os
+import sys
+import threading
+from django.apps import AppConfig
+from django.conf import settings
+
+
+class JitConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'src.jit'
+
+    def ready(self):
+        if settings.NUMBA_WARMUP and _serves_requests():
+            # Load the compiled kernels in the background so startup isn't held up
+            # and the first request doesn't pay the JIT latency
+            threading.Thread(target=_warmup, name='numba-warmup', daemon=True).start()
+
+
+def _serves_requests() -> bool:
+    """
+    False for processes that never answer a request: pool workers,
+    management commands, and runserver's file-watching parent (its child,
+    started with RUN_MAIN=true, does the serving).
+    """
+    if multiprocessing.parent_process() is not None:
+        return False
+    if os.path.basename(sys.argv[0]) not in ('manage.py', 'django-admin'):
+        # A WSGI/ASGI server (gunicorn, uvicorn, ...) importing the project
+        return True
+    if sys.argv[1:2] != ['runserver']:
+        return False
+    return os.environ.get('RUN_MAIN') == 'true' or '--noreload' in sys.argv
+
+
+def _warmup():
+    from src.utils.backends import get_backend, is_available
+    if is_available('numba'):
+        get_backend('numba').warmup()
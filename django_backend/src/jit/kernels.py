@@ -0,0 +1,167 @@
+import heapq
+import numpy as np
+from numba import njit, prange, types
+from src.sequential.algorithms import (
+    NegativeCycleError,
+    _find_cycle,
+    as_csr,
+    as_dense,
+    johnson_reweight,
+    johnson_restore,
+    reconstruct_path,
+)
+from src.utils.csr import CSRGraph
+
+# Numba versions of the sequential algorithms. Same signatures and results as
+# src.sequential.algorithms; every kernel is compiled with cache=True so the
+# machine code is kept in __pycache__ and reused across processes.
+
+
+@njit(cache=True)
+def _dijkstra_dense(graph, source):
+    # O(n^2) array scan, no heap: the better choice on dense matrices
+    n = graph.shape[0]
+    dist = np.full(n, np.inf)
+    done = np.zeros(n, dtype=np.bool_)
+    dist[source] = 0.0
+    for _ in range(n):
+        u = -1
+        best = np.inf
+        for v in range(n):
+            if not done[v] and dist[v] < best:
+                best = dist[v]
+                u = v
+        if u < 0:
+            break
+        done[u] = True
+        for v in range(n):
+            nd = best + graph[u, v]
+            if nd < dist[v] and not done[v]:
+                dist[v] = nd
+    return dist
+
+
+@njit(cache=True)
+def _dijkstra_csr(indptr, indices, weights, source, target):
+    # target < 0 runs the full SSSP; otherwise stop once target is settled
+    n = len(indptr) - 1
+    dist = np.full(n, np.inf)
+    pred = np.full(n, -1, dtype=np.int32)
+    done = np.zeros(n, dtype=np.bool_)
+    dist[source] = 0.0
+    heap = [(0.0, np.int64(source))]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if done[u]:
+            continue
+        if u == target:
+            break
+        done[u] = True
+        for e in range(indptr[u], indptr[u + 1]):
+            v = np.int64(indices[e])
+            nd = d + weights[e]
+            if nd < dist[v] and not done[v]:
+                dist[v] = nd
+                pred[v] = u
+                heapq.heappush(heap, (nd, v))
+    return dist, pred
+
+
+@njit(cache=True)
+def _bellman_ford_edges(n, src, dst, weights, source):
+    """
+    In-place (Gauss-Seidel) rounds over the edge list with early exit.
+    Returns (dist, pred, v) where v >= 0 is a vertex still improving in
+    round n, i.e. one reachable from a negative cycle.
+    """
+    dist = np.full(n, np.inf)
+    pred = np.full(n, -1, dtype=np.int64)
+    dist[source] = 0.0
+    for _ in range(n):
+        changed = -1
+        for e in range(len(src)):
+            nd = dist[src[e]] + weights[e]
+            if nd < dist[dst[e]]:
+                dist[dst[e]] = nd
+                pred[dst[e]] = src[e]
+                changed = dst[e]
+        if changed < 0:
+            return dist, pred, -1
+    return dist, pred, changed
+
+
+@njit(cache=True, parallel=True)
+def _floyd_warshall(dist):
+    # Rows are independent within a k step once row k is copied aside
+    n = dist.shape[0]
+    for k in range(n):
+        row_k = dist[k].copy()
+        for i in prange(n):
+            d_ik = dist[i, k]
+            if d_ik == np.inf:
+                continue
+            for j in range(n):
+                nd = d_ik + row_k[j]
+                if nd < dist[i, j]:
+                    dist[i, j] = nd
+    return dist
+
+
+def dijkstra(graph, source: int = 0) -> np.ndarray:
+    if isinstance(graph, CSRGraph):
+        return _dijkstra_csr(graph.indptr, graph.indices, graph.weights.astype(np.float64, copy=False),
+                             source, -1)[0]
+    return _dijkstra_dense(np.asarray(graph, dtype=np.float64), source)
+
+
+def dijkstra_to(graph, source: int, target: int):
+    """Point-to-point Dijkstra with early exit; (distance, path) as in the sequential version."""
+    csr = as_csr(graph)
+    dist, pred = _dijkstra_csr(csr.indptr, csr.indices, csr.weights.astype(np.float64, copy=False),
+                               source, target)
+    if dist[target] == np.inf:
+        return float('inf'), []
+    return float(dist[target]), reconstruct_path(pred, source, target)
+
+
+def bellman_ford(graph, source: int = 0) -> np.ndarray:
+    # Edge-based by nature: dense matrices are converted to CSR first
+    csr = as_csr(graph)
+    src, dst, weights = csr.edges()
+    dist, pred, changed = _bellman_ford_edges(csr.n, src, dst, weights.astype(np.float64, copy=False),
+                                              source)
+    if changed >= 0:
+        raise NegativeCycleError(_find_cycle(pred, [changed]))
+    return dist
+
+
+def floyd_warshall(graph) -> np.ndarray:
+    return _floyd_warshall(np.array(as_dense(graph), dtype=np.float64))
+
+
+def johnson(graph) -> np.ndarray:
+    """Johnson's all-pairs: sequential reweighting, then the CSR Dijkstra kernel per source."""
+    reweighted, h = johnson_reweight(graph)
+    indptr, indices = reweighted.indptr, reweighted.indices
+    weights = reweighted.weights.astype(np.float64, copy=False)
+    distances = np.empty((reweighted.n, reweighted.n))
+    for s in range(reweighted.n):
+        distances[s] = _dijkstra_csr(indptr, indices, weights, s, -1)[0]
+    return johnson_restore(distances, h)
+
+
+def warmup():
+    """Compile (or load from the disk cache) every kernel for the types the views use."""
+    graph = np.array([[0.0, 1.0, np.inf], [np.inf, 0.0, 2.0], [4.0, np.inf, 0.0]])
+    csr = CSRGraph.from_dense(graph)
+    # Cached graphs are handed out read-only, which numba types separately
+    for array in (graph, *csr):
+        array.flags.writeable = False
+    for g in (graph, csr):
+        dijkstra(g, 0)
+        bellman_ford(g, 0)
+    dijkstra_to(csr, 0, 2)
+    johnson(csr)
+    # Compile without running: launching the parallel thread pool from the
+    # warm-up thread leaves it unable to shut down cleanly
+    _floyd_warshall.compile((types.float64[:, ::1],))
@@ -0,0 +1,53 @@
+import os
+import unittest
+from unittest import mock
+import numpy as np
+from django.test import SimpleTestCase
+from src.sequential.algorithms import bellman_ford, dijkstra, floyd_warshall_numpy
+from src.utils.backends import get_backend, is_available
+from src.utils.csr import CSRGraph
+from .apps import _serves_requests
+
+
+class WarmupGateTests(SimpleTestCase):
+    def serves(self, argv, run_main=None):
+        env = {k: v for k, v in os.environ.items() if k != 'RUN_MAIN'}
+        if run_main is not None:
+            env['RUN_MAIN'] = run_main
+        with mock.patch('sys.argv', argv), mock.patch.dict(os.environ, env, clear=True):
+            return _serves_requests()
+
+    def test_servers(self):
+        self.assertTrue(self.serves(['/venv/bin/gunicorn', 'src.core.wsgi']))
+        self.assertTrue(self.serves(['manage.py', 'runserver'], run_main='true'))
+        self.assertTrue(self.serves(['manage.py', 'runserver', '--noreload']))
+
+    def test_other_processes(self):
+        self.assertFalse(self.serves(['manage.py', 'runserver']))
+        for command in ('migrate', 'makemigrations', 'benchmark', 'move_graphs', 'test'):
+            self.assertFalse(self.serves(['/src/manage.py', command]))
+        with mock.patch('multiprocessing.parent_process', return_value=object()):
+            self.assertFalse(self.serves(['/venv/bin/gunicorn', 'src.core.wsgi']))
+
+
+@unittest.skipUnless(is_available('numba'), "numba is not installed")
+class KernelTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.kernels = get_backend('numba')
+        rng = np.random.default_rng(0)
+        cls.matrix = np.where(rng.random((40, 40)) < 0.15, rng.uniform(1, 10, (40, 40)), np.inf)
+        np.fill_diagonal(cls.matrix, 0)
+        cls.csr = CSRGraph.from_dense(cls.matrix)
+
+    def test_dijkstra(self):
+        np.testing.assert_allclose(self.kernels.dijkstra(self.csr, 3), dijkstra(self.csr, 3))
+
+    def test_bellman_ford(self):
+        np.testing.assert_allclose(self.kernels.bellman_ford(self.csr, 3), bellman_ford(self.csr, 3))
+
+    def test_all_pairs(self):
+        expected = floyd_warshall_numpy(self.matrix)
+        np.testing.assert_allclose(self.kernels.floyd_warshall(self.matrix), expected)
+        np.testing.assert_allclose(self.kernels.johnson(self.csr), expected)
@@ -0,0 +1,8 @@
+from django.urls import path
+from .views import BellmanFordJIT, DijkstraJIT, FloydWarshallJIT
+
+urlpatterns = [
+    path('bellman_ford/<int:graph_id>/', BellmanFordJIT.as_view(), name='bellman_ford_numba'),
+    path('dijkstra/<int:graph_id>/', DijkstraJIT.as_view(), name='dijkstra_numba'),
+    path('floyd_warshall/<int:graph_id>/', FloydWarshallJIT.as_view(), name='floyd_warshall_numba'),
+]
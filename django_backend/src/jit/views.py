@@ -0,0 +1,143 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from src.graph.models import Graph
+from src.graph.cache import load_graph, load_csr
+from src.graph.results import result_store
+from src.sequential.algorithms import NegativeCycleError
+from src.sequential.views import (
+    invalid_source,
+    negative_weights,
+    parse_source,
+    resolve_all_pairs_method,
+    shortest_path_response,
+)
+from src.utils.backends import get_backend, status as backend_status
+from src.utils.responses import DISTANCE_RENDERERS, distance_response
+from src.utils.timing import timeit
+
+
+def numba_unavailable():
+    available, reason = backend_status('numba')
+    if available:
+        return None
+    return Response({"message": f"Numba backend unavailable: {reason}"},
+                    status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+class BellmanFordJIT(APIView):
+    renderer_classes = DISTANCE_RENDERERS
+
+    def get(self, request, graph_id):
+        unavailable = numba_unavailable()
+        if unavailable:
+            return unavailable
+
+        try:
+            graph_obj, graph = load_csr(graph_id)
+            source = parse_source(request.GET.get('source'), graph.n)
+            if source is None:
+                return invalid_source(graph.n)
+
+            cycle = None
+            hit = result_store.get(graph_obj, "bellman_ford", "numba", source)
+            if hit is not None:
+                (distances, elapsed), cached = hit, True
+            else:
+                ((distances, cycle), elapsed), cached = self._bellman_ford_timed(graph, source), False
+                if distances is not None:
+                    result_store.put(graph_obj, "bellman_ford", "numba", source, distances, elapsed)
+            return distance_response(request, {
+                "algorithm": "bellman_ford",
+                "source": source,
+                "negative_cycle": cycle,
+                "time_seconds": elapsed,
+                "cached": cached
+            }, distances)
+        except Graph.DoesNotExist:
+            return Response({"message": "Graph not found"}, status=status.HTTP_404_NOT_FOUND)
+
+    @timeit
+    def _bellman_ford_timed(self, graph, source=0):
+        try:
+            return get_backend('numba').bellman_ford(graph, source), None
+        except NegativeCycleError as e:
+            return None, e.cycle
+
+
+class DijkstraJIT(APIView):
+    renderer_classes = DISTANCE_RENDERERS
+
+    def get(self, request, graph_id):
+        unavailable = numba_unavailable()
+        if unavailable:
+            return unavailable
+
+        try:
+            graph_obj, graph = load_csr(graph_id)
+            source = parse_source(request.GET.get('source'), graph.n)
+            if source is None:
+                return invalid_source(graph.n)
+            rejected = negative_weights(graph)
+            if rejected:
+                return rejected
+            if 'target' in request.GET:
+                # Bidirectional search stays on the sequential backend
+                return shortest_path_response(request, graph_obj, graph, source,
+                                              {'unidirectional': get_backend('numba').dijkstra_to}, "numba")
+
+            distances, elapsed, cached = result_store.get_or_compute(
+                graph_obj, "dijkstra", "numba",
+                lambda: timeit(get_backend('numba').dijkstra)(graph, source), source=source)
+            return distance_response(request, {
+                "algorithm": "dijkstra",
+                "source": source,
+                "time_seconds": elapsed,
+                "cached": cached
+            }, distances)
+        except Graph.DoesNotExist:
+            return Response({"message": "Graph not found"}, status=status.HTTP_404_NOT_FOUND)
+
+
+class FloydWarshallJIT(APIView):
+    renderer_classes = DISTANCE_RENDERERS
+
+    def get(self, request, graph_id):
+        unavailable = numba_unavailable()
+        if unavailable:
+            return unavailable
+        method = request.GET.get('method', 'auto')
+        if method not in ('auto', 'floyd_warshall', 'johnson'):
+            return Response({
+                "message": f"Unknown method '{method}'",
+                "methods": ['auto', 'floyd_warshall', 'johnson']
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            method = resolve_all_pairs_method(method, graph_id, 'floyd_warshall')
+            graph_obj, graph = (load_csr if method == 'johnson' else load_graph)(graph_id)
+
+            cycle = None
+            hit = result_store.get_all_pairs(graph_obj, "floyd_warshall", "numba", method)
+            if hit is not None:
+                (dist_matrix, elapsed, method), cached = hit, True
+            else:
+                ((dist_matrix, cycle), elapsed), cached = self._all_pairs_timed(graph, method), False
+                if dist_matrix is not None:
+                    result_store.put(graph_obj, "floyd_warshall", "numba", None, dist_matrix, elapsed, method)
+            return distance_response(request, {
+                "algorithm": "floyd_warshall",
+                "method": method,
+                "negative_cycle": cycle,
+                "time_seconds": elapsed,
+                "cached": cached
+            }, dist_matrix)
+        except Graph.DoesNotExist:
+            return Response({"message": "Graph not found"}, status=status.HTTP_404_NOT_FOUND)
+
+    @timeit
+    def _all_pairs_timed(self, graph, method):
+        try:
+            return getattr(get_backend('numba'), method)(graph), None
+        except NegativeCycleError as e:
+            return None, e.cycle
@@ -0,0 +1,26 @@
+from django.db import models
+from src.graph.models import Graph
+
+
+class Job(models.Model):
+    """An algorithm run executed by the local worker pool (see runner.py)."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUSES = [(QUEUED, 'Queued'), (RUNNING, 'Running'), (SUCCEEDED, 'Succeeded'), (FAILED, 'Failed')]
+
+    graph = models.ForeignKey(Graph, on_delete=models.CASCADE, related_name='jobs')
+    algorithm = models.CharField(max_length=32)
+    backend = models.CharField(max_length=16, default='sequential')
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=16, choices=STATUSES, default=QUEUED, db_index=True)
+    progress = models.FloatField(default=0.0)  # 0..1, updated by the worker
+    result = models.BinaryField(null=True)  # Distances encoded with graph.codec
+    negative_cycle = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default='')
+    time_seconds = models.FloatField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True)
+    finished_at = models.DateTimeField(null=True)
+    owner = models.CharField(max_length=128, blank=True, default='')  # Server process running it, see utils/process.py
@@ -0,0 +1,277 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+import numpy as np
+from django.conf import settings
+from django.db import connections, models
+from django.utils import timezone
+from src.graph.cache import load_graph, load_csr
+from src.graph.codec import encode_graph
+from src.graph.models import Graph
+from src.graph.results import result_store
+from src.sequential.algorithms import (
+    dijkstra,
+    BELLMAN_FORD_METHODS,
+    FLOYD_WARSHALL_METHODS,
+    NegativeCycleError,
+)
+from src.sequential.batch import ALL_PAIRS_METHODS, choose_all_pairs_method, johnson, shortest_paths_from
+from src.utils.backends import array_module, get_backend
+from src.utils.process import dead_owners, process_owner
+from src.utils.timing import timeit
+from .models import Job
+
+
+class QueueFull(Exception):
+    pass
+
+
+# Runners take (graph_id, params, progress) and return the distances.
+# Heavy backends are imported inside their runner so workers only pay for
+# the ones they use.
+
+def _sequential_dijkstra(graph_id, params, progress):
+    _, csr = load_csr(graph_id)
+    return dijkstra(csr, params.get('source', 0))
+
+
+def _sequential_bellman_ford(graph_id, params, progress):
+    _, csr = load_csr(graph_id)
+    method = params.get('method', 'edge_list')
+    kwargs = {'progress': progress} if method == 'edge_list' else {}
+    return BELLMAN_FORD_METHODS[method](csr, params.get('source', 0), **kwargs)
+
+
+def _all_pairs_method(graph_id, params, dense_method):
+    method = params.get('method', 'auto')
+    if method != 'auto':
+        return method
+    return choose_all_pairs_method(Graph.objects.values_list('density', flat=True).get(id=graph_id),
+                                   dense_method)
+
+
+def _sequential_floyd_warshall(graph_id, params, progress):
+    method = _all_pairs_method(graph_id, params, DENSE_ALL_PAIRS_METHOD['sequential'])
+    if method == 'johnson':
+        _, csr = load_csr(graph_id)
+        # Already inside a pool worker: run the sources in-process
+        return johnson(csr, workers=1, progress=progress)
+    _, graph = load_graph(graph_id)
+    kwargs = {'block_size': params['block_size']} if 'block_size' in params else {}
+    return FLOYD_WARSHALL_METHODS[method](graph, progress=progress, **kwargs)
+
+
+def _sequential_batch(graph_id, params, progress):
+    _, csr = load_csr(graph_id)
+    sources = params.get('sources', 'all')
+    if sources == 'all':
+        sources = range(csr.n)
+    # Already inside a pool worker: run the sources in-process
+    return shortest_paths_from(csr, sources, params.get('algorithm', 'dijkstra'), workers=1,
+                               progress=progress)
+
+
+def _cuda(kernel_name, single_source):
+    def run(graph_id, params, progress):
+        kernels = get_backend('numpy')  # runs on cupy when a GPU is usable
+        _, graph = load_graph(graph_id, dtype=np.float32)
+        args = (params.get('source', 0),) if single_source else ()
+        result, _ = getattr(kernels, kernel_name)(graph, *args)
+        return result
+    return run
+
+
+def _numba(algorithm):
+    def run(graph_id, params, progress):
+        kernels = get_backend('numba')
+        if algorithm in ALL_PAIRS_ALGORITHMS:
+            method = _all_pairs_method(graph_id, params, DENSE_ALL_PAIRS_METHOD['numba'])
+            _, graph = (load_csr if method == 'johnson' else load_graph)(graph_id)
+            return getattr(kernels, method)(graph)
+        _, csr = load_csr(graph_id)
+        return getattr(kernels, algorithm)(csr, params.get('source', 0))
+    return run
+
+
+def _mpi(algorithm):
+    def run(graph_id, params, progress):
+        pool = get_backend('mpi').mpi_pool
+        graph_obj, graph = load_graph(graph_id)
+        args = () if algorithm in ALL_PAIRS_ALGORITHMS else (params.get('source', 0),)
+        result, _ = pool.run(algorithm, graph_obj, graph, *args)
+        return result
+    return run
+
+
+RUNNERS = {
+    ('dijkstra', 'sequential'): _sequential_dijkstra,
+    ('bellman_ford', 'sequential'): _sequential_bellman_ford,
+    ('floyd_warshall', 'sequential'): _sequential_floyd_warshall,
+    ('batch', 'sequential'): _sequential_batch,
+    ('bellman_ford', 'cuda'): _cuda('bellman_ford_cuda', single_source=True),
+    ('dijkstra', 'cuda'): _cuda('dijkstra_cuda', single_source=True),
+    ('floyd_warshall', 'cuda'): _cuda('floyd_warshall_cuda', single_source=False),
+    ('bellman_ford', 'numba'): _numba('bellman_ford'),
+    ('dijkstra', 'numba'): _numba('dijkstra'),
+    ('floyd_warshall', 'numba'): _numba('floyd_warshall'),
+    ('bellman_ford', 'mpi'): _mpi('bellman_ford'),
+    ('dijkstra', 'mpi'): _mpi('dijkstra'),
+    ('floyd_warshall', 'mpi'): _mpi('floyd_warshall'),
+}
+
+ALL_PAIRS_ALGORITHMS = {'floyd_warshall'}
+
+# ?method= values the all-pairs runners accept ('auto' picks by density)
+ALL_PAIRS_METHODS_BY_BACKEND = {
+    'sequential': ['auto', *ALL_PAIRS_METHODS],
+    'numba': ['auto', 'floyd_warshall', 'johnson'],
+}
+
+# What 'auto' runs on dense graphs, per backend
+DENSE_ALL_PAIRS_METHOD = {'sequential': 'numpy', 'numba': 'floyd_warshall'}
+
+# Registry backend (src.utils.backends) each job backend needs
+REQUIRED_BACKENDS = {'sequential': 'sequential', 'cuda': 'numpy', 'numba': 'numba', 'mpi': 'mpi'}
+
+
+class ProgressReporter:
+    """Writes progress to the job row at most once per `interval` seconds."""
+
+    def __init__(self, job_id, interval=0.5):
+        self.job_id = job_id
+        self.interval = interval
+        self._last = 0.0
+
+    def __call__(self, fraction: float):
+        now = time.monotonic()
+        if now - self._last >= self.interval:
+            self._last = now
+            Job.objects.filter(id=self.job_id).update(progress=min(max(fraction, 0.0), 1.0))
+
+
+def _init_worker():
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        # Spawned (not forked) workers start without Django configured
+        django.setup()
+    # Forked workers must not reuse the parent's database connections
+    connections.close_all()
+
+
+def run_job(job_id: int):
+    """Worker-process entry point: run one job and record the outcome."""
+    Job.objects.filter(id=job_id).update(status=Job.RUNNING, started_at=timezone.now())
+    job = Job.objects.get(id=job_id)
+    params = job.params
+    source = None if job.algorithm in ALL_PAIRS_ALGORITHMS else params.get('source', 0)
+    outcome = {'status': Job.SUCCEEDED, 'progress': 1.0}
+
+    try:
+        graph_obj = Graph.objects.defer('data').get(id=job.graph_id)
+        # CUDA results are stored under the array module that computed them, as the views do
+        backend = array_module().__name__ if job.backend == 'cuda' else job.backend
+        hit, method = None, ''
+        if job.algorithm in ALL_PAIRS_ALGORITHMS:
+            if job.backend in DENSE_ALL_PAIRS_METHOD:
+                method = _all_pairs_method(job.graph_id, params, DENSE_ALL_PAIRS_METHOD[job.backend])
+            hit = result_store.get_all_pairs(graph_obj, job.algorithm, backend, method)
+        elif job.algorithm != 'batch':
+            hit = result_store.get(graph_obj, job.algorithm, backend, source)
+        if hit is not None:
+            distances, elapsed = hit[:2]
+        else:
+            run = timeit(RUNNERS[(job.algorithm, job.backend)])
+            distances, elapsed = run(job.graph_id, params, ProgressReporter(job_id))
+            if job.algorithm != 'batch':
+                result_store.put(graph_obj, job.algorithm, backend, source, distances, elapsed, method)
+        outcome.update(result=encode_graph(np.atleast_2d(distances)), time_seconds=elapsed)
+    except NegativeCycleError as e:
+        outcome.update(negative_cycle=e.cycle)
+    except Exception as e:
+        outcome = {'status': Job.FAILED, 'error': f"{type(e).__name__}: {e}"}
+
+    Job.objects.filter(id=job_id).update(finished_at=timezone.now(), **outcome)
+
+
+class JobQueue:
+    """
+    Local process pool for jobs. Runs at most `workers` jobs at once and
+    refuses new ones once `depth` of this process's jobs are waiting; state
+    lives in the Job table, so no external broker is needed. Jobs left
+    queued or running by a server process that has since gone away are
+    failed the first time the queue is used.
+    """
+
+    def __init__(self, workers: int, depth: int):
+        self.workers = workers
+        self.depth = depth
+        self._executor = None
+        self._futures = {}  # job id -> future, for this process's unfinished jobs
+        self._reconciled = False
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawned rather than forked: a forked worker would inherit this
+            # process's MPI state once src.mpi.pool has connected
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+        return self._executor
+
+    def _reconcile(self):
+        if self._reconciled:
+            return
+        self._reconciled = True
+        active = Job.objects.filter(status__in=[Job.QUEUED, Job.RUNNING])
+        dead = dead_owners(active.values_list('owner', flat=True).distinct())
+        if dead:
+            active.filter(owner__in=dead).update(
+                status=Job.FAILED, error="Interrupted: the server process running it exited",
+                finished_at=timezone.now())
+
+    def _waiting(self) -> int:
+        # Submitted by this process and not yet picked up by a worker (caller holds the lock)
+        return sum(1 for future in self._futures.values() if not (future.running() or future.done()))
+
+    def submit(self, **fields) -> Job:
+        with self._lock:
+            self._reconcile()
+            if self._waiting() >= self.depth:
+                raise QueueFull(f"{self.depth} jobs are already waiting")
+            job = Job.objects.create(owner=process_owner(), **fields)
+            try:
+                future = self._pool().submit(run_job, job.id)
+            except BrokenProcessPool:
+                # A worker died earlier; start a fresh pool
+                self._executor = None
+                future = self._pool().submit(run_job, job.id)
+            self._futures[job.id] = future
+        future.add_done_callback(partial(self._finished, job.id))
+        return job
+
+    def _finished(self, job_id, future):
+        with self._lock:
+            self._futures.pop(job_id, None)
+        # run_job records its own outcome; this only catches dead workers
+        if future.cancelled() or future.exception() is None:
+            return
+        if isinstance(future.exception(), BrokenProcessPool):
+            self._executor = None
+        Job.objects.filter(id=job_id, status__in=[Job.QUEUED, Job.RUNNING]).update(
+            status=Job.FAILED, error=repr(future.exception()), finished_at=timezone.now())
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._reconcile()
+            waiting = self._waiting()
+        counts = {status: 0 for status, _ in Job.STATUSES}
+        for row in Job.objects.values('status').annotate(count=models.Count('id')):
+            counts[row['status']] = row['count']
+        return {"workers": self.workers, "queue_depth": self.depth, "waiting": waiting, "jobs": counts}
+
+
+job_queue = JobQueue(settings.JOB_WORKERS, settings.JOB_QUEUE_DEPTH)
@@ -0,0 +1,63 @@
+from rest_framework import serializers
+from src.graph.codec import decode_graph
+from src.graph.models import Graph
+from src.sequential.algorithms import BELLMAN_FORD_METHODS
+from src.sequential.batch import SINGLE_SOURCE_ALGORITHMS
+from src.utils.backends import status as backend_status
+from src.utils.responses import to_json_safe
+from .models import Job
+from .runner import ALL_PAIRS_METHODS_BY_BACKEND, REQUIRED_BACKENDS, RUNNERS
+
+
+class JobSerializer(serializers.ModelSerializer):
+    graph = serializers.PrimaryKeyRelatedField(queryset=Graph.objects.defer('data'))
+    result = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Job
+        fields = ['id', 'graph', 'algorithm', 'backend', 'params', 'status', 'progress',
+                  'result', 'negative_cycle', 'error', 'time_seconds',
+                  'created_at', 'started_at', 'finished_at']
+        read_only_fields = ['id', 'status', 'progress', 'result', 'negative_cycle', 'error',
+                            'time_seconds', 'created_at', 'started_at', 'finished_at']
+
+    def validate(self, attrs):
+        algorithm = attrs['algorithm']
+        backend = attrs.get('backend', 'sequential')
+        if (algorithm, backend) not in RUNNERS:
+            raise serializers.ValidationError(
+                f"'{algorithm}' is not available on the '{backend}' backend")
+        available, reason = backend_status(REQUIRED_BACKENDS[backend])
+        if not available:
+            raise serializers.ValidationError(f"the '{backend}' backend is unavailable: {reason}")
+
+        params = attrs.get('params', {})
+        if not isinstance(params, dict):
+            raise serializers.ValidationError({'params': 'must be an object'})
+        n = attrs['graph'].size
+        if 'source' in params and not (isinstance(params['source'], int) and 0 <= params['source'] < n):
+            raise serializers.ValidationError({'params': f'source must be an integer in [0, {n})'})
+        method = params.get('method')
+        if algorithm == 'bellman_ford' and method is not None and method not in BELLMAN_FORD_METHODS:
+            raise serializers.ValidationError({'params': f"unknown method '{method}'"})
+        if (algorithm == 'floyd_warshall' and method is not None
+                and method not in ALL_PAIRS_METHODS_BY_BACKEND.get(backend, [method])):
+            raise serializers.ValidationError({'params': f"unknown method '{method}'"})
+        if algorithm == 'batch':
+            if params.get('algorithm', 'dijkstra') not in SINGLE_SOURCE_ALGORITHMS:
+                raise serializers.ValidationError({'params': f"unknown algorithm '{params['algorithm']}'"})
+            sources = params.get('sources', 'all')
+            if sources != 'all' and not (isinstance(sources, list) and all(
+                    isinstance(s, int) and 0 <= s < n for s in sources)):
+                raise serializers.ValidationError(
+                    {'params': f'sources must be "all" or a list of integers in [0, {n})'})
+        return attrs
+
+    def get_result(self, obj):
+        # Checked first: lists defer `result`, and reading it would fetch it per row
+        if not self.context.get('include_result', True) or obj.result is None:
+            return None
+        distances = decode_graph(obj.result)
+        if obj.algorithm in ('dijkstra', 'bellman_ford'):
+            distances = distances.ravel()
+        return to_json_safe(distances)
@@ -0,0 +1,112 @@
+import socket
+from concurrent.futures import Future
+import numpy as np
+from src.graph.codec import decode_graph
+from src.graph.models import Graph
+from src.sequential.algorithms import dijkstra
+from src.utils.process import process_owner
+from src.utils.testing import GraphTestCase
+from .models import Job
+from .runner import JobQueue, QueueFull, run_job
+from .serializers import JobSerializer
+
+
+class PendingPool:
+    """Stands in for the process pool: submitted jobs wait until the test moves them on."""
+
+    def __init__(self):
+        self.futures = []
+
+    def submit(self, fn, *args):
+        future = Future()
+        self.futures.append(future)
+        return future
+
+
+def make_graph(n=6):
+    rng = np.random.default_rng(0)
+    matrix = np.where(rng.random((n, n)) < 0.5, rng.uniform(1, 10, (n, n)), np.inf)
+    np.fill_diagonal(matrix, 0)
+    graph = Graph(size=n, density=0.5)
+    graph.save_graph(matrix)
+    return graph, matrix
+
+
+class JobQueueTests(GraphTestCase):
+    def setUp(self):
+        super().setUp()
+        self.graph, self.matrix = make_graph()
+        self.queue = JobQueue(workers=1, depth=2)
+        self.pool = self.queue._executor = PendingPool()
+
+    def submit(self):
+        return self.queue.submit(graph=self.graph, algorithm='dijkstra', backend='sequential', params={})
+
+    def test_refuses_jobs_beyond_depth(self):
+        self.submit()
+        self.submit()
+        with self.assertRaises(QueueFull):
+            self.submit()
+        self.assertEqual(Job.objects.count(), 2)
+
+    def test_running_and_finished_jobs_free_their_place(self):
+        self.submit()
+        self.submit()
+        self.pool.futures[0].set_running_or_notify_cancel()
+        self.submit()
+        self.pool.futures[1].set_running_or_notify_cancel()
+        self.pool.futures[1].set_result(None)
+        self.submit()
+        self.assertEqual(self.queue.stats()['waiting'], 2)
+
+    def test_records_owner(self):
+        job = self.submit()
+        self.assertEqual(job.owner, process_owner())
+        self.assertEqual(job.status, Job.QUEUED)
+
+    def test_fails_jobs_of_dead_processes(self):
+        host = socket.gethostname()
+        owners = {
+            'legacy': '',
+            'dead': f"{host}:999999999",
+            'alive': process_owner(),
+            'remote': 'some-other-host:1',
+        }
+        jobs = {name: Job.objects.create(graph=self.graph, algorithm='dijkstra', status=Job.RUNNING,
+                                         owner=owner)
+                for name, owner in owners.items()}
+        self.queue.stats()
+
+        status = {name: Job.objects.get(id=job.id).status for name, job in jobs.items()}
+        self.assertEqual(status, {'legacy': Job.FAILED, 'dead': Job.FAILED,
+                                  'alive': Job.RUNNING, 'remote': Job.RUNNING})
+
+    def test_stale_jobs_do_not_fill_the_queue(self):
+        for _ in range(3):
+            Job.objects.create(graph=self.graph, algorithm='dijkstra', status=Job.QUEUED, owner='')
+        self.submit()
+        self.submit()
+        self.assertEqual(Job.objects.filter(status=Job.QUEUED).count(), 2)
+
+
+class RunJobTests(GraphTestCase):
+    def test_records_result(self):
+        graph, matrix = make_graph()
+        job = Job.objects.create(graph=graph, algorithm='dijkstra', params={'source': 2})
+        run_job(job.id)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.SUCCEEDED)
+        self.assertEqual(job.progress, 1.0)
+        self.assertIsNotNone(job.time_seconds)
+        np.testing.assert_allclose(decode_graph(bytes(job.result)), np.atleast_2d(dijkstra(matrix, 2)))
+
+
+class JobSerializerTests(GraphTestCase):
+    def test_lists_skip_deferred_results(self):
+        graph, _ = make_graph()
+        for _ in range(3):
+            Job.objects.create(graph=graph, algorithm='dijkstra', status=Job.SUCCEEDED, result=b'x' * 100)
+        with self.assertNumQueries(1):
+            data = JobSerializer(Job.objects.defer('result'), many=True, context={'include_result': False}).data
+        self.assertEqual([job['result'] for job in data], [None] * 3)
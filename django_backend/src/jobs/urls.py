@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import JobListAPI, JobDetailAPI
+
+urlpatterns = [
+    path('', JobListAPI.as_view(), name='jobs'),                       # POST to submit, GET to list
+    path('<int:job_id>/', JobDetailAPI.as_view(), name='job_detail'),  # GET to poll
+]
@@ -0,0 +1,35 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from .models import Job
+from .runner import job_queue, QueueFull
+from .serializers import JobSerializer
+
+
+class JobListAPI(APIView):
+    def post(self, request):
+        serializer = JobSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            job = job_queue.submit(**serializer.validated_data)
+        except QueueFull as e:
+            return Response({"message": str(e)}, status=status.HTTP_429_TOO_MANY_REQUESTS)
+        return Response(JobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    def get(self, request):
+        jobs = Job.objects.defer('result').order_by('-id')[:50]
+        return Response({
+            **job_queue.stats(),
+            "recent": JobSerializer(jobs, many=True, context={'include_result': False}).data,
+        })
+
+
+class JobDetailAPI(APIView):
+    def get(self, request, job_id):
+        try:
+            job = Job.objects.get(id=job_id)
+        except Job.DoesNotExist:
+            return Response({"message": "Job not found"}, status=status.HTTP_404_NOT_FOUND)
+        include_result = request.GET.get('result', '1') not in ('0', 'false')
+        return Response(JobSerializer(job, context={'include_result': include_result}).data)
@@ -0,0 +1,171 @@
+from mpi4py import MPI
+from src.sequential.algorithms import NegativeCycleError, _find_cycle
+from src.utils.timing import timeit
+import numpy as np
+
+# Kernels run SPMD on every rank of the pool communicator (the Django process
+# is rank 0). Each returns the full result on rank 0 and None elsewhere.
+
+
+def block_partition(n: int, size: int):
+    """Contiguous near-equal ranges: (counts, displacements) per rank."""
+    counts = np.full(size, n // size, dtype=np.int64)
+    counts[:n % size] += 1
+    displs = np.zeros(size, dtype=np.int64)
+    np.cumsum(counts[:-1], out=displs[1:])
+    return counts, displs
+
+
+@timeit
+def bellman_ford_mpi(comm, graph, source):
+    """
+    Edge-partitioned Bellman-Ford: each rank relaxes the edges leaving its
+    block of rows, vectorised, and the tentative distances are merged with
+    Allreduce(MIN) every round. All ranks then see the same distances, so
+    they agree to stop after a round without change, and a change in round
+    n (a negative cycle) is noticed everywhere at once.
+    """
+    rank, size = comm.Get_rank(), comm.Get_size()
+    graph = np.asarray(graph)
+    n = len(graph)
+    counts, displs = block_partition(n, size)
+    slab = graph[displs[rank]:displs[rank] + counts[rank]]
+    rows, dst = np.nonzero(np.isfinite(slab))
+    src = rows + displs[rank]
+    weights = slab[rows, dst].astype(np.float64)
+
+    dist = np.full(n, np.inf)
+    dist[source] = 0.0
+    merged = np.empty(n)
+    pred = np.full(n, -1, dtype=np.int64)
+
+    for round_ in range(max(n, 1)):
+        local = dist.copy()
+        local_pred = np.full(n, -1, dtype=np.int64)
+        candidate = dist[src] + weights
+        improving = np.flatnonzero(candidate < dist[dst])
+        if improving.size:
+            # Keep only the smallest local candidate for each target
+            order = np.lexsort((candidate[improving], dst[improving]))
+            improving = improving[order]
+            targets = dst[improving]
+            improving = improving[np.concatenate(([True], targets[1:] != targets[:-1]))]
+            local[dst[improving]] = candidate[improving]
+            local_pred[dst[improving]] = src[improving]
+
+        comm.Allreduce(local, merged, op=MPI.MIN)
+        changed = np.flatnonzero(merged < dist)
+        if changed.size == 0:
+            break
+
+        # Predecessors come from whichever rank produced the winning candidate
+        local_pred[local != merged] = -1
+        comm.Allreduce(MPI.IN_PLACE, local_pred, op=MPI.MAX)
+        pred[changed] = local_pred[changed]
+        dist, merged = merged, dist
+
+        if round_ == n - 1:
+            # Still improving after n - 1 full rounds
+            if rank == 0:
+                raise NegativeCycleError(_find_cycle(pred, changed))
+            return None
+
+    return dist if rank == 0 else None
+
+
+# Matches the C layout of MPI.DOUBLE_INT: {double value; int index;} plus padding
+DOUBLE_INT = np.dtype([('value', np.float64), ('index', np.int32)], align=True)
+
+
+@timeit
+def dijkstra_mpi(comm, graph, source, settle_ties=False):
+    """
+    Block-partitioned Dijkstra: each rank owns a contiguous vertex range and
+    only keeps and relaxes distances for that slice. The next vertex to
+    settle is found with one Allreduce(MINLOC) on a (distance, vertex) pair.
+    With `settle_ties`, every vertex at the minimum distance is settled in
+    the same round, which needs fewer rounds on integer-weighted graphs.
+    """
+    rank, size = comm.Get_rank(), comm.Get_size()
+    graph = np.asarray(graph)
+    n = len(graph)
+    counts, displs = block_partition(n, size)
+    lo, hi = displs[rank], displs[rank] + counts[rank]
+
+    dist = np.full(hi - lo, np.inf)
+    settled = np.zeros(hi - lo, dtype=bool)
+    if lo <= source < hi:
+        dist[source - lo] = 0.0
+
+    local_min = np.zeros(1, dtype=DOUBLE_INT)
+    global_min = np.zeros(1, dtype=DOUBLE_INT)
+    tie_counts = np.zeros(size, dtype=np.int32)
+    while True:
+        open_dist = np.where(settled, np.inf, dist)
+        best = int(np.argmin(open_dist)) if open_dist.size else 0
+        local_min[0] = (open_dist[best], lo + best) if open_dist.size else (np.inf, n)
+        comm.Allreduce([local_min, MPI.DOUBLE_INT], [global_min, MPI.DOUBLE_INT], op=MPI.MINLOC)
+        d_min, u = float(global_min['value'][0]), int(global_min['index'][0])
+        if d_min == np.inf:
+            break
+
+        if settle_ties:
+            mine = np.flatnonzero(open_dist == d_min).astype(np.int32)
+            settled[mine] = True
+            comm.Allgather(np.array([mine.size], dtype=np.int32), tie_counts)
+            frontier = np.empty(int(tie_counts.sum()), dtype=np.int32)
+            tie_displs = np.concatenate(([0], np.cumsum(tie_counts[:-1])))
+            comm.Allgatherv(mine + np.int32(lo), [frontier, (tie_counts.tolist(), tie_displs.tolist())])
+            candidate = d_min + graph[frontier, lo:hi].min(axis=0)
+        else:
+            if lo <= u < hi:
+                settled[u - lo] = True
+            candidate = d_min + graph[u, lo:hi]
+
+        improve = ~settled & (candidate < dist)
+        dist[improve] = candidate[improve]
+
+    if rank != 0:
+        comm.Gatherv(dist, None, root=0)
+        return None
+    result = np.empty(n)
+    comm.Gatherv(dist, [result, (counts.tolist(), displs.tolist())], root=0)
+    return result
+
+
+@timeit
+def floyd_warshall_mpi(comm, graph):
+    """
+    Block-row Floyd-Warshall: each rank owns a contiguous slab of rows. For
+    every k the owner of row k broadcasts it (a contiguous buffer, no
+    pickling) and all ranks relax their slab with one vectorised update.
+    Rank 0 assembles the matrix with Gatherv.
+    """
+    rank, size = comm.Get_rank(), comm.Get_size()
+    graph = np.asarray(graph)
+    n = len(graph)
+    counts, displs = block_partition(n, size)
+    lo, hi = displs[rank], displs[rank] + counts[rank]
+    owners = np.repeat(np.arange(size), counts)
+
+    local = np.array(graph[lo:hi])
+    row_k = np.empty(n, dtype=local.dtype)
+    for k in range(n):
+        if owners[k] == rank:
+            row_k[:] = local[k - lo]
+        comm.Bcast(row_k, root=int(owners[k]))
+        np.minimum(local, local[:, k, None] + row_k, out=local)
+
+    if rank != 0:
+        comm.Gatherv(local, None, root=0)
+        return None
+    result = np.empty((n, n), dtype=local.dtype)
+    comm.Gatherv(local, [result, ((counts * n).tolist(), (displs * n).tolist())], root=0)
+    return result
+
+
+TASKS = {
+    'bellman_ford': bellman_ford_mpi,
+    'dijkstra': dijkstra_mpi,
+    'floyd_warshall': floyd_warshall_mpi,
+}
@@ -0,0 +1,129 @@
+import atexit
+import sys
+import threading
+from collections import OrderedDict
+import numpy as np
+from django.conf import settings
+from src.utils.backends import BackendUnavailable, mark_unavailable
+from src.utils.metrics import phase
+
+
+class MPIPool:
+    """
+    Long-lived MPI worker group the views dispatch to. This process is rank 0
+    of the pool communicator and takes part in every kernel; the workers run
+    src.mpi.worker. Under mpirun (world size > 1) the world communicator is
+    the pool, otherwise MPI_WORKERS processes are spawned on first use.
+
+    Graphs are broadcast once per (id, version) and stay resident on the
+    workers, LRU-bounded by total bytes, so repeated queries only ship a
+    small command. mpi4py is imported lazily so processes that never touch
+    MPI (and anything forked from them) don't initialise it.
+    """
+
+    def __init__(self, workers: int, max_bytes: int):
+        self.workers = workers
+        self.max_bytes = max_bytes
+        self._comm = None
+        self._intercomm = None
+        self._resident = OrderedDict()  # (graph_id, version) -> bytes
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.runs = 0
+
+    def _connect(self):
+        from mpi4py import MPI
+        world = MPI.COMM_WORLD
+        if world.Get_size() > 1:
+            if world.Get_rank() != 0:
+                raise RuntimeError("the Django process must be rank 0 of the MPI world")
+            self._comm = world
+        else:
+            info = MPI.Info.Create()
+            info.Set('wdir', str(settings.BASE_DIR))
+            self._intercomm = MPI.COMM_SELF.Spawn(
+                sys.executable, args=['-m', 'src.mpi.worker'], maxprocs=self.workers, info=info)
+            info.Free()
+            self._comm = self._intercomm.Merge(high=False)
+        atexit.register(self.shutdown)
+        return self._comm
+
+    def _start(self):
+        # The backend probe only checks that mpi4py is installed; starting
+        # the workers is the first real use of MPI and can still fail
+        # (MPI_ERR_SPAWN, no process manager), and then MPI is not offered
+        try:
+            return self._connect()
+        except Exception as e:
+            reason = f"the MPI worker pool did not start: {e}"
+            mark_unavailable('mpi', reason)
+            raise BackendUnavailable(reason) from e
+
+    def _make_resident(self, comm, key, graph: np.ndarray):
+        from .worker import LOAD
+        if key in self._resident:
+            self._resident.move_to_end(key)
+            return
+
+        # Older versions of the same graph will never be asked for again
+        evicted = [old for old in self._resident if old[0] == key[0]]
+        for old in evicted:
+            self._bytes -= self._resident.pop(old)
+        while self._resident and self._bytes + graph.nbytes > self.max_bytes:
+            old, nbytes = self._resident.popitem(last=False)
+            self._bytes -= nbytes
+            evicted.append(old)
+
+        comm.bcast((LOAD, key, graph.shape, graph.dtype.str, evicted), root=0)
+        # Bcast wants a writable buffer even on the root
+        buffer = graph if graph.flags.writeable and graph.flags.c_contiguous else np.array(graph)
+        comm.Bcast(buffer, root=0)
+        self._resident[key] = graph.nbytes
+        self._bytes += graph.nbytes
+        self.loads += 1
+
+    def run(self, task: str, graph_obj, graph: np.ndarray, *args):
+        """
+        Run kernel `task` (see src.mpi.algorithms.TASKS) on the whole pool and
+        return its (result, elapsed) from rank 0. Calls are serialised.
+        Raises BackendUnavailable if the pool cannot be started.
+        """
+        from .algorithms import TASKS
+        from .worker import RUN
+        with self._lock:
+            comm = self._comm or self._start()
+            key = (graph_obj.id, graph_obj.version)
+            with phase('transfer'):
+                self._make_resident(comm, key, graph)
+            comm.bcast((RUN, task, key, args), root=0)
+            self.runs += 1
+            return TASKS[task](comm, graph, *args)
+
+    def shutdown(self):
+        from .worker import STOP
+        with self._lock:
+            if self._comm is None:
+                return
+            self._comm.bcast((STOP,), root=0)
+            if self._intercomm is not None:
+                self._comm.Free()
+                self._intercomm.Disconnect()
+            self._comm = self._intercomm = None
+            self._resident.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "connected": self._comm is not None,
+                "size": self._comm.Get_size() if self._comm is not None else None,
+                "resident_graphs": len(self._resident),
+                "resident_bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "loads": self.loads,
+                "runs": self.runs,
+            }
+
+
+mpi_pool = MPIPool(settings.MPI_WORKERS, settings.MPI_RESIDENT_MAX_BYTES)
@@ -0,0 +1,89 @@
+"""
+Strong-scaling report for the MPI kernels on 1..N local ranks:
+
+    python -m src.mpi.scaling --max-ranks 4 --size 1024 [--algorithm floyd_warshall]
+
+For every rank count the driver runs `mpirun -n P python -m src.mpi.scaling --run ...`.
+Rank 0 checks the result against the sequential implementation and prints
+one JSON line, and the driver tabulates time, speedup and efficiency.
+"""
+import argparse
+import json
+import shlex
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+def _reference(algorithm, graph):
+    from src.sequential.algorithms import bellman_ford, dijkstra, floyd_warshall_numpy
+    if algorithm == 'floyd_warshall':
+        return floyd_warshall_numpy(graph)
+    return {'bellman_ford': bellman_ford, 'dijkstra': dijkstra}[algorithm](graph, 0)
+
+
+def _run(args):
+    import numpy as np
+    from mpi4py import MPI
+    from src.utils.graph import generate_random_graph
+    from .algorithms import TASKS
+
+    comm = MPI.COMM_WORLD
+    # Same seed on every rank, so the graph is "resident" without a broadcast
+    graph = generate_random_graph(args.size, args.density, seed=args.seed)
+    task_args = () if args.algorithm == 'floyd_warshall' else (0,)
+    if args.settle_ties:
+        task_args += (True,)
+
+    times = []
+    for _ in range(args.repeat):
+        comm.Barrier()
+        result, elapsed = TASKS[args.algorithm](comm, graph, *task_args)
+        times.append(comm.allreduce(elapsed, op=MPI.MAX))
+
+    if comm.Get_rank() == 0:
+        correct = bool(np.array_equal(result, _reference(args.algorithm, graph)))
+        print(json.dumps({"ranks": comm.Get_size(), "seconds": min(times), "correct": correct}))
+
+
+def _report(args):
+    rows = []
+    for ranks in range(1, args.max_ranks + 1):
+        command = [args.mpirun, *shlex.split(args.mpirun_args), '-n', str(ranks),
+                   sys.executable, '-m', 'src.mpi.scaling', '--run',
+                   '--algorithm', args.algorithm, '--size', str(args.size),
+                   '--density', str(args.density), '--seed', str(args.seed),
+                   '--repeat', str(args.repeat)] + (['--settle-ties'] if args.settle_ties else [])
+        out = subprocess.run(command, cwd=PROJECT_DIR, capture_output=True, text=True, check=True)
+        rows.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    base = rows[0]["seconds"]
+    print(f"{args.algorithm}, n={args.size}, density={args.density}")
+    print(f"{'ranks':>5} {'seconds':>10} {'speedup':>8} {'efficiency':>10} {'correct':>8}")
+    for row in rows:
+        speedup = base / row["seconds"]
+        print(f"{row['ranks']:>5} {row['seconds']:>10.4f} {speedup:>8.2f} "
+              f"{speedup / row['ranks']:>10.2f} {str(row['correct']):>8}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--algorithm', default='floyd_warshall',
+                        choices=['floyd_warshall', 'bellman_ford', 'dijkstra'])
+    parser.add_argument('--size', type=int, default=512)
+    parser.add_argument('--density', type=float, default=0.3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--settle-ties', action='store_true', help="dijkstra only")
+    parser.add_argument('--max-ranks', type=int, default=4)
+    parser.add_argument('--mpirun', default='mpirun')
+    parser.add_argument('--mpirun-args', default='', help="extra mpirun flags, e.g. '--oversubscribe'")
+    parser.add_argument('--run', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    _run(args) if args.run else _report(args)
+
+
+if __name__ == '__main__':
+    main()
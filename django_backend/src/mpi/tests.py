@@ -1,3 +1,49 @@
-from django.test import TestCase
+from unittest import mock
+from src.planner.costs import CANDIDATES, usable
+from src.utils import backends
+from src.utils.testing import GraphTestCase, random_graph, stored_graph
+from .pool import MPIPool
 
-# Create your tests here.
+
+@mock.patch('src.mpi.views.backend_status', return_value=(True, None))
+class DijkstraViewTests(GraphTestCase):
+    # Requests rejected before anything is sent to the MPI pool
+    def setUp(self):
+        super().setUp()
+        self.matrix = random_graph(12, 0.3, 1)
+
+    def get(self, query):
+        with mock.patch('src.mpi.views.mpi_pool') as pool:
+            response = self.client.get(f'/api/mpi/dijkstra/{stored_graph(self.matrix).id}/{query}')
+        pool.run.assert_not_called()
+        return response
+
+    def test_rejects_invalid_sources(self, _):
+        for source in ('x', '-1', '12'):
+            self.assertEqual(self.get(f'?source={source}').status_code, 400)
+
+    def test_rejects_point_queries(self, _):
+        response = self.get('?source=0&target=3')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('target', response.json()['message'])
+
+    def test_rejects_negative_weights(self, _):
+        self.matrix[0, 1] = -1.0
+        self.assertEqual(self.get('?source=0').status_code, 400)
+
+
+@mock.patch.dict(backends._status, {'mpi': (True, None)})
+class PoolStartupTests(GraphTestCase):
+    @mock.patch.object(MPIPool, '_connect', side_effect=RuntimeError("MPI_ERR_SPAWN: could not spawn processes"))
+    def test_failed_start_disables_the_backend(self, connect):
+        graph = stored_graph(random_graph(8, 0.3, 2))
+        for _ in range(2):
+            response = self.client.get(f'/api/mpi/floyd_warshall/{graph.id}/')
+            self.assertEqual(response.status_code, 503)
+            self.assertIn('MPI_ERR_SPAWN', response.json()['message'])
+        connect.assert_called_once()
+
+        self.assertFalse(any(usable(c) for c in CANDIDATES if c.backend == 'mpi'))
+        mpi = next(entry for entry in self.client.get('/api/backends/').json() if entry['name'] == 'mpi')
+        self.assertFalse(mpi['available'])
+        self.assertIn('MPI_ERR_SPAWN', mpi['reason'])
@@ -1,152 +1,137 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from mpi4py import MPI
 from src.graph.models import Graph
-from src.utils.config import INFINITY
-from src.utils.timing import timeit
-import copy
-
-@timeit
-def bellman_ford_mpi(graph, src, rank, size):
-    n = len(graph)
-    dist = [INFINITY] * n
-    dist[src] = 0
-
-    for _ in range(n - 1):
-        for u in range(n):
-            for v in range(rank, n, size):
-                w = graph[u][v]
-                if w != INFINITY and dist[u] + w < dist[v]:
-                    dist[v] = dist[u] + w
-    return dist
+from src.graph.cache import load_graph
+from src.graph.results import result_store
+from src.sequential.algorithms import NegativeCycleError
+from src.sequential.views import (
+    invalid_source,
+    negative_weights,
+    parse_source,
+    point_queries_unsupported,
+)
+from src.utils.backends import BackendUnavailable, status as backend_status
+from src.utils.responses import DISTANCE_RENDERERS, distance_response
+from .pool import mpi_pool
+
+
+def mpi_unavailable():
+    available, reason = backend_status('mpi')
+    if available:
+        return None
+    return Response({"status": "failure", "message": f"MPI backend unavailable: {reason}"},
+                    status=status.HTTP_503_SERVICE_UNAVAILABLE)
 
 
 class BellmanFordAPI(APIView):
+    renderer_classes = DISTANCE_RENDERERS
+
     def get(self, request, graph_id):
-        comm = MPI.COMM_WORLD
-        rank = comm.Get_rank()
-        size = comm.Get_size()
+        unavailable = mpi_unavailable()
+        if unavailable:
+            return unavailable
 
         try:
-            graph_obj = Graph.objects.get(id=graph_id)
-            graph = graph_obj.get_graph()
-
-            local, elapsed = bellman_ford_mpi(graph, 0, rank, size)
-            all_parts = comm.gather(local, root=0)
-
-            if rank == 0:
-                # take min over each column
-                final = [min(part[j] for part in all_parts) for j in range(len(graph))]
-                return Response({
-                    "result": final,
-                    "time_seconds": elapsed
-                }, status=status.HTTP_200_OK)
+            graph_obj, graph = load_graph(graph_id)
+            source = parse_source(request.GET.get('source'), len(graph))
+            if source is None:
+                return invalid_source(len(graph))
+
+            cycle = None
+            hit = result_store.get(graph_obj, "bellman_ford", "mpi", source)
+            if hit is not None:
+                (final, elapsed), cached = hit, True
             else:
-                # non-root processes return nothing; root handles response
-                return Response(status=status.HTTP_204_NO_CONTENT)
+                cached = False
+                try:
+                    final, elapsed = mpi_pool.run("bellman_ford", graph_obj, graph, source)
+                    result_store.put(graph_obj, "bellman_ford", "mpi", source, final, elapsed)
+                except NegativeCycleError as e:
+                    # A negative cycle is a result, not a server error
+                    final, elapsed, cycle = None, None, e.cycle
+
+            return distance_response(request, {
+                "source": source,
+                "negative_cycle": cycle,
+                "time_seconds": elapsed,
+                "cached": cached
+            }, final, key='result')
         except Graph.DoesNotExist:
             return Response({"status": "failure", "message": "Graph not found"},
                             status=status.HTTP_404_NOT_FOUND)
-
-@timeit
-def dijkstra_mpi(graph, source, rank, size):
-    n = len(graph)
-    dist = [INFINITY] * n
-    visited = [False] * n
-    dist[source] = 0
-
-    for _ in range(n):
-        # each rank finds its local min
-        local_min = (INFINITY, -1)
-        for i in range(rank, n, size):
-            if not visited[i] and dist[i] < local_min[0]:
-                local_min = (dist[i], i)
-
-        # global reduce to find overall min
-        global_min = MPI.COMM_WORLD.allreduce(local_min, op=MPI.MIN)
-        u = global_min[1]
-        if u < 0:
-            break
-
-        visited[u] = True
-        for v in range(n):
-            w = graph[u][v]
-            if not visited[v] and w != INFINITY:
-                nd = dist[u] + w
-                if nd < dist[v]:
-                    dist[v] = nd
-
-    # gather the full dist array at root
-    results = MPI.COMM_WORLD.gather(dist, root=0)
-    if MPI.COMM_WORLD.Get_rank() == 0:
-        return results[0]
+        except BackendUnavailable:
+            return mpi_unavailable()
 
 
 class DijkstraParallelAPI(APIView):
+    renderer_classes = DISTANCE_RENDERERS
+
     def get(self, request, graph_id):
-        comm = MPI.COMM_WORLD
-        rank = comm.Get_rank()
-        size = comm.Get_size()
-        source = int(request.GET.get('source', 0))
+        unavailable = mpi_unavailable()
+        if unavailable:
+            return unavailable
+
+        # ?settle_ties=1 settles every vertex at the current minimum in one round
+        settle_ties = request.GET.get('settle_ties', '0') not in ('0', 'false', '')
 
         try:
-            graph_obj = Graph.objects.get(id=graph_id)
-            graph = graph_obj.get_graph()
-
-            result, elapsed = dijkstra_mpi(graph, source, rank, size)
-            if rank == 0:
-                return Response({
-                    "result": result,
-                    "time_seconds": elapsed
-                }, status=status.HTTP_200_OK)
-            else:
-                return Response(status=status.HTTP_204_NO_CONTENT)
+            graph_obj, graph = load_graph(graph_id)
+            source = parse_source(request.GET.get('source'), len(graph))
+            if source is None:
+                return invalid_source(len(graph))
+            rejected = point_queries_unsupported(request, 'mpi') or negative_weights(graph)
+            if rejected:
+                return rejected
+
+            result, elapsed, cached = result_store.get_or_compute(
+                graph_obj, "dijkstra", "mpi",
+                lambda: mpi_pool.run("dijkstra", graph_obj, graph, source, settle_ties), source=source)
+
+            return distance_response(request, {
+                "source": source,
+                "settle_ties": settle_ties,
+                "time_seconds": elapsed,
+                "cached": cached
+            }, result, key='result')
         except Graph.DoesNotExist:
             return Response({"status": "failure", "message": "Graph not found"},
                             status=status.HTTP_404_NOT_FOUND)
+        except BackendUnavailable:
+            return mpi_unavailable()
         except Exception as e:
             return Response({"status": "failure", "message": str(e)},
                             status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-@timeit
-def floyd_warshall_mpi(graph, rank, size):
-    n = len(graph)
-    dist = copy.deepcopy(graph)
-
-    for k in range(n):
-        for i in range(rank, n, size):
-            for j in range(n):
-                if dist[i][k] + dist[k][j] < dist[i][j]:
-                    dist[i][j] = dist[i][k] + dist[k][j]
-    return dist
-
 
 class FloydWarshallAPI(APIView):
+    renderer_classes = DISTANCE_RENDERERS
+
     def get(self, request, graph_id):
-        comm = MPI.COMM_WORLD
-        rank = comm.Get_rank()
-        size = comm.Get_size()
+        unavailable = mpi_unavailable()
+        if unavailable:
+            return unavailable
 
         try:
-            graph_obj = Graph.objects.get(id=graph_id)
-            graph = graph_obj.get_graph()
-
-            local, elapsed = floyd_warshall_mpi(graph, rank, size)
-            all_parts = comm.gather(local, root=0)
-
-            if rank == 0:
-                # reconstruct final matrix by taking min across partitions
-                final = [min(col) for col in zip(*all_parts)]
-                return Response({
-                    "result": final,
-                    "time_seconds": elapsed
-                }, status=status.HTTP_200_OK)
-            else:
-                return Response(status=status.HTTP_204_NO_CONTENT)
+            graph_obj, graph = load_graph(graph_id)
+            final, elapsed, cached = result_store.get_or_compute(
+                graph_obj, "floyd_warshall", "mpi",
+                lambda: mpi_pool.run("floyd_warshall", graph_obj, graph))
+
+            return distance_response(request, {
+                "time_seconds": elapsed,
+                "cached": cached
+            }, final, key='result')
         except Graph.DoesNotExist:
             return Response({"status": "failure", "message": "Graph not found"},
                             status=status.HTTP_404_NOT_FOUND)
+        except BackendUnavailable:
+            return mpi_unavailable()
         except Exception as e:
             return Response({"status": "failure", "message": str(e)},
                             status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class PoolStats(APIView):
+    def get(self, request):
+        return Response(mpi_pool.stats())
@@ -0,0 +1,62 @@
+"""
+Worker side of the MPI pool. Either spawned by the Django process
+(see src.mpi.pool) or started next to it under mpirun:
+
+    mpirun -n 1 python -m src.manage runserver --noreload : -n 4 python -m src.mpi.worker
+
+Deliberately free of Django imports so workers start quickly.
+"""
+import sys
+import traceback
+from collections import OrderedDict
+import numpy as np
+from mpi4py import MPI
+from .algorithms import TASKS
+
+# Commands broadcast from rank 0
+LOAD = 'load'  # (LOAD, key, shape, dtype, evicted keys), followed by Bcast of the matrix
+RUN = 'run'    # (RUN, task, key, args)
+STOP = 'stop'  # (STOP,)
+
+
+def receive_graph(comm, shape, dtype) -> np.ndarray:
+    graph = np.empty(shape, dtype=dtype)
+    comm.Bcast(graph, root=0)
+    graph.flags.writeable = False
+    return graph
+
+
+def serve(comm):
+    """Execute commands from rank 0 until told to stop."""
+    graphs = OrderedDict()
+    while True:
+        command = comm.bcast(None, root=0)
+        if command[0] == STOP:
+            return
+        if command[0] == LOAD:
+            _, key, shape, dtype, evicted = command
+            for old in evicted:
+                graphs.pop(old, None)
+            graphs[key] = receive_graph(comm, shape, dtype)
+        elif command[0] == RUN:
+            _, task, key, args = command
+            try:
+                TASKS[task](comm, graphs[key], *args)
+            except Exception:
+                # Kernels fail on every rank alike (bad input); rank 0 reports it
+                traceback.print_exc(file=sys.stderr)
+
+
+def main():
+    parent = MPI.Comm.Get_parent()
+    if parent != MPI.COMM_NULL:
+        comm = parent.Merge(high=True)
+        serve(comm)
+        comm.Free()
+        parent.Disconnect()
+    else:
+        serve(MPI.COMM_WORLD)
+
+
+if __name__ == '__main__':
+    main()
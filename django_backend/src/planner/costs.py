@@ -0,0 +1,178 @@
+import csv
+import json
+import math
+import threading
+from pathlib import Path
+from typing import Callable, NamedTuple
+import numpy as np
+from django.conf import settings
+from src.utils.backends import is_available
+
+QUERIES = ('single_source', 'point_to_point', 'all_pairs')
+
+
+def _log(n):
+    return math.log2(n + 1)
+
+
+class Candidate(NamedTuple):
+    query: str
+    algorithm: str
+    backend: str   # registry name, see src.utils.backends
+    method: str    # as in the benchmark rows it is calibrated from
+    # Asymptotic work in (n, m); the calibrated model scales it to seconds
+    work: Callable
+    # View that runs it (dotted path) and the query parameters it needs
+    view: str
+    params: dict
+    negative_weights: bool = False
+
+
+# Every way the endpoints can answer each query. The cuda endpoints run on
+# cupy whenever a GPU is usable, so their numpy rows only stand in without one.
+CANDIDATES = [
+    Candidate('single_source', 'dijkstra', 'sequential', 'heap',
+              lambda n, m: (n + m) * _log(n), 'src.sequential.views.DijkstraCPU', {}),
+    Candidate('single_source', 'dijkstra', 'numba', 'csr',
+              lambda n, m: (n + m) * _log(n), 'src.jit.views.DijkstraJIT', {}),
+    Candidate('single_source', 'dijkstra', 'numpy', 'array',
+              lambda n, m: n * n, 'src.cuda.views.CudaDijkstraAPI', {}),
+    Candidate('single_source', 'dijkstra', 'cupy', 'array',
+              lambda n, m: n * n, 'src.cuda.views.CudaDijkstraAPI', {}),
+    Candidate('single_source', 'dijkstra', 'mpi', 'minloc',
+              lambda n, m: n * n, 'src.mpi.views.DijkstraParallelAPI', {}),
+    Candidate('single_source', 'bellman_ford', 'sequential', 'edge_list',
+              lambda n, m: m * _log(n), 'src.sequential.views.BellmanFordCPU', {'method': 'edge_list'}, True),
+    Candidate('single_source', 'bellman_ford', 'sequential', 'spfa',
+              lambda n, m: m * _log(n), 'src.sequential.views.BellmanFordCPU', {'method': 'spfa'}, True),
+    Candidate('single_source', 'bellman_ford', 'numba', 'edge_list',
+              lambda n, m: m * _log(n), 'src.jit.views.BellmanFordJIT', {}, True),
+    Candidate('single_source', 'bellman_ford', 'mpi', 'allreduce',
+              lambda n, m: m * _log(n), 'src.mpi.views.BellmanFordAPI', {}, True),
+    Candidate('point_to_point', 'dijkstra', 'sequential', 'to_target',
+              lambda n, m: (n + m) * _log(n), 'src.sequential.views.DijkstraCPU', {'mode': 'unidirectional'}),
+    Candidate('point_to_point', 'dijkstra', 'sequential', 'bidirectional',
+              lambda n, m: (n + m) * _log(n), 'src.sequential.views.DijkstraCPU', {'mode': 'bidirectional'}),
+    Candidate('point_to_point', 'dijkstra', 'numba', 'to_target',
+              lambda n, m: (n + m) * _log(n), 'src.jit.views.DijkstraJIT', {'mode': 'unidirectional'}),
+    Candidate('all_pairs', 'floyd_warshall', 'sequential', 'numpy',
+              lambda n, m: n ** 3, 'src.sequential.views.FloydWarshallCPU', {'method': 'numpy'}, True),
+    Candidate('all_pairs', 'floyd_warshall', 'sequential', 'blocked',
+              lambda n, m: n ** 3, 'src.sequential.views.FloydWarshallCPU', {'method': 'blocked'}, True),
+    Candidate('all_pairs', 'floyd_warshall', 'sequential', 'johnson',
+              lambda n, m: n * (n + m) * _log(n), 'src.sequential.views.FloydWarshallCPU',
+              {'method': 'johnson'}, True),
+    Candidate('all_pairs', 'floyd_warshall', 'numba', 'parallel',
+              lambda n, m: n ** 3, 'src.jit.views.FloydWarshallJIT', {'method': 'floyd_warshall'}, True),
+    Candidate('all_pairs', 'floyd_warshall', 'numba', 'johnson',
+              lambda n, m: n * (n + m) * _log(n), 'src.jit.views.FloydWarshallJIT', {'method': 'johnson'}, True),
+    Candidate('all_pairs', 'floyd_warshall', 'numpy', 'array',
+              lambda n, m: n ** 3, 'src.cuda.views.CudaFloydWarshallAPI', {}, True),
+    Candidate('all_pairs', 'floyd_warshall', 'cupy', 'array',
+              lambda n, m: n ** 3, 'src.cuda.views.CudaFloydWarshallAPI', {}, True),
+    Candidate('all_pairs', 'floyd_warshall', 'mpi', 'row_block',
+              lambda n, m: n ** 3, 'src.mpi.views.FloydWarshallAPI', {}, True),
+]
+
+
+def candidate_key(candidate) -> tuple:
+    return candidate.algorithm, candidate.backend, candidate.method
+
+
+def usable(candidate) -> bool:
+    if candidate.backend == 'numpy' and is_available('cupy'):
+        return False
+    return is_available(candidate.backend)
+
+
+def _fit(features: np.ndarray, seconds: np.ndarray) -> np.ndarray:
+    """Least squares with non-negative coefficients: refit without any that come out negative."""
+    active = list(range(features.shape[1]))
+    coef = np.zeros(features.shape[1])
+    while active:
+        solution, *_ = np.linalg.lstsq(features[:, active], seconds, rcond=None)
+        if (solution >= 0).all():
+            coef[active] = solution
+            break
+        active = [i for i, c in zip(active, solution) if c >= 0]
+    return coef
+
+
+class CostModel:
+    """
+    Predicted seconds per candidate as a + b*n + c*work(n, m), fitted per
+    (algorithm, backend, method) to the median timings of benchmark rows
+    (the output of `manage.py benchmark --output`). The n term covers
+    per-vertex loop overhead, `a` fixed costs such as MPI round trips.
+    """
+
+    def __init__(self, rows):
+        samples = {}
+        for row in rows:
+            if row.get('error') or not row.get('median_seconds'):
+                continue
+            n = int(row['size'])
+            m = float(row['density']) * n * n
+            samples.setdefault((row['algorithm'], row['backend'], row['method']), []).append(
+                (n, m, float(row['median_seconds'])))
+
+        self.coefficients = {}
+        for candidate in CANDIDATES:
+            points = samples.get(candidate_key(candidate))
+            if not points:
+                continue
+            features = np.array([[1.0, n, candidate.work(n, m)] for n, m, _ in points])
+            # Relative error matters, not absolute: weight each row by 1/seconds
+            seconds = np.array([s for _, _, s in points])
+            self.coefficients[candidate_key(candidate)] = _fit(
+                features / seconds[:, None], np.ones(len(points)))
+
+    def predict(self, candidate, n: int, m: int):
+        """Predicted seconds, or None if no benchmark rows cover the candidate."""
+        coef = self.coefficients.get(candidate_key(candidate))
+        if coef is None:
+            return None
+        return float(coef @ [1.0, n, candidate.work(n, m)])
+
+    @classmethod
+    def from_file(cls, path) -> 'CostModel':
+        path = Path(path)
+        if not path.exists():
+            return cls([])
+        if path.suffix == '.csv':
+            with path.open(newline='') as f:
+                return cls(list(csv.DictReader(f)))
+        return cls(json.loads(path.read_text()))
+
+
+_model = None
+_lock = threading.Lock()
+
+
+def cost_model() -> CostModel:
+    """The model calibrated from settings.PLANNER_CALIBRATION, loaded once per process."""
+    global _model
+    with _lock:
+        if _model is None:
+            _model = CostModel.from_file(settings.PLANNER_CALIBRATION)
+        return _model
+
+
+def plan(query: str, n: int, m: int, negative_weights: bool, model: CostModel = None):
+    """
+    (chosen candidate, ranking) for `query` on a graph with n vertices and m
+    edges. The ranking lists every usable candidate with its predicted
+    seconds, cheapest first; uncalibrated candidates come last in table
+    order and are only chosen when nothing is calibrated. Returns
+    (None, []) when no candidate can answer the query.
+    """
+    model = model or cost_model()
+    ranking = []
+    for candidate in CANDIDATES:
+        if candidate.query != query or not usable(candidate):
+            continue
+        if negative_weights and not candidate.negative_weights:
+            continue
+        ranking.append((candidate, model.predict(candidate, n, m)))
+    ranking.sort(key=lambda item: (item[1] is None, item[1] or 0.0))
+    return (ranking[0][0] if ranking else None), ranking
@@ -0,0 +1,90 @@
+from unittest import mock
+import numpy as np
+from django.test import SimpleTestCase
+from src.graph.models import Graph
+from src.sequential.algorithms import dijkstra
+from src.utils.testing import GraphTestCase
+from .costs import CANDIDATES, CostModel, candidate_key, plan
+
+
+def candidate(algorithm, backend, method):
+    return next(c for c in CANDIDATES if candidate_key(c) == (algorithm, backend, method))
+
+
+def rows(candidate, fixed, per_vertex, per_work, density=0.05):
+    """Benchmark rows timed exactly as fixed + per_vertex * n + per_work * work(n, m)."""
+    algorithm, backend, method = candidate_key(candidate)
+    for n in (64, 128, 256, 512, 1024):
+        m = density * n * n
+        yield {'algorithm': algorithm, 'backend': backend, 'method': method, 'size': n, 'density': density,
+               'error': '', 'median_seconds': fixed + per_vertex * n + per_work * candidate.work(n, m)}
+
+
+HEAP = candidate('dijkstra', 'sequential', 'heap')
+EDGE_LIST = candidate('bellman_ford', 'sequential', 'edge_list')
+SPFA = candidate('bellman_ford', 'sequential', 'spfa')
+
+
+class CostModelTests(SimpleTestCase):
+    def test_recovers_coefficients(self):
+        model = CostModel(rows(HEAP, 1e-4, 2e-7, 3e-9))
+        np.testing.assert_allclose(model.coefficients[candidate_key(HEAP)], [1e-4, 2e-7, 3e-9], rtol=1e-6)
+        self.assertAlmostEqual(model.predict(HEAP, 2048, 4096),
+                               1e-4 + 2e-7 * 2048 + 3e-9 * HEAP.work(2048, 4096))
+
+    def test_coefficients_are_not_negative(self):
+        noisy = list(rows(HEAP, 0.0, 0.0, 1e-9))
+        for i, row in enumerate(noisy):
+            row['median_seconds'] *= 1.05 if i % 2 else 0.95
+        self.assertTrue((CostModel(noisy).coefficients[candidate_key(HEAP)] >= 0).all())
+
+    def test_skips_failed_rows(self):
+        failed = [dict(row, error='MemoryError') for row in rows(HEAP, 1e-4, 0.0, 1e-9)]
+        model = CostModel(failed)
+        self.assertIsNone(model.predict(HEAP, 100, 500))
+
+
+class PlanTests(SimpleTestCase):
+    def sequential(self, ranking):
+        return [c for c, _ in ranking if c.backend == 'sequential']
+
+    def test_ranks_cheapest_first(self):
+        model = CostModel([*rows(HEAP, 0.0, 0.0, 2e-9), *rows(EDGE_LIST, 0.0, 0.0, 1e-9)])
+        chosen, ranking = plan('single_source', 1000, 5000, False, model)
+        predicted = [seconds for _, seconds in ranking if seconds is not None]
+        self.assertEqual(predicted, sorted(predicted))
+        self.assertEqual(self.sequential(ranking)[:2], [EDGE_LIST, HEAP])
+
+    def test_uncalibrated_candidates_come_last(self):
+        model = CostModel(rows(SPFA, 1e-3, 0.0, 0.0))
+        chosen, ranking = plan('single_source', 1000, 5000, False, model)
+        self.assertEqual(chosen, SPFA)
+        self.assertTrue(all(seconds is None for _, seconds in ranking[1:]))
+
+    def test_negative_weights_exclude_dijkstra(self):
+        model = CostModel([*rows(HEAP, 0.0, 0.0, 1e-12), *rows(EDGE_LIST, 0.0, 0.0, 1e-9)])
+        chosen, ranking = plan('single_source', 1000, 5000, True, model)
+        self.assertEqual(chosen, EDGE_LIST)
+        self.assertTrue(all(c.negative_weights for c, _ in ranking))
+
+    def test_unknown_query_has_no_plan(self):
+        self.assertEqual(plan('k_shortest', 10, 20, False, CostModel([])), (None, []))
+
+
+class ShortestPathsViewTests(GraphTestCase):
+    def test_answers_with_the_chosen_endpoint(self):
+        rng = np.random.default_rng(1)
+        matrix = np.where(rng.random((20, 20)) < 0.3, rng.uniform(1, 10, (20, 20)), np.inf)
+        np.fill_diagonal(matrix, 0)
+        graph = Graph(size=20, density=0.3)
+        graph.save_graph(matrix)
+
+        with mock.patch('src.planner.views.plan', return_value=(HEAP, [(HEAP, 0.5)])):
+            response = self.client.get(f'/api/shortest_paths/{graph.id}/?source=3')
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        expected = dijkstra(matrix, 3)
+        self.assertEqual(body['distances'], [d if np.isfinite(d) else None for d in expected.tolist()])
+        self.assertEqual(body['plan']['backend'], 'sequential')
+        self.assertEqual(body['plan']['predicted_seconds'], 0.5)
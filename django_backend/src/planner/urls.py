@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import ShortestPaths
+
+urlpatterns = [
+    path('<int:graph_id>/', ShortestPaths.as_view(), name='shortest_paths'),
+]
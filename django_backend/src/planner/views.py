@@ -0,0 +1,69 @@
+import json
+from django.utils.module_loading import import_string
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from src.graph.models import Graph
+from src.graph.cache import load_csr
+from src.utils.responses import DISTANCE_RENDERERS
+from .costs import QUERIES, plan
+
+
+def _describe(candidate, predicted):
+    return {
+        "algorithm": candidate.algorithm,
+        "backend": candidate.backend,
+        "method": candidate.method,
+        "predicted_seconds": predicted,
+    }
+
+
+class ShortestPaths(APIView):
+    """
+    GET ?query=single_source|point_to_point|all_pairs with the usual ?source=,
+    ?target= and ?format=; the query defaults to point_to_point when a target
+    is given and single_source otherwise. The cost model picks the algorithm
+    and backend predicted to be fastest for this graph, the matching endpoint
+    answers, and the decision is added as "plan" (X-Plan for array formats).
+    """
+    renderer_classes = DISTANCE_RENDERERS
+
+    def get(self, request, graph_id):
+        query = request.GET.get('query', 'point_to_point' if 'target' in request.GET else 'single_source')
+        if query not in QUERIES:
+            return Response({
+                "message": f"Unknown query '{query}'",
+                "queries": list(QUERIES)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if query == 'point_to_point' and 'target' not in request.GET:
+            return Response({"message": "point_to_point queries need a target"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            graph_obj, graph = load_csr(graph_id)
+        except Graph.DoesNotExist:
+            return Response({"message": "Graph not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        negative_weights = bool((graph.weights < 0).any())
+        chosen, ranking = plan(query, graph.n, graph.nnz, negative_weights)
+        if chosen is None:
+            reason = " with negative weights" if negative_weights else ""
+            return Response({"message": f"No available backend answers {query} queries on this graph{reason}"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        decision = dict(_describe(chosen, ranking[0][1]), query=query, vertices=graph.n, edges=graph.nnz,
+                        candidates=[_describe(c, predicted) for c, predicted in ranking])
+
+        # Hand the request on to the chosen endpoint with its own parameters
+        params = request._request.GET.copy()
+        params.pop('query', None)
+        for key, value in chosen.params.items():
+            params[key] = value
+        request._request.GET = params
+        response = import_string(chosen.view).as_view()(request._request, graph_id=graph_id)
+
+        if isinstance(response, Response) and isinstance(response.data, dict):
+            response.data['plan'] = decision
+        else:
+            response['X-Plan'] = json.dumps(decision)
+        return response
@@ -0,0 +1,388 @@
+import heapq
+from collections import deque
+import numpy as np
+from src.utils.csr import CSRGraph
+
+
+class NegativeCycleError(ValueError):
+    """Raised by Bellman-Ford variants; `cycle` lists the vertices in edge order."""
+
+    def __init__(self, cycle):
+        super().__init__("Negative cycle detected")
+        self.cycle = cycle
+
+    def __reduce__(self):
+        # Keep the cycle when the error crosses a process boundary
+        return (type(self), (self.cycle,))
+
+
+def as_csr(graph) -> CSRGraph:
+    """Accept either a dense matrix or a CSRGraph."""
+    if isinstance(graph, CSRGraph):
+        return graph
+    return CSRGraph.from_dense(np.asarray(graph))
+
+
+def as_dense(graph) -> np.ndarray:
+    """Accept either a dense matrix or a CSRGraph."""
+    if isinstance(graph, CSRGraph):
+        return graph.to_dense()
+    return np.asarray(graph)
+
+
+def dijkstra(graph, source: int = 0) -> np.ndarray:
+    """
+    Binary-heap Dijkstra that walks only the real out-edges of each settled
+    vertex, O((n + m) log n). Dense matrices are converted to CSR first.
+    """
+    csr = as_csr(graph)
+    n = csr.n
+    # Plain lists: element access is far cheaper than on NumPy arrays here
+    indptr = csr.indptr.tolist()
+    indices = csr.indices.tolist()
+    weights = csr.weights.tolist()
+
+    dist = [float('inf')] * n
+    dist[source] = 0.0
+    visited = [False] * n
+    heap = [(0.0, source)]
+
+    while heap:
+        d_u, u = heapq.heappop(heap)
+        if visited[u]:
+            continue
+        visited[u] = True
+
+        for e in range(indptr[u], indptr[u + 1]):
+            v = indices[e]
+            nd = d_u + weights[e]
+            if nd < dist[v]:
+                dist[v] = nd
+                heapq.heappush(heap, (nd, v))
+
+    return np.array(dist)
+
+
+def reconstruct_path(pred: np.ndarray, source: int, target: int) -> list:
+    """
+    Vertices from `source` to `target` along the predecessor array (-1 =
+    none). Raises ValueError if the predecessors do not lead back to the
+    source within n steps (a cycle).
+    """
+    path = [target]
+    while path[-1] != source:
+        if len(path) > len(pred):
+            raise ValueError(f"Predecessors of {target} do not lead back to {source}")
+        u = int(pred[path[-1]])
+        if u < 0:
+            return []
+        path.append(u)
+    path.reverse()
+    return path
+
+
+def dijkstra_to(graph, source: int, target: int):
+    """
+    Point-to-point Dijkstra: stops as soon as `target` is settled instead of
+    finishing the whole SSSP. Returns (distance, path); an unreachable target
+    gives (inf, []). Predecessors are kept in a compact int32 array.
+    """
+    csr = as_csr(graph)
+    indptr = csr.indptr.tolist()
+    indices = csr.indices.tolist()
+    weights = csr.weights.tolist()
+
+    dist = [float('inf')] * csr.n
+    dist[source] = 0.0
+    pred = np.full(csr.n, -1, dtype=np.int32)
+    visited = [False] * csr.n
+    heap = [(0.0, source)]
+
+    while heap:
+        d_u, u = heapq.heappop(heap)
+        if visited[u]:
+            continue
+        if u == target:
+            return d_u, reconstruct_path(pred, source, target)
+        visited[u] = True
+
+        for e in range(indptr[u], indptr[u + 1]):
+            v = indices[e]
+            nd = d_u + weights[e]
+            # Settled vertices are final; re-parenting one could close a cycle
+            if nd < dist[v] and not visited[v]:
+                dist[v] = nd
+                pred[v] = u
+                heapq.heappush(heap, (nd, v))
+
+    return float('inf'), []
+
+
+def bidirectional_dijkstra(graph, reverse: CSRGraph, source: int, target: int):
+    """
+    Dijkstra run from both ends at once, forward on `graph` and backward on
+    its transpose `reverse`, always expanding the side with the smaller
+    frontier key. Stops once the two frontier keys add up to at least the
+    best source -> target distance seen so far. Returns (distance, path).
+    """
+    if source == target:
+        return 0.0, [source]
+    sides = []
+    for csr, start in ((as_csr(graph), source), (reverse, target)):
+        dist = [float('inf')] * csr.n
+        dist[start] = 0.0
+        sides.append((csr.indptr.tolist(), csr.indices.tolist(), csr.weights.tolist(),
+                      dist, np.full(csr.n, -1, dtype=np.int32), [False] * csr.n, [(0.0, start)]))
+
+    best, meet = float('inf'), -1
+    forward, backward = sides
+    while forward[6] and backward[6]:
+        if forward[6][0][0] + backward[6][0][0] >= best:
+            break
+        side, other = (forward, backward) if forward[6][0][0] <= backward[6][0][0] else (backward, forward)
+        indptr, indices, weights, dist, pred, visited, heap = side
+        d_u, u = heapq.heappop(heap)
+        if visited[u]:
+            continue
+        visited[u] = True
+
+        other_dist = other[3]
+        for e in range(indptr[u], indptr[u + 1]):
+            v = indices[e]
+            nd = d_u + weights[e]
+            # Settled vertices are final; re-parenting one could close a cycle
+            if nd < dist[v] and not visited[v]:
+                dist[v] = nd
+                pred[v] = u
+                heapq.heappush(heap, (nd, v))
+            if nd + other_dist[v] < best:
+                best, meet = nd + other_dist[v], v
+
+    if meet < 0:
+        return float('inf'), []
+    # Forward predecessors lead back to the source, backward ones on to the target
+    path = reconstruct_path(forward[4], source, meet)
+    path.extend(reversed(reconstruct_path(backward[4], target, meet)[:-1]))
+    return best, path
+
+
+DIJKSTRA_MODES = {
+    'unidirectional': dijkstra_to,
+    'bidirectional': bidirectional_dijkstra,
+}
+
+
+def _find_cycle(pred: np.ndarray, candidates) -> list:
+    """
+    Recover a negative cycle from the predecessor array: walking n parent
+    links back from a vertex that was still improving must end on the cycle.
+    """
+    n = len(pred)
+    for v in candidates:
+        for _ in range(n):
+            if v < 0:
+                break
+            v = pred[v]
+        if v < 0:
+            continue
+        cycle = [v]
+        u = pred[v]
+        while u != v:
+            cycle.append(u)
+            u = pred[u]
+        cycle.reverse()
+        return [int(u) for u in cycle]
+    return []
+
+
+def bellman_ford(graph, source: int = 0, progress=None) -> np.ndarray:
+    """
+    Bellman-Ford over a vectorized edge list: each round relaxes every edge
+    at once and keeps the best candidate per target vertex. Stops as soon
+    as a round changes nothing; a change in round n means a negative cycle.
+    """
+    csr = as_csr(graph)
+    n = csr.n
+    src, dst, weights = csr.edges()
+    dist = np.full(n, np.inf)
+    dist[source] = 0.0
+    pred = np.full(n, -1, dtype=np.int64)
+
+    for round_ in range(max(n, 1)):
+        if progress is not None:
+            progress(round_ / n)
+        candidate = dist[src] + weights
+        improving = np.flatnonzero(candidate < dist[dst])
+        if improving.size == 0:
+            return dist
+
+        # Keep only the smallest candidate for each target
+        order = np.lexsort((candidate[improving], dst[improving]))
+        improving = improving[order]
+        targets = dst[improving]
+        first = np.concatenate(([True], targets[1:] != targets[:-1]))
+        improving = improving[first]
+
+        dist[dst[improving]] = candidate[improving]
+        pred[dst[improving]] = src[improving]
+
+        if round_ == n - 1:
+            # Still improving after n - 1 full rounds
+            raise NegativeCycleError(_find_cycle(pred, dst[improving]))
+
+    return dist
+
+
+def spfa(graph, source: int = 0) -> np.ndarray:
+    """
+    Queue-based Bellman-Ford (SPFA): only vertices whose distance just
+    dropped are rescanned, which is much cheaper on sparse graphs. A
+    shortest path that needs n or more edges means a negative cycle.
+    """
+    csr = as_csr(graph)
+    n = csr.n
+    indptr = csr.indptr.tolist()
+    indices = csr.indices.tolist()
+    weights = csr.weights.tolist()
+
+    dist = [float('inf')] * n
+    dist[source] = 0.0
+    pred = [-1] * n
+    hops = [0] * n
+    queued = [False] * n
+    queue = deque([source])
+    queued[source] = True
+
+    while queue:
+        u = queue.popleft()
+        queued[u] = False
+        d_u = dist[u]
+        for e in range(indptr[u], indptr[u + 1]):
+            v = indices[e]
+            nd = d_u + weights[e]
+            if nd < dist[v]:
+                dist[v] = nd
+                pred[v] = u
+                hops[v] = hops[u] + 1
+                if hops[v] >= n:
+                    raise NegativeCycleError(_find_cycle(np.array(pred), [v]))
+                if not queued[v]:
+                    queued[v] = True
+                    queue.append(v)
+
+    return np.array(dist)
+
+
+def johnson_reweight(graph):
+    """
+    Johnson's reweighting: potentials h from one Bellman-Ford pass out of a
+    virtual vertex joined to every vertex by a 0-weight edge, and the graph
+    with weights w + h[u] - h[v], which are all non-negative. Returns
+    (reweighted CSRGraph, h); h is all zeros when no weight is negative.
+    Raises NegativeCycleError.
+    """
+    csr = as_csr(graph)
+    n = csr.n
+    if not (csr.weights < 0).any():
+        return csr, np.zeros(n)
+    src, dst, weights = csr.edges()
+    virtual = CSRGraph.from_edges(
+        n + 1,
+        np.concatenate((src, np.full(n, n))),
+        np.concatenate((dst, np.arange(n))),
+        np.concatenate((weights, np.zeros(n))),
+    )
+    h = bellman_ford(virtual, n)[:n]
+    # Round-off can leave -1e-16 where the reduced weight is really 0
+    reduced = np.maximum(weights + h[src] - h[dst], 0)
+    return csr._replace(weights=reduced.astype(csr.weights.dtype)), h
+
+
+def johnson_restore(distances: np.ndarray, h: np.ndarray, sources=None) -> np.ndarray:
+    """Undo the reweighting on rows of reweighted distances (one per source), in place."""
+    h_sources = h if sources is None else h[sources]
+    distances -= h_sources[:, None]
+    distances += h[None, :]
+    return distances
+
+
+BELLMAN_FORD_METHODS = {
+    'edge_list': bellman_ford,
+    'spfa': spfa,
+}
+
+
+def floyd_warshall_naive(graph, progress=None) -> np.ndarray:
+    """Reference triple loop, O(n^3) Python operations."""
+    dist = np.array(as_dense(graph), dtype=np.float64)
+    n = dist.shape[0]
+
+    for k in range(n):
+        if progress is not None:
+            progress(k / n)
+        for i in range(n):
+            for j in range(n):
+                if dist[i][k] + dist[k][j] < dist[i][j]:
+                    dist[i][j] = dist[i][k] + dist[k][j]
+
+    return dist
+
+
+def floyd_warshall_numpy(graph, progress=None) -> np.ndarray:
+    """One broadcasted min-plus row update of the whole matrix per k."""
+    dist = np.array(as_dense(graph), dtype=np.float64)
+    n = dist.shape[0]
+    through_k = np.empty_like(dist)
+    report_every = max(1, n // 100)
+
+    for k in range(n):
+        if progress is not None and k % report_every == 0:
+            progress(k / n)
+        np.add(dist[:, k, None], dist[k], out=through_k)
+        np.minimum(dist, through_k, out=dist)
+
+    return dist
+
+
+def default_block_size(n: int) -> int:
+    # Aim for a block of rows (block_size x n float64) that stays in a ~1 MiB L2
+    return int(min(256, max(16, (1 << 20) // (8 * max(n, 1)))))
+
+
+def floyd_warshall_blocked(graph, block_size: int = None, progress=None) -> np.ndarray:
+    """
+    Cache-blocked Floyd-Warshall. For each block K of pivot vertices the
+    pivot rows are finalised first, then every other block of rows is swept
+    through all k in K while it is still hot in cache, instead of streaming
+    the whole matrix through memory once per k.
+    """
+    dist = np.array(as_dense(graph), dtype=np.float64)
+    n = dist.shape[0]
+    block_size = block_size or default_block_size(n)
+    through_k = np.empty((block_size, n))
+
+    def relax_rows(start, stop, k_start, k_stop):
+        rows = dist[start:stop]
+        buf = through_k[:stop - start]
+        for k in range(k_start, k_stop):
+            np.add(rows[:, k, None], dist[k], out=buf)
+            np.minimum(rows, buf, out=rows)
+
+    for k_start in range(0, n, block_size):
+        if progress is not None:
+            progress(k_start / n)
+        k_stop = min(k_start + block_size, n)
+        # Pivot rows first, so the other row blocks see them fully updated
+        relax_rows(k_start, k_stop, k_start, k_stop)
+        for start in range(0, n, block_size):
+            if start != k_start:
+                relax_rows(start, min(start + block_size, n), k_start, k_stop)
+
+    return dist
+
+
+FLOYD_WARSHALL_METHODS = {
+    'numpy': floyd_warshall_numpy,
+    'blocked': floyd_warshall_blocked,
+    'naive': floyd_warshall_naive,
+}
@@ -0,0 +1,155 @@
+import multiprocessing
+import os
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+from django.conf import settings
+from src.utils.csr import CSRGraph
+from .algorithms import (
+    as_csr,
+    dijkstra,
+    bellman_ford,
+    spfa,
+    johnson_reweight,
+    johnson_restore,
+    FLOYD_WARSHALL_METHODS,
+)
+
+SINGLE_SOURCE_ALGORITHMS = {
+    'dijkstra': dijkstra,
+    'bellman_ford': bellman_ford,
+    'spfa': spfa,
+}
+
+# Blocks handed out per worker; more than one evens out uneven block costs
+BLOCKS_PER_WORKER = 4
+
+# Worker processes shared by every batch in this process, started on first
+# use. Spawned rather than forked, like the job pool: a forked worker would
+# inherit MPI state and the threads of whatever ran before it. Each batch
+# hands them the graph as .npy file names, which they memory-map: the
+# store's own files when the graph is mapped from it, otherwise a copy
+# written once per batch.
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _pool_executor() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=default_workers(),
+                                        mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+def _discard_pool():
+    # A worker died; the next batch starts a fresh pool
+    global _pool
+    with _pool_lock:
+        _pool = None
+
+
+def _mapped_files(csr):
+    """
+    The .npy files a CSRGraph is wholly memory-mapped from (as loaded from
+    the file-backed graph store), or None. Workers reopen these instead of
+    unpickling a private copy of the graph each.
+    """
+    files = []
+    for array in csr:
+        if not isinstance(array, np.memmap) or not array.filename:
+            return None
+        mapped = np.load(array.filename, mmap_mode='r')
+        if mapped.shape != array.shape or mapped.dtype != array.dtype:
+            return None  # a view of part of the file
+        files.append(array.filename)
+    return files
+
+
+def _write_files(csr, directory) -> list:
+    files = []
+    for name, array in zip(CSRGraph._fields, csr):
+        path = os.path.join(directory, f"{name}.npy")
+        np.save(path, np.ascontiguousarray(array))
+        files.append(path)
+    return files
+
+
+def _run_block(algorithm: str, files, sources):
+    graph = CSRGraph(*(np.load(path, mmap_mode='r') for path in files))
+    run = SINGLE_SOURCE_ALGORITHMS[algorithm]
+    return np.vstack([run(graph, s) for s in sources])
+
+
+def default_workers() -> int:
+    return settings.SHORTEST_PATH_WORKERS or os.cpu_count() or 1
+
+
+def shortest_paths_from(graph, sources, algorithm: str = 'dijkstra', workers: int = None,
+                        progress=None) -> np.ndarray:
+    """
+    Distance matrix with one row per source. The sources are fanned out in
+    contiguous blocks over the shared worker pool, at most `workers` blocks
+    at a time (the pool has default_workers() processes); with one worker
+    everything runs in-process. `progress(fraction)` is called as sources
+    complete.
+    """
+    csr = as_csr(graph)
+    sources = list(sources)
+    workers = max(1, min(workers or default_workers(), default_workers(), len(sources)))
+    if not sources:
+        return np.empty((0, csr.n))
+
+    if workers == 1:
+        run = SINGLE_SOURCE_ALGORITHMS[algorithm]
+        rows = []
+        for i, s in enumerate(sources):
+            if progress is not None:
+                progress(i / len(sources))
+            rows.append(run(csr, s))
+        return np.vstack(rows)
+
+    blocks = np.array_split(np.asarray(sources), min(len(sources), workers * BLOCKS_PER_WORKER))
+    with tempfile.TemporaryDirectory(prefix='batch-') as directory:
+        files = _mapped_files(csr) or _write_files(csr, directory)
+        pool = _pool_executor()
+        rows, pending = [], deque()
+        try:
+            for block in blocks:
+                if len(pending) == workers:
+                    rows.append(pending.popleft().result())
+                    if progress is not None:
+                        progress(len(rows) / len(blocks))
+                pending.append(pool.submit(_run_block, algorithm, files, block.tolist()))
+            while pending:
+                rows.append(pending.popleft().result())
+                if progress is not None:
+                    progress(len(rows) / len(blocks))
+        except BrokenProcessPool:
+            _discard_pool()
+            raise
+        return np.vstack(rows)
+
+
+def johnson(graph, workers: int = None, progress=None) -> np.ndarray:
+    """
+    All-pairs distances by Johnson's algorithm: one Bellman-Ford pass to
+    reweight, then Dijkstra from every vertex over CSR, fanned out over the
+    batch process pool. O(nm log n) against Floyd-Warshall's O(n^3), so it
+    wins on sparse graphs. Raises NegativeCycleError.
+    """
+    reweighted, h = johnson_reweight(graph)
+    distances = shortest_paths_from(reweighted, range(reweighted.n), 'dijkstra', workers, progress)
+    return johnson_restore(distances, h)
+
+
+ALL_PAIRS_METHODS = dict(FLOYD_WARSHALL_METHODS, johnson=johnson)
+
+
+def choose_all_pairs_method(density: float, dense_method: str = 'numpy') -> str:
+    """Johnson below settings.JOHNSON_MAX_DENSITY, else `dense_method` (Floyd-Warshall)."""
+    return 'johnson' if density < settings.JOHNSON_MAX_DENSITY else dense_method
@@ -1,3 +1,285 @@
-from django.test import TestCase
+import io
+import json
+import numpy as np
+from django.test import SimpleTestCase, override_settings
+from src.utils.csr import CSRGraph
+from src.utils.testing import GraphTestCase, random_graph, stored_graph
+from .algorithms import (
+    BELLMAN_FORD_METHODS, FLOYD_WARSHALL_METHODS, NegativeCycleError, bidirectional_dijkstra, dijkstra,
+    dijkstra_to, floyd_warshall_blocked, floyd_warshall_naive, reconstruct_path,
+)
+from .batch import SINGLE_SOURCE_ALGORITHMS, johnson, shortest_paths_from
 
-# Create your tests here.
+
+def from_edges(n, edges):
+    matrix = np.full((n, n), np.inf)
+    np.fill_diagonal(matrix, 0)
+    for u, v, w in edges:
+        matrix[u, v] = w
+    return matrix
+
+
+def from_json(rows):
+    """Distances as sent in JSON, with null back to infinity."""
+    return np.array([[np.inf if d is None else d for d in row] for row in rows])
+
+
+def plain_dijkstra(matrix, source):
+    """Reference O(n^2) Dijkstra over the dense matrix."""
+    n = len(matrix)
+    dist = np.full(n, np.inf)
+    dist[source] = 0.0
+    done = np.zeros(n, dtype=bool)
+    for _ in range(n):
+        u = int(np.argmin(np.where(done, np.inf, dist)))
+        if done[u] or not np.isfinite(dist[u]):
+            break
+        done[u] = True
+        dist = np.minimum(dist, dist[u] + matrix[u])
+    return dist
+
+
+class CSRGraphTests(SimpleTestCase):
+    def test_dense_round_trip(self):
+        matrix = random_graph(30, 0.1, 0)
+        csr = CSRGraph.from_dense(matrix)
+        self.assertEqual((csr.n, csr.nnz), (30, int(np.isfinite(matrix).sum()) - 30))
+        np.testing.assert_array_equal(csr.to_dense(), matrix)
+        np.testing.assert_array_equal(csr.reverse().to_dense(), matrix.T)
+
+    def test_from_edges_groups_by_source(self):
+        csr = CSRGraph.from_edges(4, [2, 0, 2, 1], [3, 1, 0, 2], [1.0, 2.0, 3.0, 4.0])
+        np.testing.assert_array_equal(csr.indptr, [0, 1, 2, 4, 4])
+        np.testing.assert_array_equal(csr.to_dense(), from_edges(4, [(0, 1, 2), (1, 2, 4), (2, 3, 1), (2, 0, 3)]))
+
+
+class DijkstraTests(SimpleTestCase):
+    def test_matches_plain_dijkstra(self):
+        for seed, density in enumerate((0.02, 0.1, 0.5, 1.0)):
+            matrix = random_graph(60, density, seed)
+            for source in (0, 17, 59):
+                expected = plain_dijkstra(matrix, source)
+                np.testing.assert_allclose(dijkstra(CSRGraph.from_dense(matrix), source), expected)
+                np.testing.assert_allclose(dijkstra(matrix, source), expected)
+
+    def test_parallel_edges_use_the_lightest(self):
+        csr = CSRGraph.from_edges(3, [0, 0, 1], [1, 1, 2], [5.0, 2.0, 1.0])
+        np.testing.assert_array_equal(dijkstra(csr, 0), [0.0, 2.0, 3.0])
+
+    def test_point_to_point_matches_single_source(self):
+        matrix = random_graph(60, 0.05, 7)
+        csr = CSRGraph.from_dense(matrix)
+        expected = plain_dijkstra(matrix, 3)
+        for target in range(60):
+            for distance, path in (dijkstra_to(csr, 3, target),
+                                   bidirectional_dijkstra(csr, csr.reverse(), 3, target)):
+                self.assertAlmostEqual(distance, expected[target])
+                if np.isfinite(distance):
+                    self.assertEqual((path[0], path[-1]), (3, target))
+                    self.assertAlmostEqual(sum(matrix[u, v] for u, v in zip(path, path[1:])), distance)
+                else:
+                    self.assertEqual(path, [])
+
+
+class PointToPointTests(SimpleTestCase):
+    def test_negative_edge_into_settled_vertex_terminates(self):
+        # 2 -> 1 improves vertex 1 after it is settled; re-parenting it would make 1 <-> 2 a cycle
+        csr = CSRGraph.from_dense(from_edges(4, [(0, 1, 1), (1, 2, 1), (2, 1, -5), (1, 3, 100)]))
+        self.assertEqual(dijkstra_to(csr, 0, 3), (101.0, [0, 1, 3]))
+        self.assertEqual(bidirectional_dijkstra(csr, csr.reverse(), 0, 3), (101.0, [0, 1, 3]))
+
+    def test_path_walk_is_bounded(self):
+        with self.assertRaises(ValueError):
+            reconstruct_path(np.array([-1, 2, 1, 1]), 0, 3)
+
+
+class FloydWarshallTests(SimpleTestCase):
+    def test_methods_match_naive(self):
+        for seed, (n, density) in enumerate(((1, 0.0), (17, 0.2), (40, 0.05), (40, 0.6))):
+            matrix = random_graph(n, density, seed)
+            expected = floyd_warshall_naive(matrix)
+            for name, method in FLOYD_WARSHALL_METHODS.items():
+                with self.subTest(method=name, n=n):
+                    np.testing.assert_allclose(method(matrix), expected)
+
+    def test_block_sizes(self):
+        # Blocks that divide n, that don't, and one larger than n
+        matrix = random_graph(37, 0.1, 9)
+        expected = floyd_warshall_naive(matrix)
+        for block_size in (1, 4, 16, 37, 64):
+            with self.subTest(block_size=block_size):
+                np.testing.assert_allclose(floyd_warshall_blocked(matrix, block_size), expected)
+
+    def test_negative_weights(self):
+        matrix = random_graph(30, 0.2, 4, low=5.0, high=10.0)
+        matrix[0, 1] = matrix[2, 3] = -1.0
+        expected = floyd_warshall_naive(matrix)
+        for name, method in FLOYD_WARSHALL_METHODS.items():
+            with self.subTest(method=name):
+                np.testing.assert_allclose(method(matrix), expected)
+
+    def test_csr_input_and_progress(self):
+        matrix = random_graph(40, 0.1, 5)
+        reported = []
+        result = floyd_warshall_blocked(CSRGraph.from_dense(matrix), 16, progress=reported.append)
+        np.testing.assert_allclose(result, floyd_warshall_naive(matrix))
+        self.assertEqual(reported, [0.0, 16 / 40, 32 / 40])
+
+
+def with_negative_edges(seed):
+    """Random graph with a few negative edges but no negative cycle (every other weight is 5+)."""
+    matrix = random_graph(40, 0.1, seed, low=5.0, high=10.0)
+    for u, v in ((0, 1), (2, 3), (4, 5)):
+        matrix[u, v] = -1.0
+    return matrix
+
+
+class BellmanFordTests(SimpleTestCase):
+    def test_methods_match_naive(self):
+        for seed in range(3):
+            matrix = with_negative_edges(seed)
+            expected = floyd_warshall_naive(matrix)
+            for name, method in BELLMAN_FORD_METHODS.items():
+                for source in (0, 3, 39):
+                    with self.subTest(method=name, seed=seed, source=source):
+                        np.testing.assert_allclose(method(CSRGraph.from_dense(matrix), source), expected[source])
+
+    def assertNegativeCycle(self, matrix, cycle):
+        """`cycle` is a closed walk over edges of `matrix` with negative total weight."""
+        self.assertTrue(cycle)
+        edges = list(zip(cycle, cycle[1:] + cycle[:1]))
+        self.assertTrue(all(np.isfinite(matrix[u, v]) for u, v in edges))
+        self.assertLess(sum(matrix[u, v] for u, v in edges), 0)
+
+    def test_reports_negative_cycles(self):
+        matrix = with_negative_edges(0)
+        # 10 -> 11 -> 12 -> 10 weighs -1
+        matrix[10, 11], matrix[11, 12], matrix[12, 10] = 1.0, 1.0, -3.0
+        matrix[0, 10] = 1.0
+        for name, method in BELLMAN_FORD_METHODS.items():
+            with self.subTest(method=name):
+                with self.assertRaises(NegativeCycleError) as raised:
+                    method(CSRGraph.from_dense(matrix), 0)
+                self.assertNegativeCycle(matrix, raised.exception.cycle)
+                self.assertEqual(sorted(raised.exception.cycle), [10, 11, 12])
+
+    def test_unreachable_cycle_is_ignored(self):
+        matrix = from_edges(5, [(0, 1, 2.0), (3, 4, 1.0), (4, 3, -2.0)])
+        for name, method in BELLMAN_FORD_METHODS.items():
+            with self.subTest(method=name):
+                np.testing.assert_array_equal(method(CSRGraph.from_dense(matrix), 0),
+                                              [0.0, 2.0, np.inf, np.inf, np.inf])
+
+
+class BellmanFordViewTests(GraphTestCase):
+    def test_negative_cycle_is_a_result(self):
+        graph = stored_graph(from_edges(4, [(0, 1, 1.0), (1, 2, -2.0), (2, 1, 1.0), (2, 3, 1.0)]))
+        for method in BELLMAN_FORD_METHODS:
+            with self.subTest(method=method):
+                response = self.client.get(f'/api/sequential/bellman_ford/{graph.id}/?method={method}')
+                self.assertEqual(response.status_code, 200)
+                body = response.json()
+                self.assertIsNone(body['distances'])
+                self.assertEqual(sorted(body['negative_cycle']), [1, 2])
+
+    def test_unknown_method(self):
+        graph = stored_graph(from_edges(2, [(0, 1, 1.0)]))
+        response = self.client.get(f'/api/sequential/bellman_ford/{graph.id}/?method=dial')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['methods'], list(BELLMAN_FORD_METHODS))
+
+
+@override_settings(SHORTEST_PATH_WORKERS=2)
+class BatchTests(SimpleTestCase):
+    def test_in_process_and_pooled_runs_match(self):
+        matrix = random_graph(40, 0.1, 2)
+        expected = floyd_warshall_naive(matrix)
+        sources = [5, 0, 39, 5, 12]
+        for algorithm in SINGLE_SOURCE_ALGORITHMS:
+            for workers in (1, 2):
+                with self.subTest(algorithm=algorithm, workers=workers):
+                    np.testing.assert_allclose(shortest_paths_from(matrix, sources, algorithm, workers),
+                                               expected[sources])
+
+    def test_progress_and_empty_batches(self):
+        matrix = random_graph(10, 0.3, 3)
+        reported = []
+        shortest_paths_from(matrix, range(4), workers=1, progress=reported.append)
+        self.assertEqual(reported, [0.0, 0.25, 0.5, 0.75])
+        self.assertEqual(shortest_paths_from(matrix, []).shape, (0, 10))
+
+    def test_negative_cycle_crosses_the_pool(self):
+        matrix = from_edges(4, [(0, 1, 1.0), (1, 2, -2.0), (2, 1, 1.0)])
+        with self.assertRaises(NegativeCycleError) as raised:
+            shortest_paths_from(matrix, range(4), 'bellman_ford', workers=2)
+        self.assertEqual(sorted(raised.exception.cycle), [1, 2])
+
+    def test_johnson_matches_naive(self):
+        matrix = with_negative_edges(2)
+        for workers in (1, 2):
+            np.testing.assert_allclose(johnson(matrix, workers), floyd_warshall_naive(matrix))
+
+
+class BatchViewTests(GraphTestCase):
+    def test_sources(self):
+        matrix = random_graph(20, 0.2, 4)
+        graph = stored_graph(matrix)
+        response = self.client.post(f'/api/sequential/batch/{graph.id}/',
+                                    {'algorithm': 'dijkstra', 'sources': [3, 7], 'workers': 1},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        np.testing.assert_allclose(from_json(response.json()['distances']), floyd_warshall_naive(matrix)[[3, 7]])
+
+    def test_rejects_bad_requests(self):
+        graph = stored_graph(random_graph(5, 0.5, 5))
+        for body in ({'algorithm': 'astar'}, {'workers': 0}, {'sources': [9]}, {'sources': 'some'}):
+            with self.subTest(body=body):
+                response = self.client.post(f'/api/sequential/batch/{graph.id}/', body,
+                                            content_type='application/json')
+                self.assertEqual(response.status_code, 400)
+
+
+class DistanceFormatTests(GraphTestCase):
+    def setUp(self):
+        super().setUp()
+        self.matrix = random_graph(20, 0.1, 6)
+        self.graph = stored_graph(self.matrix)
+        self.expected = floyd_warshall_naive(self.matrix)
+        self.url = f'/api/sequential/floyd_warshall/{self.graph.id}/?method=numpy'
+
+    def test_json(self):
+        body = self.client.get(self.url).json()
+        np.testing.assert_allclose(from_json(body['distances']), self.expected)
+
+    def test_npy(self):
+        for kwargs in ({'HTTP_ACCEPT': 'application/x-npy'}, {'data': {'format': 'npy'}}):
+            response = self.client.get(self.url, **kwargs)
+            self.assertEqual(response['Content-Type'], 'application/x-npy')
+            np.testing.assert_allclose(np.load(io.BytesIO(response.content)), self.expected)
+            self.assertEqual(json.loads(response['X-Result-Metadata'])['method'], 'numpy')
+
+    def test_bin(self):
+        response = self.client.get(self.url, HTTP_ACCEPT='application/octet-stream')
+        shape = tuple(int(d) for d in response['X-Shape'].split(','))
+        distances = np.frombuffer(response.content, dtype=response['X-Dtype']).reshape(shape)
+        np.testing.assert_allclose(distances, self.expected)
+
+    def test_ndjson(self):
+        response = self.client.get(self.url, HTTP_ACCEPT='application/x-ndjson')
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(lines[0]['shape'], [20, 20])
+        np.testing.assert_allclose(from_json(lines[1:]), self.expected)
+
+    def test_errors_stay_json(self):
+        response = self.client.get(f'/api/sequential/dijkstra/{self.graph.id}/?source=99',
+                                   HTTP_ACCEPT='application/x-npy')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertIn('message', response.json())
+
+    def test_long_lists_are_summarized_in_the_header(self):
+        response = self.client.post(f'/api/sequential/batch/{self.graph.id}/?format=bin',
+                                    {'sources': 'all', 'workers': 1}, content_type='application/json')
+        meta = json.loads(response['X-Result-Metadata'])
+        self.assertEqual(meta['sources'], {'count': 20, 'first': 0, 'last': 19})
+        self.assertEqual(response['X-Shape'], '20,20')
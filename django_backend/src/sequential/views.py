@@ -1,115 +1,292 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from src.utils.metrics import label_request
+from src.utils.csr import CSRGraph
 from src.utils.timing import timeit
+from src.utils.responses import DISTANCE_RENDERERS, distance_response
 from src.graph.models import Graph
+from src.graph.cache import load_graph, load_csr, load_reverse_csr
+from src.graph.results import result_store
+from .algorithms import (
+    dijkstra,
+    BELLMAN_FORD_METHODS,
+    DIJKSTRA_MODES,
+    NegativeCycleError,
+)
+from .batch import (
+    ALL_PAIRS_METHODS,
+    SINGLE_SOURCE_ALGORITHMS,
+    choose_all_pairs_method,
+    shortest_paths_from,
+)
 import numpy as np
-import heapq
+
+
+def parse_source(value, n):
+    """Validated source vertex (default 0), or None if out of range / not an int."""
+    try:
+        source = int(0 if value is None else value)
+    except (TypeError, ValueError):
+        return None
+    return source if 0 <= source < n else None
+
+
+def invalid_source(n, name='source'):
+    return Response({"message": f"{name} must be an integer in [0, {n})"},
+                    status=status.HTTP_400_BAD_REQUEST)
+
+
+def negative_weights(graph):
+    """
+    400 response if `graph` (CSR or dense) has a negative edge weight, which
+    Dijkstra cannot handle, else None.
+    """
+    weights = graph.weights if isinstance(graph, CSRGraph) else np.asarray(graph)
+    if not (weights < 0).any():
+        return None
+    return Response({"message": "Dijkstra needs non-negative edge weights; use Bellman-Ford"},
+                    status=status.HTTP_400_BAD_REQUEST)
+
+
+def point_queries_unsupported(request, backend):
+    """400 response if ?target= was sent to a Dijkstra endpoint that can't answer it, else None."""
+    if 'target' not in request.GET:
+        return None
+    return Response({"message": f"The {backend} backend does not answer point-to-point queries (?target=); "
+                                "use the sequential or numba endpoint"},
+                    status=status.HTTP_400_BAD_REQUEST)
+
+
+def resolve_all_pairs_method(method, graph_id, dense_method):
+    """`method`, or for 'auto' the choice by the stored graph density. Raises Graph.DoesNotExist."""
+    if method != 'auto':
+        return method
+    density = Graph.objects.values_list('density', flat=True).get(id=graph_id)
+    return choose_all_pairs_method(density, dense_method)
+
+
+def shortest_path_response(request, graph_obj, graph, source, modes, backend):
+    """
+    Answer ?target= on a Dijkstra endpoint: the distance and path from
+    `source` to `target`, computed by the ?mode= entry of `modes` (see
+    DIJKSTRA_MODES) without running the full SSSP. Not cached.
+    """
+    target = parse_source(request.GET.get('target'), graph.n)
+    if target is None:
+        return invalid_source(graph.n, 'target')
+    mode = request.GET.get('mode', 'unidirectional')
+    if mode not in modes:
+        return Response({
+            "message": f"Unknown mode '{mode}'",
+            "modes": list(modes)
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    label_request(algorithm=f"dijkstra_{mode}", backend=backend)
+    args = (graph, load_reverse_csr(graph_obj, graph)) if mode == 'bidirectional' else (graph,)
+    (distance, path), elapsed = timeit(modes[mode])(*args, source, target)
+    return Response({
+        "algorithm": "dijkstra",
+        "mode": mode,
+        "source": source,
+        "target": target,
+        "distance": distance if path else None,
+        "path": path,
+        "time_seconds": elapsed,
+    })
 
 
 class BellmanFordCPU(APIView):
+    renderer_classes = DISTANCE_RENDERERS
+
     def get(self, request, graph_id):
+        method = request.GET.get('method', 'edge_list')
+        if method not in BELLMAN_FORD_METHODS:
+            return Response({
+                "message": f"Unknown method '{method}'",
+                "methods": list(BELLMAN_FORD_METHODS)
+            }, status=status.HTTP_400_BAD_REQUEST)
+
         try:
-            graph_obj = Graph.objects.get(id=graph_id)
-            graph = graph_obj.get_graph()
+            graph_obj, graph = load_csr(graph_id)
+            source = parse_source(request.GET.get('source'), graph.n)
+            if source is None:
+                return invalid_source(graph.n)
 
-            (distances, elapsed) = self._bellman_ford_timed(graph)
-            return Response({
+            cycle = None
+            hit = result_store.get(graph_obj, "bellman_ford", "sequential", source)
+            if hit is not None:
+                (distances, elapsed), cached = hit, True
+            else:
+                ((distances, cycle), elapsed), cached = self._bellman_ford_timed(graph, method, source), False
+                if distances is not None:
+                    result_store.put(graph_obj, "bellman_ford", "sequential", source, distances, elapsed)
+            return distance_response(request, {
                 "algorithm": "bellman_ford",
-                "distances": distances,
-                "time_seconds": elapsed
-            })
+                "method": method,
+                "source": source,
+                "negative_cycle": cycle,
+                "time_seconds": elapsed,
+                "cached": cached
+            }, distances)
         except Graph.DoesNotExist:
             return Response({"message": "Graph not found"}, status=status.HTTP_404_NOT_FOUND)
 
     @timeit
-    def _bellman_ford_timed(self, graph: np.ndarray):
-        n = graph.shape[0]
-        dist = [float('inf')] * n
-        dist[0] = 0
-
-        # relax edges repeatedly
-        for _ in range(n - 1):
-            for u in range(n):
-                for v in range(n):
-                    w = graph[u][v]
-                    if w != float('inf') and dist[u] + w < dist[v]:
-                        dist[v] = dist[u] + w
-
-        # negative-cycle detection
-        for u in range(n):
-            for v in range(n):
-                w = graph[u][v]
-                if w != float('inf') and dist[u] + w < dist[v]:
-                    raise ValueError("Negative cycle detected")
-
-        return dist
+    def _bellman_ford_timed(self, graph, method='edge_list', source=0):
+        # A negative cycle is a result, not a server error
+        try:
+            return BELLMAN_FORD_METHODS[method](graph, source), None
+        except NegativeCycleError as e:
+            return None, e.cycle
 
 
 class DijkstraCPU(APIView):
+    renderer_classes = DISTANCE_RENDERERS
+
     def get(self, request, graph_id):
         try:
-            graph_obj = Graph.objects.get(id=graph_id)
-            graph = graph_obj.get_graph()
+            graph_obj, graph = load_csr(graph_id)
+            source = parse_source(request.GET.get('source'), graph.n)
+            if source is None:
+                return invalid_source(graph.n)
+            rejected = negative_weights(graph)
+            if rejected:
+                return rejected
+            if 'target' in request.GET:
+                return shortest_path_response(request, graph_obj, graph, source,
+                                              DIJKSTRA_MODES, "sequential")
 
-            (distances, elapsed) = self._dijkstra_timed(graph)
-            return Response({
+            distances, elapsed, cached = result_store.get_or_compute(
+                graph_obj, "dijkstra", "sequential",
+                lambda: self._dijkstra_timed(graph, source), source=source)
+            return distance_response(request, {
                 "algorithm": "dijkstra",
-                "distances": distances,
-                "time_seconds": elapsed
-            })
+                "source": source,
+                "time_seconds": elapsed,
+                "cached": cached
+            }, distances)
         except Graph.DoesNotExist:
             return Response({"message": "Graph not found"}, status=status.HTTP_404_NOT_FOUND)
 
     @timeit
-    def _dijkstra_timed(self, graph: np.ndarray):
-        n = graph.shape[0]
-        dist = [float('inf')] * n
-        dist[0] = 0
-        visited = set()
-        heap = [(0, 0)]
-
-        while heap:
-            d_u, u = heapq.heappop(heap)
-            if u in visited:
-                continue
-            visited.add(u)
-
-            for v in range(n):
-                w = graph[u][v]
-                if w != float('inf'):
-                    nd = d_u + w
-                    if nd < dist[v]:
-                        dist[v] = nd
-                        heapq.heappush(heap, (nd, v))
-
-        return dist
+    def _dijkstra_timed(self, graph, source=0):
+        return dijkstra(graph, source)
 
 
 class FloydWarshallCPU(APIView):
+    """
+    All pairs. ?method=auto (the default) runs Johnson's algorithm on graphs
+    sparser than settings.JOHNSON_MAX_DENSITY and Floyd-Warshall otherwise.
+    A cached matrix is shared by all methods and reports the one that
+    produced it.
+    """
+    renderer_classes = DISTANCE_RENDERERS
+
     def get(self, request, graph_id):
+        method = request.GET.get('method', 'auto')
+        if method != 'auto' and method not in ALL_PAIRS_METHODS:
+            return Response({
+                "message": f"Unknown method '{method}'",
+                "methods": ['auto', *ALL_PAIRS_METHODS]
+            }, status=status.HTTP_400_BAD_REQUEST)
+        params = {}
+        if method == 'blocked' and 'block_size' in request.GET:
+            try:
+                params['block_size'] = int(request.GET['block_size'])
+            except ValueError:
+                return Response({"message": "block_size must be an integer"},
+                                status=status.HTTP_400_BAD_REQUEST)
+            if params['block_size'] < 1:
+                return Response({"message": "block_size must be positive"},
+                                status=status.HTTP_400_BAD_REQUEST)
+
         try:
-            graph_obj = Graph.objects.get(id=graph_id)
-            graph = graph_obj.get_graph()
+            method = resolve_all_pairs_method(method, graph_id, 'numpy')
+            # Johnson works on CSR, Floyd-Warshall on the dense matrix
+            graph_obj, graph = (load_csr if method == 'johnson' else load_graph)(graph_id)
 
-            (dist_matrix, elapsed) = self._floyd_warshall_timed(graph)
-            return Response({
+            cycle = None
+            hit = result_store.get_all_pairs(graph_obj, "floyd_warshall", "sequential", method)
+            if hit is not None:
+                (dist_matrix, elapsed, method), cached = hit, True
+            else:
+                ((dist_matrix, cycle), elapsed), cached = \
+                    self._floyd_warshall_timed(graph, method, **params), False
+                if dist_matrix is not None:
+                    result_store.put(graph_obj, "floyd_warshall", "sequential", None, dist_matrix, elapsed,
+                                     method)
+            return distance_response(request, {
                 "algorithm": "floyd_warshall",
-                "distances": dist_matrix.tolist(),
-                "time_seconds": elapsed
-            })
+                "method": method,
+                "negative_cycle": cycle,
+                "time_seconds": elapsed,
+                "cached": cached
+            }, dist_matrix)
         except Graph.DoesNotExist:
             return Response({"message": "Graph not found"}, status=status.HTTP_404_NOT_FOUND)
 
     @timeit
-    def _floyd_warshall_timed(self, graph: np.ndarray):
-        n = graph.shape[0]
-        dist = graph.copy()
+    def _floyd_warshall_timed(self, graph, method='numpy', **params):
+        # Only Johnson detects negative cycles; Floyd-Warshall leaves them on the diagonal
+        try:
+            return ALL_PAIRS_METHODS[method](graph, **params), None
+        except NegativeCycleError as e:
+            return None, e.cycle
+
+
+class BatchShortestPathsCPU(APIView):
+    """
+    POST {"algorithm": "dijkstra", "sources": [0, 5, ...] | "all", "workers": 4}
+    Loads the graph once and fans the per-source runs out over a process pool.
+    """
+    renderer_classes = DISTANCE_RENDERERS
 
-        for k in range(n):
-            for i in range(n):
-                for j in range(n):
-                    if dist[i][k] + dist[k][j] < dist[i][j]:
-                        dist[i][j] = dist[i][k] + dist[k][j]
+    def post(self, request, graph_id):
+        algorithm = request.data.get('algorithm', 'dijkstra')
+        if algorithm not in SINGLE_SOURCE_ALGORITHMS:
+            return Response({
+                "message": f"Unknown algorithm '{algorithm}'",
+                "algorithms": list(SINGLE_SOURCE_ALGORITHMS)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        workers = request.data.get('workers')
+        if workers is not None and (not isinstance(workers, int) or workers < 1):
+            return Response({"message": "workers must be a positive integer"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            graph_obj, graph = load_csr(graph_id)
+            n = graph.n
 
-        return dist
+            requested = request.data.get('sources', 'all')
+            if requested == 'all':
+                sources = list(range(n))
+            elif isinstance(requested, list):
+                sources = [parse_source(s, n) for s in requested]
+                if None in sources:
+                    return invalid_source(n)
+            else:
+                return Response({"message": "sources must be a list of vertices or \"all\""},
+                                status=status.HTTP_400_BAD_REQUEST)
+
+            rejected = negative_weights(graph) if algorithm == 'dijkstra' else None
+            if rejected:
+                return rejected
+
+            label_request(algorithm=f"batch_{algorithm}", backend="sequential")
+            ((distances, cycle), elapsed) = self._batch_timed(graph, sources, algorithm, workers)
+            return distance_response(request, {
+                "algorithm": algorithm,
+                "sources": sources,
+                "negative_cycle": cycle,
+                "time_seconds": elapsed
+            }, distances)
+        except Graph.DoesNotExist:
+            return Response({"message": "Graph not found"}, status=status.HTTP_404_NOT_FOUND)
+
+    @timeit
+    def _batch_timed(self, graph, sources, algorithm, workers):
+        try:
+            return shortest_paths_from(graph, sources, algorithm, workers), None
+        except NegativeCycleError as e:
+            return None, e.cycle
@@ -0,0 +1,140 @@
+import asyncio
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import HttpResponse, JsonResponse
+from django.urls import URLPattern
+from django.views.decorators.csrf import csrf_exempt
+from src.graph.models import Graph
+from src.utils.metrics import phase
+
+# Async variants of the algorithm endpoints (served under /api/async/ by an
+# ASGI server). The synchronous view still does the work, on a bounded
+# thread pool so the event loop never blocks on it, and concurrent requests
+# that would compute the same thing share a single run: the key is the
+# endpoint, graph id and version, method, query string, Accept header and
+# body. Coalescing is per process; across processes the result store
+# already shares finished results.
+
+
+class SingleFlight:
+    """
+    Runs at most one computation per key at a time (per event loop); callers
+    arriving while it runs await the same result. A caller that goes away
+    (client disconnect) never cancels the shared computation.
+    """
+
+    def __init__(self, max_inflight: int):
+        self.max_inflight = max_inflight
+        self._inflight = weakref.WeakKeyDictionary()  # loop -> {key: task}
+        self._lock = threading.Lock()
+        self.started = 0
+        self.coalesced = 0
+        self.rejected = 0
+
+    def _tasks(self) -> dict:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            return self._inflight.setdefault(loop, {})
+
+    async def run(self, key, compute):
+        """
+        Result of the in-flight `compute()` coroutine for `key`, starting one
+        if there is none. Returns None when max_inflight computations are
+        already running.
+        """
+        tasks = self._tasks()
+        task = tasks.get(key)
+        if task is not None:
+            self.coalesced += 1
+            with phase('coalesced'):
+                return await asyncio.shield(task)
+        if len(tasks) >= self.max_inflight:
+            self.rejected += 1
+            return None
+
+        task = asyncio.ensure_future(compute())
+        tasks[key] = task
+        task.add_done_callback(lambda _: tasks.pop(key, None))
+        self.started += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        with self._lock:
+            inflight = sum(len(tasks) for tasks in self._inflight.values())
+        return {
+            "workers": settings.ASYNC_COMPUTE_WORKERS,
+            "max_inflight": self.max_inflight,
+            "inflight": inflight,
+            "started": self.started,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+        }
+
+
+single_flight = SingleFlight(settings.ASYNC_MAX_INFLIGHT)
+_executor = ThreadPoolExecutor(max_workers=settings.ASYNC_COMPUTE_WORKERS, thread_name_prefix='compute')
+
+
+def _respond(view, request, kwargs):
+    # Worker threads outlive requests, so manage their connections the way
+    # Django does around each request
+    close_old_connections()
+    try:
+        response = view(request, **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        if response.streaming:
+            # Every waiter needs its own copy, so the body has to be bytes
+            content = b''.join(response.streaming_content)
+        else:
+            content = response.content
+        return response.status_code, list(response.items()), content
+    finally:
+        close_old_connections()
+
+
+def _copy(status_code, headers, content) -> HttpResponse:
+    response = HttpResponse(content, status=status_code)
+    for header, value in headers:
+        response[header] = value
+    return response
+
+
+async def _key(view, request, kwargs) -> tuple:
+    version = None
+    if 'graph_id' in kwargs:
+        version = await Graph.objects.filter(id=kwargs['graph_id']).values_list('version', flat=True).afirst()
+    query = tuple(sorted((k, tuple(v)) for k, v in request.GET.lists()))
+    body = request.body if request.method not in ('GET', 'HEAD') else b''
+    return (id(view), tuple(sorted(kwargs.items())), version, request.method, query,
+            request.headers.get('Accept', ''), body)
+
+
+def coalesced(view):
+    """Async view running the sync `view` on the compute pool, coalescing identical requests."""
+    run = sync_to_async(_respond, thread_sensitive=False, executor=_executor)
+
+    async def handler(request, **kwargs):
+        key = await _key(view, request, kwargs)
+        result = await single_flight.run(key, lambda: run(view, request, kwargs))
+        if result is None:
+            return JsonResponse({"message": f"{single_flight.max_inflight} computations are already running"},
+                                status=429)
+        return _copy(*result)
+
+    return csrf_exempt(handler)
+
+
+def async_urlpatterns(module: str) -> list:
+    """The url patterns of `module` (a urls.py), each served by coalesced(view)."""
+    return [URLPattern(pattern.pattern, coalesced(pattern.callback), pattern.default_args)
+            for pattern in import_module(module).urlpatterns]
+
+
+async def async_stats(request):
+    return JsonResponse(single_flight.stats())
@@ -0,0 +1,86 @@
+import importlib
+import importlib.util
+import threading
+import numpy as np
+
+# Compute backends. Nothing heavy is imported until a backend is first used
+# (or its status is asked for), so the server starts without CUDA/MPI/Numba.
+#
+#   name        implementation module    third-party requirement
+BACKENDS = {
+    'sequential': ('src.sequential.algorithms', None),
+    'numpy': ('src.cuda.kernels', 'numpy'),
+    'numba': ('src.jit.kernels', 'numba'),
+    'cupy': ('src.cuda.kernels', 'cupy'),
+    'mpi': ('src.mpi.pool', 'mpi4py'),
+}
+
+
+class BackendUnavailable(RuntimeError):
+    pass
+
+
+_status = {}
+_lock = threading.Lock()
+
+
+def _probe(name: str):
+    """(available, reason) for `name`; imports its requirement on first call."""
+    _, requirement = BACKENDS[name]
+    if requirement is None:
+        return True, None
+    if importlib.util.find_spec(requirement) is None:
+        return False, f"{requirement} is not installed"
+    if requirement == 'mpi4py':
+        # Importing mpi4py.MPI initialises MPI; leave that to the pool
+        return True, None
+    try:
+        module = importlib.import_module(requirement)
+        if requirement == 'cupy' and module.cuda.runtime.getDeviceCount() < 1:
+            return False, "no CUDA device"
+    except Exception as e:  # a broken CUDA install raises all sorts of errors
+        return False, f"{requirement}: {e}"
+    return True, None
+
+
+def status(name: str):
+    if name not in BACKENDS:
+        raise KeyError(name)
+    with _lock:
+        if name not in _status:
+            _status[name] = _probe(name)
+        return _status[name]
+
+
+def mark_unavailable(name: str, reason: str):
+    """Record that `name` failed in use although its probe passed."""
+    with _lock:
+        _status[name] = (False, reason)
+
+
+def is_available(name: str) -> bool:
+    return status(name)[0]
+
+
+def get_backend(name: str):
+    """Import and return the implementation module for `name`."""
+    available, reason = status(name)
+    if not available:
+        raise BackendUnavailable(f"backend '{name}' is unavailable: {reason}")
+    return importlib.import_module(BACKENDS[name][0])
+
+
+def array_module(prefer_gpu: bool = True):
+    """cupy when a CUDA device is usable, otherwise numpy (same array API)."""
+    if prefer_gpu and is_available('cupy'):
+        import cupy
+        return cupy
+    return np
+
+
+def backend_report() -> list:
+    report = []
+    for name in BACKENDS:
+        available, reason = status(name)
+        report.append({"name": name, "available": available, "reason": reason})
+    return report
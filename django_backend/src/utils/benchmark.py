@@ -0,0 +1,132 @@
+import time
+import tracemalloc
+from types import SimpleNamespace
+from typing import Callable, NamedTuple
+import numpy as np
+from src.sequential.batch import johnson
+from src.utils.backends import get_backend, is_available
+from src.utils.csr import CSRGraph
+from src.utils.graph import generate_random_graph
+
+
+class Case(NamedTuple):
+    algorithm: str
+    backend: str   # registry name, see src.utils.backends
+    method: str
+    # (kernels module, dense matrix, CSRGraph, graph key) -> zero-argument callable
+    prepare: Callable
+
+
+def _pool_run(task, *args):
+    def prepare(pool_module, dense, csr, key):
+        return lambda: pool_module.mpi_pool.run(task, key, dense, *args)
+    return prepare
+
+
+def _bidirectional(m, d, c, k):
+    reverse = c.reverse()
+    return lambda: m.bidirectional_dijkstra(c, reverse, 0, c.n - 1)
+
+
+# Point-to-point cases query 0 -> n - 1
+CASES = [
+    Case('dijkstra', 'sequential', 'heap', lambda m, d, c, k: lambda: m.dijkstra(c, 0)),
+    Case('dijkstra', 'sequential', 'to_target', lambda m, d, c, k: lambda: m.dijkstra_to(c, 0, c.n - 1)),
+    Case('dijkstra', 'sequential', 'bidirectional', _bidirectional),
+    Case('bellman_ford', 'sequential', 'edge_list', lambda m, d, c, k: lambda: m.bellman_ford(c, 0)),
+    Case('bellman_ford', 'sequential', 'spfa', lambda m, d, c, k: lambda: m.spfa(c, 0)),
+    Case('floyd_warshall', 'sequential', 'numpy', lambda m, d, c, k: lambda: m.floyd_warshall_numpy(d)),
+    Case('floyd_warshall', 'sequential', 'blocked', lambda m, d, c, k: lambda: m.floyd_warshall_blocked(d)),
+    Case('floyd_warshall', 'sequential', 'johnson', lambda m, d, c, k: lambda: johnson(c, workers=1)),
+    Case('dijkstra', 'numba', 'csr', lambda m, d, c, k: lambda: m.dijkstra(c, 0)),
+    Case('dijkstra', 'numba', 'dense', lambda m, d, c, k: lambda: m.dijkstra(d, 0)),
+    Case('dijkstra', 'numba', 'to_target', lambda m, d, c, k: lambda: m.dijkstra_to(c, 0, c.n - 1)),
+    Case('bellman_ford', 'numba', 'edge_list', lambda m, d, c, k: lambda: m.bellman_ford(c, 0)),
+    Case('floyd_warshall', 'numba', 'parallel', lambda m, d, c, k: lambda: m.floyd_warshall(d)),
+    Case('floyd_warshall', 'numba', 'johnson', lambda m, d, c, k: lambda: m.johnson(c)),
+    Case('dijkstra', 'numpy', 'array', lambda m, d, c, k: lambda: m.dijkstra_cuda(d, 0, xp=np)),
+    Case('floyd_warshall', 'numpy', 'array', lambda m, d, c, k: lambda: m.floyd_warshall_cuda(d, xp=np)),
+    Case('dijkstra', 'cupy', 'array', lambda m, d, c, k: lambda: m.dijkstra_cuda(d, 0)),
+    Case('floyd_warshall', 'cupy', 'array', lambda m, d, c, k: lambda: m.floyd_warshall_cuda(d)),
+    Case('dijkstra', 'mpi', 'minloc', _pool_run('dijkstra', 0)),
+    Case('bellman_ford', 'mpi', 'allreduce', _pool_run('bellman_ford', 0)),
+    Case('floyd_warshall', 'mpi', 'row_block', _pool_run('floyd_warshall')),
+]
+
+
+def select_cases(algorithms=None, backends=None):
+    """Cases matching the filters whose backend is usable on this host."""
+    return [case for case in CASES
+            if (not algorithms or case.algorithm in algorithms)
+            and (not backends or case.backend in backends)
+            and is_available(case.backend)]
+
+
+def make_graph(size: int, density: float, seed: int):
+    dense = generate_random_graph(size, density, seed=seed)
+    csr = CSRGraph.from_dense(dense)
+    # Same read-only arrays the views get from the graph cache
+    for array in (dense, *csr):
+        array.flags.writeable = False
+    key = SimpleNamespace(id=f'benchmark-{size}-{density}-{seed}', version=0)
+    return dense, csr, key
+
+
+def measure(run: Callable, repeat: int = 5, warmup: int = 1) -> dict:
+    """
+    Time `run` with perf_counter after `warmup` untimed calls, then trace one
+    extra call for peak memory. tracemalloc sees NumPy allocations but not
+    memory allocated inside Numba kernels or on the GPU.
+    """
+    for _ in range(warmup):
+        run()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    times = np.array(times)
+    return {
+        "median_seconds": float(np.median(times)),
+        "p95_seconds": float(np.percentile(times, 95)),
+        "min_seconds": float(times.min()),
+        "peak_bytes": int(peak),
+    }
+
+
+def run_case(case: Case, size: int, density: float, seed: int, repeat: int, warmup: int) -> dict:
+    row = {"algorithm": case.algorithm, "backend": case.backend, "method": case.method,
+           "size": size, "density": density, "seed": seed, "repeat": repeat, "error": ""}
+    try:
+        dense, csr, key = make_graph(size, density, seed)
+        row.update(measure(case.prepare(get_backend(case.backend), dense, csr, key), repeat, warmup))
+    except Exception as e:
+        # A failing case is reported, not fatal for the sweep
+        row["error"] = f"{type(e).__name__}: {e}"
+    return row
+
+
+def case_key(row: dict) -> tuple:
+    return (row["algorithm"], row["backend"], row["method"], int(row["size"]), float(row["density"]))
+
+
+def compare(rows, baseline_rows, threshold: float = 0.1) -> list:
+    """Rows whose median is more than `threshold` slower than the baseline's."""
+    baseline = {case_key(row): row for row in baseline_rows if not row.get("error")}
+    regressions = []
+    for row in rows:
+        before = baseline.get(case_key(row))
+        if row.get("error") or before is None:
+            continue
+        ratio = float(row["median_seconds"]) / float(before["median_seconds"])
+        if ratio > 1 + threshold:
+            regressions.append(dict(row, baseline_seconds=float(before["median_seconds"]), ratio=ratio))
+    return regressions
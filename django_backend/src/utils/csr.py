@@ -0,0 +1,68 @@
+from typing import NamedTuple
+import numpy as np
+
+
+class CSRGraph(NamedTuple):
+    """
+    Compressed sparse row adjacency: the out-edges of u are
+    indices[indptr[u]:indptr[u + 1]] with matching weights.
+    Missing edges are simply absent (no infinity entries).
+    """
+    indptr: np.ndarray   # int64, n + 1
+    indices: np.ndarray  # int32, nnz
+    weights: np.ndarray  # float, nnz
+
+    @property
+    def n(self) -> int:
+        return len(self.indptr) - 1
+
+    @property
+    def nnz(self) -> int:
+        return len(self.indices)
+
+    @property
+    def nbytes(self) -> int:
+        return self.indptr.nbytes + self.indices.nbytes + self.weights.nbytes
+
+    @classmethod
+    def from_edges(cls, n: int, src, dst, weights, dtype=np.float64) -> 'CSRGraph':
+        src = np.asarray(src, dtype=np.int64)
+        order = np.argsort(src, kind='stable')
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+        return cls(
+            indptr,
+            np.asarray(dst, dtype=np.int32)[order],
+            np.asarray(weights, dtype=dtype)[order],
+        )
+
+    @classmethod
+    def from_dense(cls, graph: np.ndarray, dtype=None) -> 'CSRGraph':
+        # Finite off-diagonal cells are edges; a non-zero diagonal is kept as a self loop
+        mask = np.isfinite(graph)
+        diag = np.diagonal(mask).copy()
+        np.fill_diagonal(mask, diag & (np.diagonal(graph) != 0))
+        src, dst = np.nonzero(mask)
+        indptr = np.zeros(graph.shape[0] + 1, dtype=np.int64)
+        np.cumsum(np.count_nonzero(mask, axis=1), out=indptr[1:])
+        return cls(indptr, dst.astype(np.int32), graph[src, dst].astype(dtype or graph.dtype))
+
+    def to_dense(self, dtype=None) -> np.ndarray:
+        src, dst, weights = self.edges()
+        graph = np.full((self.n, self.n), np.inf, dtype=dtype or self.weights.dtype)
+        np.fill_diagonal(graph, 0)
+        graph[src, dst] = weights
+        return graph
+
+    def edges(self):
+        """Expand to an edge list (src, dst, weights), ordered by source."""
+        src = np.repeat(np.arange(self.n, dtype=np.int32), np.diff(self.indptr))
+        return src, self.indices, self.weights
+
+    def reverse(self) -> 'CSRGraph':
+        """The transposed graph (in-edges become out-edges)."""
+        src, dst, weights = self.edges()
+        return CSRGraph.from_edges(self.n, dst, src, weights, dtype=self.weights.dtype)
+
+    def astype(self, dtype) -> 'CSRGraph':
+        return self._replace(weights=self.weights.astype(dtype, copy=False))
@@ -1,12 +1,144 @@
 import numpy as np
-from config import GRAPH_SIZE, INFINITY
+from src.utils.config import GRAPH_SIZE, INFINITY
 
-def generate_random_graph(size=GRAPH_SIZE, density=0.3):
+# Edge weights are integers in [MIN_WEIGHT, MAX_WEIGHT), stored as floats
+MIN_WEIGHT = 1
+MAX_WEIGHT = 100
+
+# Upper bound on geometric gaps drawn per batch
+_BATCH = 1 << 20
+
+
+def _weights(rng: np.random.Generator, m: int) -> np.ndarray:
+    return rng.integers(MIN_WEIGHT, MAX_WEIGHT, size=m).astype(np.float64)
+
+
+def _unique(keys: np.ndarray) -> np.ndarray:
+    # Sort-based np.unique; noticeably faster than np.unique on large int arrays
+    keys = np.sort(keys)
+    if keys.size:
+        keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+    return keys
+
+
+def _sample(p_cumulative: np.ndarray, rng: np.random.Generator, m: int) -> np.ndarray:
+    # Inverse-CDF sampling of m vertex ids
+    return np.searchsorted(p_cumulative, rng.random(m) * p_cumulative[-1], side='right')
+
+
+def _dedupe(size: int, src: np.ndarray, dst: np.ndarray):
+    # Drop self loops and repeated (src, dst) pairs, sorted by src then dst
+    keep = src != dst
+    keys = _unique(src[keep].astype(np.int64) * size + dst[keep])
+    return keys // size, keys % size
+
+
+def erdos_renyi_edges(size: int, rng: np.random.Generator, density=0.3):
+    """
+    G(n, p): every ordered pair (i, j), i != j, is an edge with probability
+    `density`. Edge positions are found by summing geometric gaps over the
+    n*(n-1) off-diagonal cells, so only the chosen edges are materialised.
+    """
+    total = size * (size - 1)
+    if density <= 0 or total == 0:
+        positions = np.empty(0, dtype=np.int64)
+    elif density >= 1:
+        positions = np.arange(total, dtype=np.int64)
+    else:
+        chunks = []
+        last = -1
+        while last < total:
+            expected = int((total - last) * density * 1.1) + 64
+            gaps = rng.geometric(density, size=min(expected, _BATCH))
+            chunk = last + np.cumsum(gaps, dtype=np.int64)
+            chunks.append(chunk)
+            last = int(chunk[-1])
+        positions = np.concatenate(chunks)
+        positions = positions[positions < total]
+
+    src = positions // (size - 1) if size > 1 else positions
+    offset = positions - src * (size - 1)
+    dst = offset + (offset >= src)  # skip the diagonal
+    return src, dst, _weights(rng, positions.size)
+
+
+def out_degree_edges(size: int, rng: np.random.Generator, degree=4):
+    """Every vertex gets exactly `degree` distinct out-neighbours chosen uniformly."""
+    degree = min(degree, size - 1)
+    keys = np.empty(0, dtype=np.int64)
+    need = np.full(size, degree)
+    while need.any():
+        rows = np.repeat(np.arange(size, dtype=np.int64), need)
+        cols = rng.integers(0, size - 1, size=rows.size)
+        cols += cols >= rows
+        # Duplicates collapse here; rows that lost picks draw again
+        keys = _unique(np.concatenate([keys, rows * size + cols]))
+        need = degree - np.bincount(keys // size, minlength=size)
+    return keys // size, keys % size, _weights(rng, keys.size)
+
+
+def grid_edges(size: int, rng: np.random.Generator, width=None):
+    """
+    Road-like lattice: vertices laid out row-major `width` wide, each linked
+    both ways to its right and lower neighbour with independent weights.
+    """
+    width = width or max(1, int(np.ceil(np.sqrt(size))))
+    ids = np.arange(size, dtype=np.int64)
+    right = ids[(ids % width != width - 1) & (ids + 1 < size)]
+    down = ids[ids + width < size]
+    src = np.concatenate([right, right + 1, down, down + width])
+    dst = np.concatenate([right + 1, right, down + width, down])
+    src, dst = _dedupe(size, src, dst)
+    return src, dst, _weights(rng, src.size)
+
+
+def power_law_edges(size: int, rng: np.random.Generator, degree=4, exponent=2.5):
+    """
+    Chung-Lu style scale-free graph: endpoints are drawn with probability
+    proportional to i^(-1/(exponent-1)), giving a power-law degree tail with
+    about `degree` out-edges per vertex on average.
+    """
+    ranks = np.arange(1, size + 1, dtype=np.float64)
+    p = ranks ** (-1.0 / (exponent - 1.0))
+    m = size * degree
+    src = _sample(np.cumsum(p), rng, m)
+    dst = _sample(np.cumsum(rng.permutation(p)), rng, m)
+    src, dst = _dedupe(size, src, dst)
+    return src, dst, _weights(rng, src.size)
+
+
+GENERATORS = {
+    'erdos_renyi': erdos_renyi_edges,
+    'out_degree': out_degree_edges,
+    'grid': grid_edges,
+    'power_law': power_law_edges,
+}
+
+
+def generate_edges(size=GRAPH_SIZE, model='erdos_renyi', seed=None, **params):
+    """
+    Generate a random graph as an edge list (src, dst, weights) without any
+    dense intermediate. The same `seed` always reproduces the same graph.
+    """
+    if model not in GENERATORS:
+        raise ValueError(f"Unknown graph model '{model}'")
+    rng = np.random.default_rng(seed)
+    return GENERATORS[model](size, rng, **params)
+
+
+def edges_to_dense(size: int, src, dst, weights) -> np.ndarray:
     graph = np.full((size, size), INFINITY)
     np.fill_diagonal(graph, 0)
-
-    for i in range(size):
-        for j in range(size):
-            if i != j and np.random.rand() < density:
-                graph[i][j] = np.random.randint(1, 100)
+    graph[src, dst] = weights
     return graph
+
+
+def edge_density(size: int, num_edges: int) -> float:
+    return num_edges / (size * (size - 1)) if size > 1 else 0.0
+
+
+def generate_random_graph(size=GRAPH_SIZE, density=0.3, seed=None, model='erdos_renyi', **params):
+    if model == 'erdos_renyi':
+        params['density'] = density
+    src, dst, weights = generate_edges(size, model=model, seed=seed, **params)
+    return edges_to_dense(size, src, dst, weights)
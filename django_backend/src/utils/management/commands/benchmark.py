@@ -0,0 +1,97 @@
+import csv
+import json
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from src.utils.benchmark import CASES, compare, run_case, select_cases
+
+FIELDS = ["algorithm", "backend", "method", "size", "density", "seed", "repeat",
+          "median_seconds", "p95_seconds", "min_seconds", "peak_bytes", "error"]
+
+
+def _csv_list(cast):
+    return lambda value: [cast(item) for item in value.split(',') if item]
+
+
+def _read(path: Path) -> list:
+    if path.suffix == '.csv':
+        with path.open(newline='') as f:
+            return list(csv.DictReader(f))
+    return json.loads(path.read_text())
+
+
+def _write(path: Path, rows: list):
+    if path.suffix == '.csv':
+        with path.open('w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        path.write_text(json.dumps(rows, indent=2))
+
+
+class Command(BaseCommand):
+    help = ("Time every available algorithm/backend on seeded random graphs over a grid "
+            "of sizes and densities, optionally comparing against a saved baseline.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=_csv_list(int), default=[128, 256, 512])
+        parser.add_argument('--densities', type=_csv_list(float), default=[0.05, 0.3])
+        parser.add_argument('--algorithms', type=_csv_list(str), default=None,
+                            help="comma-separated, default all")
+        parser.add_argument('--backends', type=_csv_list(str), default=None,
+                            help="comma-separated registry names, default all available")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--warmup', type=int, default=1)
+        parser.add_argument('--output', type=Path, action='append', default=[],
+                            help="results file, .csv or .json (may be given twice)")
+        parser.add_argument('--baseline', type=Path, help="earlier --output to compare against")
+        parser.add_argument('--threshold', type=float, default=0.1,
+                            help="flag cases whose median is this much slower than the baseline")
+        parser.add_argument('--fail-on-regression', action='store_true')
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError("--repeat must be at least 1")
+        known = {case.backend for case in CASES}
+        unknown = set(options['backends'] or []) - known
+        if unknown:
+            raise CommandError(f"unknown backends: {', '.join(sorted(unknown))}")
+
+        cases = select_cases(options['algorithms'], options['backends'])
+        if not cases:
+            raise CommandError("no benchmark cases match the filters on this host")
+
+        rows = []
+        for size in options['sizes']:
+            for density in options['densities']:
+                for case in cases:
+                    row = run_case(case, size, density, options['seed'],
+                                   options['repeat'], options['warmup'])
+                    rows.append(row)
+                    self._print_row(row)
+
+        for path in options['output']:
+            _write(path, rows)
+            self.stdout.write(f"wrote {len(rows)} rows to {path}")
+
+        if options['baseline']:
+            regressions = compare(rows, _read(options['baseline']), options['threshold'])
+            for row in regressions:
+                self.stdout.write(self.style.WARNING(
+                    f"REGRESSION {row['algorithm']}/{row['backend']}/{row['method']} "
+                    f"n={row['size']} d={row['density']}: {row['median_seconds']:.4f}s vs "
+                    f"{row['baseline_seconds']:.4f}s ({row['ratio']:.2f}x)"))
+            if not regressions:
+                self.stdout.write(self.style.SUCCESS("no regressions against the baseline"))
+            elif options['fail_on_regression']:
+                raise CommandError(f"{len(regressions)} regression(s)")
+
+    def _print_row(self, row):
+        label = f"{row['algorithm']:<15}{row['backend']:<11}{row['method']:<14}" \
+                f"n={row['size']:<6}d={row['density']:<6}"
+        if row['error']:
+            self.stdout.write(self.style.ERROR(f"{label} {row['error']}"))
+        else:
+            self.stdout.write(f"{label} median {row['median_seconds']:.4f}s  "
+                              f"p95 {row['p95_seconds']:.4f}s  peak {row['peak_bytes'] / 2**20:.1f} MiB")
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from src.graph.models import Graph
+
+
+def _ids(value):
+    return [int(item) for item in value.split(',') if item]
+
+
+class Command(BaseCommand):
+    help = ("Move stored graphs between database rows and memory-mapped files "
+            "(see GRAPH_STORAGE). Versions are unchanged, so cached results stay valid.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--to', choices=[storage for storage, _ in Graph.STORAGES], required=True)
+        parser.add_argument('--ids', type=_ids, default=None, help="comma-separated graph ids, default all")
+
+    def handle(self, *args, **options):
+        graphs = Graph.objects.exclude(storage=options['to']).defer('data')
+        if options['ids'] is not None:
+            graphs = graphs.filter(id__in=options['ids'])
+            missing = set(options['ids']) - set(Graph.objects.filter(id__in=options['ids'])
+                                                .values_list('id', flat=True))
+            if missing:
+                raise CommandError(f"no such graphs: {', '.join(map(str, sorted(missing)))}")
+
+        moved = 0
+        for graph_id in graphs.values_list('id', flat=True).iterator():
+            with transaction.atomic():
+                Graph.objects.select_for_update().get(id=graph_id).move_to(options['to'])
+            moved += 1
+        self.stdout.write(f"moved {moved} graphs to {options['to']} storage")
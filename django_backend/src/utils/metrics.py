@@ -0,0 +1,172 @@
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+# Per-request phase timing. PhaseTimingMiddleware starts a Timings for each
+# request; code anywhere below the view marks its work with `phase(name)`:
+#
+#   load       database fetches (graph metadata and the stored blob)
+#   decode     binary/legacy decoding of stored graphs
+#   convert    dtype and layout conversion (astype, dense <-> CSR)
+#   transfer   host <-> device copies and MPI graph broadcasts
+#   compute    the algorithm itself (everything run through @timeit)
+#   cache      result-cache lookups and stores
+#   serialize  turning distances into the response body
+#
+# Phases nest; each records only its own time, excluding nested phases, so
+# they add up to at most the request total. Outside a request phase() is a
+# no-op, which keeps worker processes and management commands unaffected.
+
+_current = contextvars.ContextVar('request_timings', default=None)
+
+
+class Timings:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.labels = {}
+        self._children = []  # time spent in nested phases, per open phase
+
+    def add(self, name: str, seconds: float):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def as_dict(self) -> dict:
+        return {name: round(seconds, 6) for name, seconds in self.phases.items()}
+
+    def server_timing(self, total: float) -> str:
+        entries = [f"{name};dur={seconds * 1000:.3f}" for name, seconds in self.phases.items()]
+        entries.append(f"total;dur={total * 1000:.3f}")
+        return ', '.join(entries)
+
+
+def current_timings():
+    return _current.get()
+
+
+@contextmanager
+def phase(name: str):
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    timings._children.append(0.0)
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        timings.add(name, elapsed - timings._children.pop())
+        if timings._children:
+            timings._children[-1] += elapsed
+
+
+def label_request(**labels):
+    """Attach metric labels (algorithm, backend) to the current request."""
+    timings = _current.get()
+    if timings is not None:
+        for key, value in labels.items():
+            timings.labels.setdefault(key, value)
+
+
+class Histogram:
+    """Prometheus-style cumulative histogram with one series per label set."""
+
+    def __init__(self, name: str, help_text: str, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = sorted(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            counts, total = self._series.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._series[key] = (counts, total + value)
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted(self._series.items())
+        for key, (counts, total) in series:
+            labels = ','.join(f'{k}="{v}"' for k, v in key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + [float('inf')], counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(float(bound))
+                sep = ',' if labels else ''
+                lines.append(f'{self.name}_bucket{{{labels}{sep}le="{le}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total}")
+            lines.append(f"{self.name}_count{{{labels}}} {cumulative}")
+        return '\n'.join(lines) + '\n'
+
+
+BUCKETS = [0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+
+phase_seconds = Histogram('shortest_path_phase_seconds',
+                          "Time per request phase of the shortest-path endpoints", BUCKETS)
+request_seconds = Histogram('shortest_path_request_seconds',
+                            "Total time of shortest-path requests", BUCKETS)
+
+
+class PhaseTimingMiddleware:
+    """
+    Times each request's phases, reports them in a Server-Timing header and
+    records them in the histograms served at /metrics. Only requests that
+    recorded phases get the header, and only labelled ones (the algorithm
+    endpoints, via label_request) are counted in the histograms.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self._acall(request)
+        timings = Timings()
+        token = _current.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._report(timings, response)
+
+    async def _acall(self, request):
+        timings = Timings()
+        token = _current.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._report(timings, response)
+
+    @staticmethod
+    def _report(timings, response):
+        if not timings.phases:
+            return response
+
+        total = time.perf_counter() - timings.started
+        response['Server-Timing'] = timings.server_timing(total)
+        if not timings.labels:
+            return response
+        labels = {'algorithm': timings.labels.get('algorithm', 'unknown'),
+                  'backend': timings.labels.get('backend', 'unknown')}
+        for name, seconds in timings.phases.items():
+            phase_seconds.observe(seconds, phase=name, **labels)
+        request_seconds.observe(total, **labels)
+        return response
+
+
+def metrics_view(request):
+    from django.http import HttpResponse
+    body = phase_seconds.render() + request_seconds.render()
+    return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,36 @@
+import os
+import socket
+
+# Background work (jobs, imports) is run by the server process that accepted
+# it, and its row records that process as the owner. A restart leaves rows
+# whose owner is gone; dead_owners finds them so they can be failed instead
+# of staying queued/running forever.
+
+
+def process_owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def dead_owners(owners) -> list:
+    """
+    The owners among `owners` known to be gone: processes on this host that
+    no longer exist, and '' (rows from before owners were recorded). Owners
+    on other hosts are left to those hosts.
+    """
+    host = socket.gethostname()
+    dead = []
+    for owner in set(owners):
+        owner_host, _, pid = owner.rpartition(':')
+        if owner == '' or (owner_host == host and pid.isdigit() and not _alive(int(pid))):
+            dead.append(owner)
+    return dead
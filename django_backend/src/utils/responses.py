@@ -0,0 +1,135 @@
+import io
+import json
+import numpy as np
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer, BrowsableAPIRenderer, JSONRenderer
+from rest_framework.response import Response
+from src.utils.metrics import current_timings, phase
+
+# Wire formats for distance vectors/matrices, chosen by Accept header or ?format=:
+#
+#   json    (default) nested lists, infinity as null
+#   npy     application/x-npy, a .npy file (np.load-able), infinity as IEEE inf
+#   bin     application/octet-stream, raw little-endian values; shape and dtype
+#           in the X-Shape / X-Dtype headers, infinity as IEEE inf
+#   ndjson  application/x-ndjson, streamed: a metadata object, then one JSON
+#           array per row, infinity as null
+#
+# Everything except the distances travels in the X-Result-Metadata header
+# (JSON) for npy/bin, and as the first line for ndjson. Headers have size
+# limits, so in X-Result-Metadata any list longer than HEADER_LIST_LIMIT
+# (e.g. a batch's sources) is summarized as {"count", "first", "last"}.
+
+HEADER_LIST_LIMIT = 16
+
+
+class _ArrayRenderer(BaseRenderer):
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not isinstance(data, np.ndarray):
+            # Errors and other plain payloads are still sent as JSON
+            if renderer_context and 'response' in renderer_context:
+                renderer_context['response']['Content-Type'] = 'application/json'
+            return JSONRenderer().render(data)
+        return self.render_array(data)
+
+
+class NpyRenderer(_ArrayRenderer):
+    media_type = 'application/x-npy'
+    format = 'npy'
+
+    def render_array(self, array):
+        buffer = io.BytesIO()
+        np.save(buffer, array, allow_pickle=False)
+        return buffer.getvalue()
+
+
+class OctetStreamRenderer(_ArrayRenderer):
+    media_type = 'application/octet-stream'
+    format = 'bin'
+
+    def render_array(self, array):
+        return np.ascontiguousarray(array, dtype=array.dtype.newbyteorder('<')).tobytes()
+
+
+class NDJSONRenderer(BaseRenderer):
+    # Only used for negotiation; distance_response streams the body itself
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data) + '\n'
+
+
+class TimedResponse(Response):
+    # Rendering happens after the view returns but inside the request, so it
+    # still lands in the Server-Timing header (not in the body it produces)
+    def render(self):
+        with phase('serialize'):
+            return super().render()
+
+
+DISTANCE_RENDERERS = [JSONRenderer, BrowsableAPIRenderer, NpyRenderer, OctetStreamRenderer, NDJSONRenderer]
+
+
+def to_json_safe(distances: np.ndarray):
+    """Nested lists with None wherever the value is not finite."""
+    distances = np.asarray(distances)
+    values = distances.astype(object)
+    values[~np.isfinite(distances)] = None
+    return values.tolist()
+
+
+def _json_row(row: np.ndarray) -> str:
+    # json.dumps on floats is fast; patch the non-standard tokens afterwards
+    text = json.dumps(row.tolist())
+    return text.replace('-Infinity', 'null').replace('Infinity', 'null').replace('NaN', 'null')
+
+
+def _ndjson_lines(meta: dict, distances: np.ndarray):
+    yield json.dumps(meta) + '\n'
+    for row in np.atleast_2d(distances):
+        yield _json_row(row) + '\n'
+
+
+def _header_meta(meta: dict) -> dict:
+    return {
+        name: {"count": len(value), "first": value[0], "last": value[-1]}
+        if isinstance(value, list) and len(value) > HEADER_LIST_LIMIT else value
+        for name, value in meta.items()
+    }
+
+
+def distance_response(request, body: dict, distances, key: str = 'distances', status=200):
+    """
+    Respond with `body` plus `distances` (an array, or None) in the format
+    negotiated for this request. Views using it set
+    renderer_classes = DISTANCE_RENDERERS.
+    """
+    renderer_format = getattr(getattr(request, 'accepted_renderer', None), 'format', 'json')
+    timings = current_timings()
+
+    if distances is None or renderer_format not in ('npy', 'bin', 'ndjson'):
+        payload = dict(body)
+        with phase('serialize'):
+            payload[key] = None if distances is None else to_json_safe(distances)
+        if timings is not None:
+            payload['timings'] = timings.as_dict()
+        return TimedResponse(payload, status=status)
+
+    distances = np.asarray(distances)
+    meta = dict(body, shape=list(distances.shape), dtype=distances.dtype.str)
+    if timings is not None:
+        meta['timings'] = timings.as_dict()
+    if renderer_format == 'ndjson':
+        response = StreamingHttpResponse(_ndjson_lines(meta, distances),
+                                         content_type=NDJSONRenderer.media_type, status=status)
+        return response
+
+    response = TimedResponse(distances, status=status)
+    response['X-Result-Metadata'] = json.dumps(_header_meta(meta))
+    response['X-Shape'] = ','.join(str(d) for d in distances.shape)
+    response['X-Dtype'] = distances.dtype.newbyteorder('<').str
+    return response
@@ -0,0 +1,51 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+import numpy as np
+from django.test import TestCase, override_settings
+from src.graph.cache import graph_cache
+from src.graph.models import Graph
+from src.graph.store import graph_store
+
+
+def random_graph(n, density, seed, low=1.0, high=10.0) -> np.ndarray:
+    """Dense matrix with about `density` of its edges present, weights in [low, high)."""
+    rng = np.random.default_rng(seed)
+    matrix = np.where(rng.random((n, n)) < density, rng.uniform(low, high, (n, n)), np.inf)
+    np.fill_diagonal(matrix, 0)
+    return matrix
+
+
+def stored_graph(matrix) -> Graph:
+    """A Graph row holding `matrix` (in settings.GRAPH_STORAGE)."""
+    graph = Graph(size=len(matrix), density=float(np.isfinite(matrix).mean()))
+    graph.save_graph(matrix)
+    return graph
+
+
+class GraphTestCase(TestCase):
+    """
+    TestCase for tests that store graphs. File-backed graphs go to a
+    temporary GRAPH_STORE_DIR instead of the real one, and every test starts
+    with an empty graph cache: graph ids come back once a test's rows roll
+    back, so cached and stored arrays from an earlier test would otherwise
+    be found under them.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        store_dir = tempfile.TemporaryDirectory(prefix='graph-store-')
+        cls.addClassCleanup(store_dir.cleanup)
+        settings_override = override_settings(GRAPH_STORE_DIR=store_dir.name)
+        settings_override.enable()
+        cls.addClassCleanup(settings_override.disable)
+        # graph_store read the setting at import
+        root_patch = mock.patch.object(graph_store, 'root', Path(store_dir.name))
+        root_patch.start()
+        cls.addClassCleanup(root_patch.stop)
+
+    def setUp(self):
+        super().setUp()
+        graph_cache.clear()
+        self.addCleanup(graph_cache.clear)
@@ -0,0 +1,98 @@
+import asyncio
+import threading
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+from .asyncviews import SingleFlight, coalesced
+
+
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        self.flight = SingleFlight(max_inflight=2)
+        self.runs = 0
+
+    async def compute(self, release, value='result'):
+        self.runs += 1
+        await release.wait()
+        return value
+
+    def test_concurrent_callers_share_one_run(self):
+        async def scenario():
+            release = asyncio.Event()
+            callers = [asyncio.ensure_future(self.flight.run('key', lambda: self.compute(release)))
+                       for _ in range(5)]
+            await asyncio.sleep(0)
+            release.set()
+            return await asyncio.gather(*callers)
+
+        self.assertEqual(asyncio.run(scenario()), ['result'] * 5)
+        self.assertEqual(self.runs, 1)
+        self.assertEqual((self.flight.started, self.flight.coalesced), (1, 4))
+
+    def test_keys_run_separately_and_finished_runs_are_not_reused(self):
+        async def scenario():
+            release = asyncio.Event()
+            release.set()
+            first = await asyncio.gather(self.flight.run('a', lambda: self.compute(release, 'a')),
+                                         self.flight.run('b', lambda: self.compute(release, 'b')))
+            again = await self.flight.run('a', lambda: self.compute(release, 'a'))
+            return first, again
+
+        self.assertEqual(asyncio.run(scenario()), (['a', 'b'], 'a'))
+        self.assertEqual(self.runs, 3)
+        self.assertEqual(self.flight.stats()['inflight'], 0)
+
+    def test_rejects_beyond_max_inflight(self):
+        async def scenario():
+            release = asyncio.Event()
+            running = [asyncio.ensure_future(self.flight.run(key, lambda: self.compute(release)))
+                       for key in ('a', 'b')]
+            await asyncio.sleep(0)
+            rejected = await self.flight.run('c', lambda: self.compute(release))
+            release.set()
+            await asyncio.gather(*running)
+            return rejected
+
+        self.assertIsNone(asyncio.run(scenario()))
+        self.assertEqual((self.runs, self.flight.rejected), (2, 1))
+
+    def test_disconnected_caller_does_not_cancel_the_run(self):
+        async def scenario():
+            release = asyncio.Event()
+            leaving = asyncio.ensure_future(self.flight.run('key', lambda: self.compute(release)))
+            staying = asyncio.ensure_future(self.flight.run('key', lambda: self.compute(release)))
+            await asyncio.sleep(0)
+            leaving.cancel()
+            release.set()
+            return await staying
+
+        self.assertEqual(asyncio.run(scenario()), 'result')
+        self.assertEqual(self.runs, 1)
+
+
+class CoalescedViewTests(SimpleTestCase):
+    def test_identical_requests_share_one_response(self):
+        calls = []
+        entered = threading.Event()
+        release = threading.Event()
+
+        def view(request):
+            calls.append(request)
+            entered.set()
+            release.wait(5)
+            return HttpResponse(b'distances', headers={'X-Shape': '3'})
+
+        handler = coalesced(view)
+        factory = RequestFactory()
+
+        async def scenario():
+            queries = ['source=1'] * 3 + ['source=2']
+            responses = [asyncio.ensure_future(handler(factory.get(f'/distances/?{query}'))) for query in queries]
+            await asyncio.get_running_loop().run_in_executor(None, entered.wait, 5)
+            await asyncio.sleep(0.05)
+            release.set()
+            return await asyncio.gather(*responses)
+
+        responses = asyncio.run(scenario())
+        self.assertEqual(len(calls), 2)
+        self.assertEqual([(r.status_code, r.content, r['X-Shape']) for r in responses],
+                         [(200, b'distances', '3')] * 4)
@@ -1,6 +1,7 @@
 import time
 from functools import wraps
 from typing import Any, Tuple, Callable
+from src.utils.metrics import phase
 
 def timeit(func: Callable) -> Callable[..., Tuple[Any, float]]:
     """
@@ -9,8 +10,9 @@ def timeit(func: Callable) -> Callable[..., Tuple[Any, float]]:
     """
     @wraps(func)
     def wrapper(*args, **kwargs):
-        start = time.time()
-        result = func(*args, **kwargs)
-        elapsed = time.time() - start
+        with phase('compute'):
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            elapsed = time.perf_counter() - start
         return result, elapsed
     return wrapper
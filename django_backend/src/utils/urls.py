@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import BackendList
+
+urlpatterns = [
+    path('', BackendList.as_view(), name='backends'),
+]
@@ -0,0 +1,8 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from .backends import backend_report
+
+
+class BackendList(APIView):
+    def get(self, request):
+        return Response(backend_report())